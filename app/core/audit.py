@@ -0,0 +1,124 @@
+import asyncio
+import datetime
+import json
+import logging
+from collections import deque
+from typing import Optional
+
+from app.core.metrics import REGISTRY, count_event
+from app.repositories.audit_store import AuditStore
+
+logger = logging.getLogger(__name__)
+
+AUDIT_PENDING = REGISTRY.gauge(
+    "trinetra_audit_pending",
+    "Audit records queued in memory, waiting for the next batched write.",
+)
+
+
+class AuditWriter:
+    """
+    Write-behind audit trail.
+
+    Handlers call record_*(), which only appends a tuple to an in-memory
+    queue: no I/O on the request path. A background task writes the queue
+    to SQLite in batches of up to batch_size rows, as soon as a batch is
+    full or every flush_interval_s otherwise, through the io executor pool.
+
+    Backpressure: the queue holds at most max_queue records. When the
+    database falls that far behind, new records are dropped and counted as
+    trinetra_events_total{event="dropped",source="audit"}; requests never
+    wait for the audit trail. stop() writes out whatever is still queued.
+    """
+
+    def __init__(self, store: AuditStore, max_queue: int = 10_000, batch_size: int = 500,
+                 flush_interval_s: float = 1.0, executor=None):
+        self.store = store
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.flush_interval_s = flush_interval_s
+        self.executor = executor
+        self._pending: deque = deque()
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    # -------------------------
+    # LIFECYCLE
+    # -------------------------
+    def start(self) -> None:
+        if self._task is None:
+            self._stopping = False
+            self._wake = asyncio.Event()
+            self._task = asyncio.get_running_loop().create_task(self._loop())
+
+    async def stop(self) -> None:
+        """Flush everything still queued, then end the background task."""
+        # Signalled rather than cancelled: a cancel could land mid-write and lose a batch
+        if self._task is not None:
+            self._stopping = True
+            self._wake.set()
+            await self._task
+            self._task = None
+        await self.flush()
+
+    async def _loop(self) -> None:
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.flush_interval_s)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self.flush()
+
+    async def flush(self) -> int:
+        written = 0
+        while self._pending:
+            n = min(self.batch_size, len(self._pending))
+            batch = [self._pending.popleft() for _ in range(n)]
+            AUDIT_PENDING.set(len(self._pending))
+            try:
+                if self.executor is not None:
+                    written += await self.executor.run(self.store.write, batch)
+                else:
+                    written += self.store.write(batch)
+            except Exception as e:
+                count_event("error", "audit")
+                logger.error(f"❌ Audit write failed, {len(batch)} records lost: {e}")
+        return written
+
+    # -------------------------
+    # RECORDING (request path: no I/O)
+    # -------------------------
+    def submit(self, kind: str, row: tuple) -> bool:
+        if len(self._pending) >= self.max_queue:
+            count_event("dropped", "audit")
+            return False
+        self._pending.append((kind, row))
+        AUDIT_PENDING.set(len(self._pending))
+        if self._task is None and not self._stopping:
+            self.start()
+        elif self._wake is not None and len(self._pending) >= self.batch_size:
+            self._wake.set()
+        return True
+
+    @staticmethod
+    def _now() -> str:
+        return datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="milliseconds")
+
+    def record_prediction(self, crop: str, state: str, target_date: str, quantity: float,
+                          result: dict, model_version: Optional[str]) -> bool:
+        trend = result.get("trend") or [{}]
+        return self.submit("prediction", (
+            self._now(), model_version, crop, state, target_date, quantity,
+            result.get("forecast_price"), trend[0].get("p10"), trend[0].get("p90"),
+            result.get("confidence"), result.get("signal"),
+        ))
+
+    def record_soil(self, request, result: dict, model_version: Optional[str]) -> bool:
+        return self.submit("soil", (
+            self._now(), model_version, request.district, request.nitrogen, request.phosphorus,
+            request.potassium, request.ph, request.rainfall, getattr(request, "lang", None),
+            int(bool(result.get("cultivable"))), json.dumps(result.get("crops", []), ensure_ascii=False),
+            result.get("message"),
+        ))
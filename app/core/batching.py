@@ -0,0 +1,92 @@
+import asyncio
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.metrics import REGISTRY, count_event
+
+BATCH_ROWS = REGISTRY.histogram(
+    "trinetra_inference_batch_rows",
+    "Rows per coalesced model forward pass.",
+    ("model",),
+    buckets=(1, 7, 14, 28, 56, 112, 224, 448, 896, 1792),
+)
+
+
+class InferenceBatcher:
+    """
+    Coalesces concurrent inference requests into one forward pass.
+
+    submit(rows) queues a (k, n_features) block and awaits its slice of the
+    result. The queue is flushed when it holds max_rows rows or when the
+    oldest request has waited max_wait_ms, whichever comes first, so added
+    latency is bounded by max_wait_ms plus one batched pass.
+
+    fn takes the stacked rows and returns an array or a tuple of arrays
+    (None entries allowed) whose first axis follows the rows. With an
+    executor pool (app.core.executors), fn runs there for heavier models;
+    otherwise on the event loop, which is cheaper for the microsecond
+    NumPy pass.
+    """
+
+    def __init__(
+        self,
+        fn: Callable[[np.ndarray], object],
+        max_rows: int = 512,
+        max_wait_ms: float = 2.0,
+        executor=None,
+        name: str = "market",
+    ):
+        self.fn = fn
+        self.max_rows = max_rows
+        self.max_wait_s = max_wait_ms / 1000.0
+        self.executor = executor
+        self.name = name
+        self._pending: List[Tuple[np.ndarray, asyncio.Future]] = []
+        self._pending_rows = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    async def submit(self, rows: np.ndarray):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((np.asarray(rows), future))
+        self._pending_rows += len(rows)
+
+        if self._pending_rows >= self.max_rows:
+            self._flush(loop)
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait_s, self._flush, loop)
+        return await future
+
+    def _flush(self, loop: asyncio.AbstractEventLoop) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending, self._pending_rows = self._pending, [], 0
+        if batch:
+            loop.create_task(self._run(batch))
+
+    async def _run(self, batch: List[Tuple[np.ndarray, asyncio.Future]]) -> None:
+        rows = np.concatenate([r for r, _ in batch])
+        BATCH_ROWS.observe(len(rows), (self.name,))
+        try:
+            if self.executor is not None:
+                out = await self.executor.run(self.fn, rows)
+            else:
+                out = self.fn(rows)
+        except Exception as e:
+            count_event("error", f"{self.name}_batch")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        offset = 0
+        for r, future in batch:
+            lo, offset = offset, offset + len(r)
+            if future.done():  # caller was cancelled meanwhile
+                continue
+            if isinstance(out, tuple):
+                future.set_result(tuple(None if a is None else a[lo:offset] for a in out))
+            else:
+                future.set_result(out[lo:offset])
@@ -36,6 +36,95 @@ class Settings(BaseSettings):
     SOIL_DATA_PATH: Path = DATA_DIR / "soil_database_real.csv"
     MARKET_DATA_PATH: Path = DATA_DIR / "market_history.csv"
     FARMERS_DATA_PATH: Path = DATA_DIR / "farmers.json"
+    FARMS_DATA_PATH: Path = DATA_DIR / "farms.csv"
+    FARM_CROPS_DATA_PATH: Path = DATA_DIR / "farm_crops.csv"
+    # Grid cell of the in-memory farm spatial index (~550 m at the equator)
+    FARM_INDEX_CELL_DEG: float = 0.005
+    # Normalized (UTF-8, typed, header-fixed) copies of the Agmarknet exports
+    MANDI_STORE_DIR: Path = DATA_DIR / "normalized"
+    # Flat binary copies of the market index and model (helper_functions/build_artifacts.py)
+    ARTIFACT_DIR: Path = DATA_DIR / "artifacts"
+    # Pre-downloaded ESA WorldCover tiles (helper_functions/build_landcover.py)
+    LANDCOVER_DIR: Path = DATA_DIR / "landcover"
+    LANDCOVER_CACHE_BLOCKS: int = 256  # 64 KB each
+    # Processes used to parse mandi files in parallel (0 = one per CPU core)
+    INGEST_WORKERS: int = 0
+    # Local tables (materialized forecasts, ...); same SQLite/WAL setup as the KV store
+    DB_PATH: Path = DATA_DIR / "trinetra.db"
+    # Host-wide shared state (OTPs, rate limits) for multi-worker deployments
+    KV_STORE_PATH: Path = DATA_DIR / "shared_state.db"
+
+    # --- Server ---
+    # Uvicorn worker processes outside development (0 = one per CPU core)
+    WORKERS: int = 0
+
+    # --- Profiling (opt-in, off by default) ---
+    # Requests slower than PROFILE_SLOW_MS, plus a PROFILE_SAMPLE_RATE fraction
+    # of all requests, get a collapsed-stack dump in PROFILE_DIR.
+    PROFILE_ENABLED: bool = False
+    PROFILE_SAMPLE_RATE: float = 0.0
+    PROFILE_SLOW_MS: float = 1000.0
+    PROFILE_INTERVAL_MS: float = 5.0
+    PROFILE_DIR: Path = BASE_DIR / "profiles"
+    PROFILE_MAX_BYTES: int = 50 * 1024 * 1024
+
+    # --- Forecast materialization ---
+    FORECAST_SCHEDULE_ENABLED: bool = True
+    FORECAST_HORIZON_DAYS: int = 30
+    FORECAST_REFRESH_HOUR: int = 2  # server local time
+
+    # --- Nightly satellite prefetch (registered farms -> satellite_data) ---
+    SATELLITE_PREFETCH_ENABLED: bool = True
+    SATELLITE_PREFETCH_HOUR: int = 0  # start of the night window, server local time
+    SATELLITE_PREFETCH_WINDOW_H: float = 5.0  # stop (and resume next night) after this long
+    SATELLITE_PREFETCH_BATCH: int = 500  # farms per Earth Engine request
+    SATELLITE_MAX_AGE_DAYS: int = 3  # older readings make credit checks go live
+
+    # --- Incremental credit scoring ---
+    CREDIT_REFRESH_HOUR: int = 6  # after the satellite prefetch window
+    CREDIT_BATCH_SIZE: int = 5000  # farmers scored per SQL/NumPy pass
+
+    # --- Price alerts (matched after each forecast refresh) ---
+    ALERT_EXPIRY_DAYS: int = 7  # a forecast alert is stale once its 7-day trend has passed
+
+    # --- Farmer dashboard (parts fetched concurrently, each under its own deadline) ---
+    DASHBOARD_LOCAL_TIMEOUT_MS: float = 500.0  # local stores: crops, credit score, alerts
+    DASHBOARD_UPSTREAM_TIMEOUT_MS: float = 2500.0  # Earth Engine, Gemini, market inference
+    DASHBOARD_MAX_FARMS: int = 5  # field health is fetched for at most this many farms
+
+    # --- Bulk farmer registration (co-op uploads) ---
+    BULK_REGISTER_MAX_ROWS: int = 100_000
+    BULK_REGISTER_CHUNK_ROWS: int = 10_000  # rows parsed and validated at a time
+
+    # --- Audit trail (batched, written off the request path) ---
+    AUDIT_ENABLED: bool = True
+    AUDIT_QUEUE_SIZE: int = 10_000  # records held in memory; beyond this new ones are dropped
+    AUDIT_BATCH_SIZE: int = 500  # rows per insert transaction
+    AUDIT_FLUSH_MS: float = 1000.0  # max time a record waits when batches are not filling
+
+    # --- Executor pools for blocking service calls (per worker process) ---
+    IO_POOL_SIZE: int = 32  # threads: Earth Engine, Gemini
+    CPU_POOL_SIZE: int = 2  # processes: torch inference; 0 = use the io threads
+
+    # --- Market inference micro-batching ---
+    INFERENCE_BATCH_MAX_ROWS: int = 512  # 7 rows per forecast
+    INFERENCE_BATCH_WAIT_MS: float = 2.0
+
+    # --- Earth Engine call scheduling (per worker process) ---
+    EE_MAX_CONCURRENT: int = 4
+    EE_RATE_PER_S: float = 10.0
+    EE_BURST: int = 20
+    EE_RETRIES: int = 3
+    EE_BACKOFF_BASE_S: float = 0.5
+    EE_BACKOFF_MAX_S: float = 8.0
+    EE_ACQUIRE_TIMEOUT_S: float = 5.0
+    EE_BREAKER_THRESHOLD: int = 5
+    EE_BREAKER_RESET_S: float = 30.0
+
+    # --- Response compression ---
+    COMPRESSION_MIN_BYTES: int = 1024
+    GZIP_LEVEL: int = 6
+    BROTLI_QUALITY: int = 5
 
     class Config:
         env_file = ".env"
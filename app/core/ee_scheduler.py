@@ -0,0 +1,195 @@
+import logging
+import random
+import threading
+import time
+from typing import Callable, Optional, TypeVar
+
+from app.core.metrics import count_event, track
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class UpstreamUnavailable(Exception):
+    """
+    Raised instead of calling upstream. reason is one of:
+    circuit_open, saturated (no free slot), quota (no token in time),
+    upstream_error (retries exhausted).
+    """
+
+    def __init__(self, reason: str, detail: str = ""):
+        super().__init__(f"{reason}: {detail}" if detail else reason)
+        self.reason = reason
+
+
+# -------------------------
+# QUOTA
+# -------------------------
+class TokenBucket:
+    """
+    rate tokens per second, bursts of up to capacity. acquire() blocks
+    for at most timeout seconds; the quota is per process, so with N
+    workers each gets its share of the account limit.
+    """
+
+    def __init__(self, rate: float, capacity: float, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.capacity = capacity
+        self._clock = clock
+        self._tokens = capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, timeout: float = 0.0, sleep: Callable[[float], None] = time.sleep) -> bool:
+        deadline = self._clock() + timeout
+        while True:
+            with self._lock:
+                now = self._clock()
+                self._refill(now)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate
+            if now + wait > deadline:
+                return False
+            sleep(wait)
+
+
+# -------------------------
+# CIRCUIT BREAKER
+# -------------------------
+class CircuitBreaker:
+    """
+    Opens after `threshold` consecutive failures and fails fast for
+    reset_after seconds. Then one probe call is let through (half-open):
+    success closes the circuit, failure re-opens it.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, threshold: int = 5, reset_after: float = 30.0, clock: Callable[[], float] = time.monotonic):
+        self.threshold = threshold
+        self.reset_after = reset_after
+        self._clock = clock
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self.state = self.CLOSED
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and self._clock() - self._opened_at >= self.reset_after:
+                self.state = self.HALF_OPEN
+                self._probing = False
+            if self.state == self.HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def release_probe(self) -> None:
+        """The half-open probe never reached upstream; let the next call probe."""
+        with self._lock:
+            self._probing = False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._probing = False
+            self.state = self.CLOSED
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._probing = False
+            if self.state == self.HALF_OPEN or self._failures >= self.threshold:
+                if self.state != self.OPEN:
+                    logger.warning(f"⚡ Circuit opened after {self._failures} failures")
+                self.state = self.OPEN
+                self._opened_at = self._clock()
+
+
+# -------------------------
+# SCHEDULER
+# -------------------------
+class EEScheduler:
+    """
+    Gate for outbound Earth Engine calls:
+      1. circuit breaker  - fail fast while EE is known to be down
+      2. concurrency cap  - at most max_concurrent calls in flight
+      3. token bucket     - stay under the request quota
+      4. retries          - exponential backoff with full jitter
+    Callers get the result or UpstreamUnavailable with the reason, which
+    they report when serving simulated data instead.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = 4,
+        rate_per_s: float = 10.0,
+        burst: int = 20,
+        retries: int = 3,
+        backoff_base_s: float = 0.5,
+        backoff_max_s: float = 8.0,
+        acquire_timeout_s: float = 5.0,
+        breaker: Optional[CircuitBreaker] = None,
+        sleep: Callable[[float], None] = time.sleep,
+        rng: Optional[random.Random] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._slots = threading.BoundedSemaphore(max_concurrent)
+        self.bucket = TokenBucket(rate_per_s, burst, clock=clock)
+        self.breaker = breaker or CircuitBreaker(clock=clock)
+        self.retries = retries
+        self.backoff_base_s = backoff_base_s
+        self.backoff_max_s = backoff_max_s
+        self.acquire_timeout_s = acquire_timeout_s
+        self._sleep = sleep
+        self._rng = rng or random.Random()
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter delay before retry number `attempt` (1-based)."""
+        cap = min(self.backoff_max_s, self.backoff_base_s * (2 ** (attempt - 1)))
+        return self._rng.uniform(0, cap)
+
+    def _attempt(self, fn: Callable[[], T], upstream: str) -> T:
+        if not self._slots.acquire(timeout=self.acquire_timeout_s):
+            raise UpstreamUnavailable("saturated", f"{upstream}: no free slot")
+        try:
+            if not self.bucket.acquire(self.acquire_timeout_s, sleep=self._sleep):
+                raise UpstreamUnavailable("quota", f"{upstream}: rate limit")
+            with track(upstream):
+                return fn()
+        finally:
+            self._slots.release()
+
+    def run(self, fn: Callable[[], T], upstream: str = "ee_getinfo") -> T:
+        if not self.breaker.allow():
+            raise UpstreamUnavailable("circuit_open", upstream)
+
+        last_error: Optional[Exception] = None
+        for attempt in range(self.retries + 1):
+            if attempt:
+                count_event("retry", upstream)
+                self._sleep(self.backoff(attempt))
+            try:
+                result = self._attempt(fn, upstream)
+            except UpstreamUnavailable:
+                # Local back-pressure: retrying would only queue more work
+                self.breaker.release_probe()
+                raise
+            except Exception as e:
+                last_error = e
+                continue
+            self.breaker.record_success()
+            return result
+
+        self.breaker.record_failure()
+        raise UpstreamUnavailable("upstream_error", str(last_error))
@@ -0,0 +1,122 @@
+import asyncio
+import functools
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import BrokenExecutor, Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Optional, TypeVar
+
+from app.core.config import settings
+from app.core.metrics import REGISTRY, count_event
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+POOL_TASKS = REGISTRY.gauge(
+    "trinetra_executor_tasks",
+    "Service calls handed to an executor pool, by pool and state (queued/running).",
+    ("pool", "state"),
+)
+
+
+class ExecutorPool:
+    """
+    A named, lazily created executor for blocking service calls.
+
+      io   threads    upstream calls that mostly wait (Earth Engine, Gemini, files)
+      cpu  processes  model math that holds the GIL
+
+    Each pool has its own size, so a burst of slow Gemini calls can use up
+    the io pool without delaying forecasts, and neither blocks the event
+    loop. Tasks beyond the pool size wait in the executor's queue; that
+    depth is exported as trinetra_executor_tasks{state="queued"}.
+
+    The size is read from settings when the executor is first used. A
+    process pool of size 0 hands its work to `fallback` instead. An
+    executor that breaks (a worker process died) is discarded, so the next
+    call starts a fresh one instead of failing until restart.
+    """
+
+    def __init__(self, name: str, size_setting: str, processes: bool = False,
+                 fallback: Optional["ExecutorPool"] = None):
+        self.name = name
+        self.size_setting = size_setting
+        self.processes = processes
+        self.fallback = fallback
+        self.size = 0
+        self._executor: Optional[Executor] = None
+        self._inflight = 0
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        """Whether this pool runs work itself (size > 0) rather than handing it on."""
+        return int(getattr(settings, self.size_setting)) > 0
+
+    def _get_executor(self) -> Optional[Executor]:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self.size = int(getattr(settings, self.size_setting))
+                    if self.size <= 0:
+                        return None
+                    if self.processes:
+                        # spawn: forking a process that runs an event loop and threads is unsafe
+                        self._executor = ProcessPoolExecutor(
+                            self.size, mp_context=multiprocessing.get_context("spawn")
+                        )
+                    else:
+                        self._executor = ThreadPoolExecutor(self.size, thread_name_prefix=f"trinetra-{self.name}")
+                    logger.info(f"🧵 {self.name} pool: {self.size} {'processes' if self.processes else 'threads'}")
+        return self._executor
+
+    def _account(self, delta: int) -> None:
+        with self._lock:
+            self._inflight += delta
+            running = min(self._inflight, self.size)
+            POOL_TASKS.set(running, (self.name, "running"))
+            POOL_TASKS.set(self._inflight - running, (self.name, "queued"))
+
+    async def run(self, fn: Callable[..., T], *args, **kwargs) -> T:
+        executor = self._get_executor()
+        if executor is None:
+            if self.fallback is None:
+                return fn(*args, **kwargs)
+            return await self.fallback.run(fn, *args, **kwargs)
+
+        self._account(+1)
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                executor, functools.partial(fn, *args, **kwargs)
+            )
+        except BrokenExecutor:
+            self._discard(executor)
+            raise
+        finally:
+            self._account(-1)
+
+    def _discard(self, executor: Executor) -> None:
+        """Drop a broken executor (once, however many calls saw it break)."""
+        with self._lock:
+            if self._executor is not executor:
+                return
+            self._executor = None
+        count_event("error", f"{self.name}_pool")
+        logger.error(f"❌ {self.name} pool broke (a worker died); starting a new one on the next call")
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+
+IO_POOL = ExecutorPool("io", "IO_POOL_SIZE")
+CPU_POOL = ExecutorPool("cpu", "CPU_POOL_SIZE", processes=True, fallback=IO_POOL)
+
+
+def shutdown_pools(wait: bool = True) -> None:
+    for pool in (CPU_POOL, IO_POOL):
+        pool.shutdown(wait=wait)
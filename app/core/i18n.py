@@ -0,0 +1,66 @@
+import json
+import logging
+from pathlib import Path
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Tuple
+
+logger = logging.getLogger(__name__)
+
+CATALOG_PATH = Path(__file__).resolve().parent / "messages.json"
+DEFAULT_LANG = "en"
+
+
+# -------------------------
+# CATALOG
+# -------------------------
+# messages.json maps message_id -> {lang: text}, plus "_fallback": {lang: [langs]}
+# for languages that should borrow another one before English (e.g. Marathi
+# readers get Hindi rather than English). Every (message_id, lang) pair is
+# resolved through its chain once at import, so a lookup is one dict get and
+# adding a language is a JSON edit.
+
+def _chain(lang: str, fallbacks: Dict[str, List[str]]) -> List[str]:
+    chain = [lang, *fallbacks.get(lang, []), DEFAULT_LANG]
+    return list(dict.fromkeys(chain))
+
+
+def _compile(raw: Dict) -> Tuple[Mapping[Tuple[str, str], str], frozenset]:
+    fallbacks = raw.pop("_fallback", {})
+    languages = {lang for texts in raw.values() for lang in texts} | set(fallbacks)
+
+    table = {}
+    for message_id, texts in raw.items():
+        if DEFAULT_LANG not in texts:
+            logger.warning(f"⚠️ Message '{message_id}' has no '{DEFAULT_LANG}' text")
+        for lang in languages:
+            for candidate in _chain(lang, fallbacks):
+                if candidate in texts:
+                    table[(message_id, lang)] = texts[candidate]
+                    break
+    return MappingProxyType(table), frozenset(languages)
+
+
+def load_catalog(path: Path = CATALOG_PATH) -> Tuple[Mapping[Tuple[str, str], str], frozenset]:
+    with open(path, "r", encoding="utf-8") as f:
+        return _compile(json.load(f))
+
+
+MESSAGES, LANGUAGES = load_catalog()
+
+
+def normalize_lang(lang) -> str:
+    """"hi-IN", "HI", None -> "hi" / "en"; unknown languages become DEFAULT_LANG."""
+    code = str(lang or DEFAULT_LANG).lower().replace("_", "-").split("-")[0]
+    return code if code in LANGUAGES else DEFAULT_LANG
+
+
+def t(message_id: str, lang: str = DEFAULT_LANG, **params) -> str:
+    """
+    Text of message_id in lang (via its fallback chain), formatted with params.
+    Unknown ids return the id itself so a missing entry shows up in the UI
+    instead of raising inside a request.
+    """
+    text = MESSAGES.get((message_id, lang))
+    if text is None:
+        text = MESSAGES.get((message_id, normalize_lang(lang)), message_id)
+    return text.format(**params) if params else text
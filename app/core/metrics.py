@@ -0,0 +1,286 @@
+import bisect
+import threading
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+
+# -------------------------
+# BUCKETS
+# -------------------------
+# Seconds. Covers sub-millisecond cache hits up to slow Earth Engine calls.
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Counter:
+    """Monotonic counter, one series per label-value tuple."""
+
+    TYPE = "counter"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels: Tuple[str, ...] = (), amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, labels: Tuple[str, ...] = ()) -> float:
+        return self._values.get(labels, 0.0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, k)} {v:g}" for k, v in items]
+
+
+class Gauge:
+    """Value that goes up and down (queue depth, in-flight work), one series per label tuple."""
+
+    TYPE = "gauge"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def set(self, value: float, labels: Tuple[str, ...] = ()) -> None:
+        with self._lock:
+            self._values[labels] = value
+
+    def inc(self, labels: Tuple[str, ...] = (), amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def dec(self, labels: Tuple[str, ...] = (), amount: float = 1.0) -> None:
+        self.inc(labels, -amount)
+
+    def value(self, labels: Tuple[str, ...] = ()) -> float:
+        return self._values.get(labels, 0.0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, k)} {v:g}" for k, v in items]
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram.
+    Each series is a flat list: [bucket counts..., +Inf count, sum].
+    Observing is one bisect and two list writes under an uncontended lock.
+    """
+
+    TYPE = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, labels: Tuple[str, ...] = ()) -> None:
+        idx = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0.0] * (len(self.buckets) + 2)
+            series[idx] += 1
+            series[-1] += value
+
+    def count(self, labels: Tuple[str, ...] = ()) -> int:
+        series = self._series.get(labels)
+        return int(sum(series[:-1])) if series else 0
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._series.items())
+
+        lines = []
+        for labels, series in items:
+            cumulative = 0.0
+            for bound, hits in zip(self.buckets, series):
+                cumulative += hits
+                le = _format_labels(self.labelnames, labels, f'le="{bound:g}"')
+                lines.append(f"{self.name}_bucket{le} {cumulative:g}")
+            cumulative += series[-2]
+            le = _format_labels(self.labelnames, labels, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{le} {cumulative:g}")
+            plain = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{plain} {series[-1]:.6f}")
+            lines.append(f"{self.name}_count{plain} {cumulative:g}")
+        return lines
+
+
+class MetricsRegistry:
+    """Holds every metric of the process and renders the Prometheus text format."""
+
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name: str, *args, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Metric {name} already registered as {metric.TYPE}")
+            return metric
+
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._get_or_create(Counter, name, help_text, labelnames)
+
+    def gauge(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._get_or_create(Gauge, name, help_text, labelnames)
+
+    def histogram(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._get_or_create(Histogram, name, help_text, labelnames, buckets)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.TYPE}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+# -------------------------
+# STANDARD METRICS
+# -------------------------
+HTTP_LATENCY = REGISTRY.histogram(
+    "trinetra_http_request_duration_seconds",
+    "HTTP request latency by route template.",
+    ("method", "route", "status"),
+)
+
+UPSTREAM_LATENCY = REGISTRY.histogram(
+    "trinetra_upstream_call_duration_seconds",
+    "Latency of calls to Earth Engine, Gemini, torch inference and file reads.",
+    ("upstream",),
+)
+
+EVENTS = REGISTRY.counter(
+    "trinetra_events_total",
+    "Fallback, cache-hit and error events by source.",
+    ("event", "source"),
+)
+
+
+MOCKED = REGISTRY.counter(
+    "trinetra_mocked_responses_total",
+    "Responses served from simulated data, by source and reason.",
+    ("source", "reason"),
+)
+
+
+def count_event(event: str, source: str) -> None:
+    """Increment an event counter, e.g. count_event("fallback", "market")."""
+    EVENTS.inc((event, source))
+
+
+def count_mock(source: str, reason: str) -> None:
+    """Record why a response was simulated, e.g. count_mock("gee", "circuit_open")."""
+    MOCKED.inc((source, reason))
+
+
+class track:
+    """
+    Times one upstream call into UPSTREAM_LATENCY.
+    Exceptions are counted as ("error", upstream) and re-raised.
+
+        with track("ee_getinfo"):
+            value = image.getInfo()
+    """
+
+    __slots__ = ("_labels", "_start")
+
+    def __init__(self, upstream: str):
+        self._labels = (upstream,)
+        self._start = 0.0
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        UPSTREAM_LATENCY.observe(time.perf_counter() - self._start, self._labels)
+        if exc_type is not None:
+            EVENTS.inc(("error", self._labels[0]))
+        return False
+
+
+# -------------------------
+# ASGI MIDDLEWARE
+# -------------------------
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording one histogram sample per HTTP request.
+    Labels use the matched route template (e.g. /api/analyze/market), never
+    the raw path, so cardinality stays bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_holder: List[int] = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status_holder[0] = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            route = scope.get("route")
+            template: Optional[str] = getattr(route, "path", None) or "unmatched"
+            status = status_holder[0]
+            HTTP_LATENCY.observe(elapsed, (scope["method"], template, str(status)))
+            if status >= 500:
+                EVENTS.inc(("error", "http"))
@@ -0,0 +1,198 @@
+import asyncio
+import json
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.parse import parse_qsl
+
+logger = logging.getLogger(__name__)
+
+# Leaf frames that mean "this thread is parked", not doing request work.
+_IDLE_LEAVES = {
+    ("selectors.py", "select"),
+    ("threading.py", "wait"),
+    ("queue.py", "get"),
+}
+_MAX_BODY_BYTES = 2048
+# JSON body fields that may appear in a dump's filename. Only what identifies
+# the workload: bodies also carry phones, OTPs and names, which must not be
+# written to disk.
+_BODY_KEYS = ("crop_name", "state", "district", "target_date_str")
+_SLUG_RE = re.compile(r"[^A-Za-z0-9=.\-]+")
+
+
+def _slug(text: str, limit: int = 80) -> str:
+    return _SLUG_RE.sub("-", text).strip("-")[:limit] or "root"
+
+
+class StackSampler:
+    """
+    Background thread that snapshots every Python thread's stack at a fixed
+    interval while at least one request is being profiled.
+    Parks on an Event when nothing is registered, so idle cost is zero.
+    """
+
+    def __init__(self, interval_s: float):
+        self.interval_s = interval_s
+        self._active: Dict[int, Counter] = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self, token: int) -> Counter:
+        stacks: Counter = Counter()
+        with self._lock:
+            self._active[token] = stacks
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="trinetra-profiler", daemon=True
+                )
+                self._thread.start()
+        self._wake.set()
+        return stacks
+
+    def stop(self, token: int) -> Counter:
+        with self._lock:
+            stacks = self._active.pop(token, Counter())
+            if not self._active:
+                self._wake.clear()
+        return stacks
+
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        while True:
+            self._wake.wait()
+            time.sleep(self.interval_s)
+            names = {t.ident: t.name for t in threading.enumerate()}
+            collapsed = []
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                code = frame.f_code
+                if (os.path.basename(code.co_filename), code.co_name) in _IDLE_LEAVES:
+                    continue
+                parts = []
+                while frame is not None:
+                    code = frame.f_code
+                    parts.append(
+                        f"{os.path.basename(code.co_filename)}:{code.co_name}:{frame.f_lineno}"
+                    )
+                    frame = frame.f_back
+                parts.append(names.get(thread_id, str(thread_id)))
+                collapsed.append(";".join(reversed(parts)))
+
+            with self._lock:
+                for stacks in self._active.values():
+                    stacks.update(collapsed)
+
+
+class ProfilingMiddleware:
+    """
+    Opt-in sampling profiler for slow requests.
+
+    Every request is tracked while PROFILE_SLOW_MS > 0; a PROFILE_SAMPLE_RATE
+    fraction is additionally dumped regardless of latency. Dumps are
+    collapsed-stack files (flamegraph.pl / speedscope compatible) named after
+    the route and its parameters (path, query and a few whitelisted body
+    fields, never credentials), and the directory is pruned oldest-first to
+    stay under PROFILE_MAX_BYTES.
+    """
+
+    def __init__(
+        self,
+        app,
+        output_dir: Path,
+        slow_ms: float = 1000.0,
+        sample_rate: float = 0.0,
+        interval_ms: float = 5.0,
+        max_bytes: int = 50 * 1024 * 1024,
+    ):
+        self.app = app
+        self.output_dir = Path(output_dir)
+        self.slow_s = slow_ms / 1000.0 if slow_ms > 0 else None
+        self.sample_rate = sample_rate
+        self.max_bytes = max_bytes
+        self.sampler = StackSampler(interval_ms / 1000.0)
+        self._rng = random.Random()
+        self._next_token = 0
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        sampled = self.sample_rate > 0 and self._rng.random() < self.sample_rate
+        if not sampled and self.slow_s is None:
+            await self.app(scope, receive, send)
+            return
+
+        self._next_token += 1
+        token = self._next_token
+        body = bytearray()
+
+        async def receive_wrapper():
+            message = await receive()
+            if message["type"] == "http.request" and len(body) < _MAX_BODY_BYTES:
+                body.extend(message.get("body", b"")[: _MAX_BODY_BYTES - len(body)])
+            return message
+
+        self.sampler.start(token)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive_wrapper, send)
+        finally:
+            elapsed = time.perf_counter() - start
+            stacks = self.sampler.stop(token)
+            if stacks and (sampled or elapsed >= self.slow_s):
+                name = self._filename(scope, bytes(body), elapsed)
+                loop = asyncio.get_running_loop()
+                loop.run_in_executor(None, self._write, name, stacks)
+
+    # -------------------------
+    # DUMP HELPERS
+    # -------------------------
+    def _filename(self, scope, body: bytes, elapsed: float) -> str:
+        route = getattr(scope.get("route"), "path", None) or scope.get("path", "")
+        params: List[str] = [f"{k}={v}" for k, v in scope.get("path_params", {}).items()]
+        params += [f"{k}={v}" for k, v in parse_qsl(scope.get("query_string", b"").decode("latin-1"))]
+        if body:
+            try:
+                payload = json.loads(body)
+                if isinstance(payload, dict):
+                    params += [
+                        f"{k}={payload[k]}" for k in _BODY_KEYS
+                        if isinstance(payload.get(k), (str, int, float, bool))
+                    ]
+            except ValueError:
+                pass
+
+        stamp = time.strftime("%Y%m%dT%H%M%S")
+        return (
+            f"{stamp}_{scope['method']}_{_slug(route)}_{_slug('_'.join(params), 120)}"
+            f"_{int(elapsed * 1000)}ms.collapsed"
+        )
+
+    def _write(self, name: str, stacks: Counter) -> None:
+        try:
+            self.output_dir.mkdir(parents=True, exist_ok=True)
+            lines = [f"{stack} {count}" for stack, count in stacks.most_common()]
+            (self.output_dir / name).write_text("\n".join(lines) + "\n", encoding="utf-8")
+            self._enforce_budget()
+            logger.info(f"🔥 Profile written: {name}")
+        except Exception as e:
+            logger.error(f"Profile dump failed: {e}")
+
+    def _enforce_budget(self) -> None:
+        files = sorted(self.output_dir.glob("*.collapsed"), key=lambda p: p.stat().st_mtime)
+        total = sum(p.stat().st_size for p in files)
+        while files and total > self.max_bytes:
+            oldest = files.pop(0)
+            total -= oldest.stat().st_size
+            oldest.unlink(missing_ok=True)
@@ -0,0 +1,142 @@
+import datetime
+from typing import Any, Optional
+
+from fastapi.responses import JSONResponse, Response
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipResponder, IdentityResponder
+from starlette.requests import Request
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+# Optional accelerators: each one only changes how bytes are produced, so the
+# API keeps working (plain json / gzip / JSON-only) when it is not installed.
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover
+    msgpack = None
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+MSGPACK_TYPES = ("application/msgpack", "application/x-msgpack")
+
+
+# -------------------------
+# SERIALIZATION
+# -------------------------
+class FastJSONResponse(JSONResponse):
+    """
+    JSONResponse rendered by orjson when available: several times faster
+    than json.dumps on the location and history payloads, and it writes
+    numpy arrays/scalars and dates natively.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if orjson is None:
+            return super().render(content)
+        return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+
+
+def _msgpack_default(obj):
+    if isinstance(obj, (datetime.date, datetime.datetime)):
+        return obj.isoformat()
+    if hasattr(obj, "tolist"):  # numpy arrays and scalars
+        return obj.tolist()
+    raise TypeError(f"Cannot serialize {type(obj).__name__}")
+
+
+class MsgPackResponse(Response):
+    media_type = "application/msgpack"
+
+    def render(self, content: Any) -> bytes:
+        return msgpack.packb(content, default=_msgpack_default, use_bin_type=True)
+
+
+def wants_msgpack(request: Request) -> bool:
+    if msgpack is None:
+        return False
+    accept = request.headers.get("accept", "")
+    return any(t in accept for t in MSGPACK_TYPES)
+
+
+def negotiated_response(request: Request, content: Any, status_code: int = 200) -> Response:
+    """
+    Encode content for the client: MessagePack when the Accept header asks
+    for it, JSON otherwise. Returning the Response directly also skips
+    FastAPI's jsonable_encoder walk, which dominates on large payloads.
+    """
+    if wants_msgpack(request):
+        return MsgPackResponse(content, status_code=status_code)
+    return FastJSONResponse(content, status_code=status_code)
+
+
+# -------------------------
+# COMPRESSION
+# -------------------------
+def accepted_encodings(header: str) -> set:
+    """Codings in an Accept-Encoding header, minus any sent with q=0."""
+    codings = set()
+    for part in header.lower().split(","):
+        coding, _, params = part.strip().partition(";")
+        q = params.strip()
+        try:
+            if q.startswith("q=") and float(q[2:]) == 0:
+                continue
+        except ValueError:
+            pass
+        if coding:
+            codings.add(coding.strip())
+    return codings
+
+
+class BrotliResponder(IdentityResponder):
+    content_encoding = "br"
+
+    def __init__(self, app: ASGIApp, minimum_size: int, quality: int = 5):
+        super().__init__(app, minimum_size)
+        self.quality = quality
+        self._compressor = None
+
+    async def apply_compression(self, body: bytes, *, more_body: bool) -> bytes:
+        if self._compressor is None:
+            self._compressor = brotli.Compressor(quality=self.quality)
+        out = self._compressor.process(body)
+        return out + (self._compressor.flush() if more_body else self._compressor.finish())
+
+
+class CompressionMiddleware:
+    """
+    Compresses responses of at least minimum_size bytes. Brotli is used
+    when the client accepts it and the module is installed (it packs our
+    repetitive JSON tighter than gzip), gzip otherwise. Small responses go
+    out as-is: below a packet or two the CPU is not worth it.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 5):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        codings = accepted_encodings(Headers(scope=scope).get("accept-encoding", ""))
+        responder: Optional[ASGIApp] = None
+        if brotli is not None and "br" in codings:
+            responder = BrotliResponder(self.app, self.minimum_size, quality=self.brotli_quality)
+        elif "gzip" in codings:
+            responder = GZipResponder(self.app, self.minimum_size, compresslevel=self.gzip_level)
+
+        if responder is None:
+            await self.app(scope, receive, send)
+        else:
+            await responder(scope, receive, send)
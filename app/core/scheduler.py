@@ -0,0 +1,111 @@
+import asyncio
+import datetime
+import logging
+from typing import Callable, Optional
+
+from app.core.metrics import count_event
+from app.repositories.kv_store import KVStore
+
+logger = logging.getLogger(__name__)
+
+
+class DailyJob:
+    """
+    Runs a blocking job once a day at hour:minute (server local time), and
+    once at startup when run_on_start is set. The job runs in the default
+    thread pool so the event loop keeps serving requests.
+
+    With several uvicorn workers every process schedules the job, but only
+    the first to claim "<name>:<day>:<version>" in the shared KV store runs
+    it. version() lets a new model trigger a same-day rerun. A run that
+    fails gives its claim back, and is retried every retry_s until it
+    succeeds or the next day's run is due.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        job: Callable[[], object],
+        kv: KVStore,
+        hour: int = 2,
+        minute: int = 0,
+        run_on_start: bool = True,
+        version: Optional[Callable[[], str]] = None,
+        retry_s: float = 900.0,
+    ):
+        self.name = name
+        self.job = job
+        self.kv = kv
+        self.hour = hour
+        self.minute = minute
+        self.run_on_start = run_on_start
+        self.version = version or (lambda: "")
+        self.retry_s = retry_s
+        self._task: Optional[asyncio.Task] = None
+
+    # -------------------------
+    # LIFECYCLE
+    # -------------------------
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def seconds_until_next_run(self, now: Optional[datetime.datetime] = None) -> float:
+        now = now or datetime.datetime.now()
+        target = now.replace(hour=self.hour, minute=self.minute, second=0, microsecond=0)
+        if target <= now:
+            target += datetime.timedelta(days=1)
+        return (target - now).total_seconds()
+
+    # -------------------------
+    # EXECUTION
+    # -------------------------
+    def _claim(self) -> Optional[str]:
+        """Today's claim key if this process won the run for the current version, else None."""
+        key = f"{self.name}:{datetime.date.today().isoformat()}:{self.version()}"
+        with self.kv.transaction():
+            if self.kv.get(key):
+                return None
+            self.kv.set(key, True, ttl=2 * 86400)
+        return key
+
+    async def run_once(self) -> bool:
+        """False if the job failed (its claim is released so it can be retried)."""
+        loop = asyncio.get_running_loop()
+        key = None
+        try:
+            key = await loop.run_in_executor(None, self._claim)
+            if key is None:
+                logger.info(f"⏭️ {self.name}: already run today by another worker")
+                return True
+            started = loop.time()
+            result = await loop.run_in_executor(None, self.job)
+            logger.info(f"🗓️ {self.name} finished in {loop.time() - started:.1f}s ({result})")
+            return True
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            count_event("error", "scheduler")
+            logger.error(f"❌ Scheduled job {self.name} failed: {e}")
+            if key is not None:
+                try:
+                    await loop.run_in_executor(None, self.kv.delete, key)
+                except Exception as release_error:
+                    logger.error(f"❌ {self.name}: could not release claim {key}: {release_error}")
+            return False
+
+    async def _loop(self) -> None:
+        ok = await self.run_once() if self.run_on_start else True
+        while True:
+            wait = self.seconds_until_next_run()
+            await asyncio.sleep(wait if ok else min(self.retry_s, wait))
+            ok = await self.run_once()
@@ -1,25 +1,86 @@
+import asyncio
 import logging
+from contextlib import asynccontextmanager
+from datetime import date
 from typing import Optional
-from fastapi import FastAPI
+from fastapi import FastAPI, File, Query, Request, UploadFile
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.responses import PlainTextResponse
+from pydantic import BaseModel, Field
 from fastapi import HTTPException
 
 # Import services
 from app.services.gee_service import GEEService
 from app.services.soil_service import SoilService
 from app.services.market_service import MarketService
+from app.services.farm_service import FarmService
+from app.services.credit_service import CreditScoringService
+from app.services.alert_service import AlertService
 from app.models.schemas import Location
 from app.models.schemas import SoilRequest as InternalSoilRequest
 from app.models.schemas import LoginRequest, OTPVerify, FarmerRegister
+from app.models.schemas import MarketHistoryResponse
 from app.services.auth_service import AuthService
+from app.core.config import settings
+from app.core.audit import AuditWriter
+from app.core.executors import IO_POOL, shutdown_pools
+from app.core.metrics import REGISTRY, MetricsMiddleware
+from app.core.profiling import ProfilingMiddleware
+from app.core.responses import CompressionMiddleware, FastJSONResponse, negotiated_response
+from app.core.scheduler import DailyJob
+from app.repositories.kv_store import KVStore
+from app.repositories.audit_store import AuditStore
 
 # --- LOGGING ---
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("trinetra")
 
+# --- BACKGROUND JOBS ---
+def refresh_forecasts_and_alerts() -> str:
+    # Alerts are matched against the freshly materialized forecasts, so they run as one job
+    rows = market_service.refresh_forecasts()
+    return f"{rows} forecast rows; " + alert_service.dispatch(market_service.forecast_signals())
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    jobs = []
+    jobs_kv = KVStore(settings.KV_STORE_PATH, "jobs")
+    if settings.FORECAST_SCHEDULE_ENABLED:
+        # Looked up on every run (not bound once) so a swapped service is picked up
+        jobs.append(DailyJob(
+            "market_forecasts",
+            refresh_forecasts_and_alerts,
+            kv=jobs_kv,
+            hour=settings.FORECAST_REFRESH_HOUR,
+            version=lambda: market_service.model_version or "",
+        ))
+    if settings.SATELLITE_PREFETCH_ENABLED:
+        jobs.append(DailyJob(
+            "satellite_prefetch",
+            lambda: gee_service.prefetch_field_health(farm_service.index, jobs_kv),
+            kv=jobs_kv,
+            hour=settings.SATELLITE_PREFETCH_HOUR,
+            run_on_start=False,  # night window only: daytime EE quota is for live credit checks
+        ))
+    # Incremental: costs time in proportion to what changed since the last run
+    jobs.append(DailyJob(
+        "credit_scores",
+        lambda: credit_service.refresh(),
+        kv=jobs_kv,
+        hour=settings.CREDIT_REFRESH_HOUR,
+    ))
+    for job in jobs:
+        job.start()
+    yield
+    for job in jobs:
+        await job.stop()
+    # Before the pools go: the final flush writes through IO_POOL
+    if audit_writer is not None:
+        await audit_writer.stop()
+    shutdown_pools(wait=False)
+
 # --- APP SETUP ---
-app = FastAPI(title="TriNetra API", version="2.0.0")
+app = FastAPI(title="TriNetra API", version="2.0.0", lifespan=lifespan, default_response_class=FastJSONResponse)
 
 # --- CORS (Allow Frontend to talk to Backend) ---
 app.add_middleware(
@@ -30,17 +91,50 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# --- PROFILING (Opt-in flame dumps for slow requests) ---
+if settings.PROFILE_ENABLED:
+    app.add_middleware(
+        ProfilingMiddleware,
+        output_dir=settings.PROFILE_DIR,
+        slow_ms=settings.PROFILE_SLOW_MS,
+        sample_rate=settings.PROFILE_SAMPLE_RATE,
+        interval_ms=settings.PROFILE_INTERVAL_MS,
+        max_bytes=settings.PROFILE_MAX_BYTES,
+    )
+
+# --- COMPRESSION (gzip/brotli above a size threshold; inside metrics so its cost is measured) ---
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MIN_BYTES,
+    gzip_level=settings.GZIP_LEVEL,
+    brotli_quality=settings.BROTLI_QUALITY,
+)
+
+# --- METRICS (Per-route latency histograms) ---
+app.add_middleware(MetricsMiddleware)
+
 # --- SERVICES ---
 gee_service = GEEService()
 soil_service = SoilService()
 market_service = MarketService()
 auth_service = AuthService()
+farm_service = FarmService()
+credit_service = CreditScoringService()
+alert_service = AlertService()
+audit_writer = AuditWriter(
+    AuditStore(settings.DB_PATH),
+    max_queue=settings.AUDIT_QUEUE_SIZE,
+    batch_size=settings.AUDIT_BATCH_SIZE,
+    flush_interval_s=settings.AUDIT_FLUSH_MS / 1000,
+    executor=IO_POOL,
+) if settings.AUDIT_ENABLED else None
 
 # --- INPUT MODELS ---
 class CreditRequest(BaseModel):
     lat: float
     lng: float
-    claimed_yield: Optional[float] = None
+    claimed_yield: Optional[float] = Field(None, gt=0)  # quintals
+    farmer_id: Optional[str] = None  # claimant; matches their own farm first
 
 class MarketRequest(BaseModel):
     crop_name: str
@@ -48,6 +142,15 @@ class MarketRequest(BaseModel):
     quantity: float
     target_date_str: str
 
+class AlertSubscription(BaseModel):
+    farmer_id: str
+    crop_name: str
+    state: str
+    kind: str  # "above" / "below" a price, or "signal"
+    threshold: Optional[float] = None  # Rs/quintal, for above/below
+    signal: Optional[str] = None  # HOLD / SELL / STABLE; omit for any change
+    lang: str = "en"
+
 class SoilRequest(BaseModel):
     district: str = "Unknown"
     nitrogen: float
@@ -63,26 +166,86 @@ class SoilRequest(BaseModel):
 def root():
     return {"status": "TriNetra Intelligence Core Online", "port": 8000}
 
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus scrape endpoint."""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
 # ✅ 1. MARKET LOCATIONS (The Missing Link)
 @app.get("/api/market/locations")
-def get_market_locations():
+def get_market_locations(request: Request):
     logger.info("📡 Frontend requested Locations...")
-    return market_service.get_market_locations()
+    return negotiated_response(request, market_service.get_market_locations())
+
+# 1b. MARKET PRICE HISTORY (Chart data)
+@app.get("/api/market/history", response_model=MarketHistoryResponse)
+def get_market_history(
+    request: Request,
+    crop: str,
+    state: str,
+    market: Optional[str] = None,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    interval: str = Query("daily", pattern="^(daily|weekly|monthly)$"),
+):
+    history = market_service.get_price_history(crop, state, market, start, end, interval)
+    if history is None:
+        raise HTTPException(status_code=404, detail=f"No price history for {crop} in {state}")
+    return negotiated_response(
+        request, {"crop_name": crop, "state": state, "market": market, "interval": interval, "history": history}
+    )
 
 # 2. MARKET PREDICTION
 @app.post("/api/analyze/market")
 async def analyze_market(data: MarketRequest):
     logger.info(f"Market Analysis: {data.crop_name} in {data.state}")
-    return market_service.predict_price(
+    result = await market_service.predict_price_async(
         data.crop_name, data.state, data.quantity, data.target_date_str
     )
+    # Audit what was served (queued only; written in batches off the request path);
+    # simulated prices are never attributed to the model
+    if audit_writer is not None and result.get("trend"):
+        audit_writer.record_prediction(
+            data.crop_name, data.state, data.target_date_str, data.quantity, result,
+            market_service.model_version if result.get("source") == "model" else "simulation",
+        )
+    return result
 
 # 3. CREDIT ANALYSIS
+# Earth Engine calls block (and may back off), so they run in the io pool
 @app.post("/api/analyze/credit")
 async def analyze_credit(data: CreditRequest):
     logger.info(f"Credit Analysis: {data.lat}, {data.lng}")
     loc = Location(lat=data.lat, lng=data.lng)
-    return gee_service.get_field_health(loc, claimed_yield=data.claimed_yield)
+    # Which registered farm this is, and whether other farmers claim the same field
+    claim = farm_service.match_claim(data.lat, data.lng, data.farmer_id)
+    # Registered farms are usually served from the nightly prefetch; the rest go live
+    result = await IO_POOL.run(
+        gee_service.get_field_health, loc, claimed_yield=data.claimed_yield, farm_id=claim["farm_id"]
+    )
+    result.update(claim)
+    # A claimed yield against real satellite data feeds the farmer's next credit score
+    if data.farmer_id and data.claimed_yield and result["status"] == "SUCCESS" and "mock_reason" not in result:
+        await IO_POOL.run(credit_service.record_claim, data.farmer_id, data.claimed_yield, result["ndvi"])
+    return result
+
+# 3c. CURRENT CREDIT SCORE (maintained by the daily incremental refresh)
+@app.get("/api/credit/score/{farmer_id}")
+def get_credit_score(farmer_id: str):
+    score = credit_service.get_score(farmer_id)
+    if score is None:
+        raise HTTPException(status_code=404, detail=f"No credit score for farmer {farmer_id}")
+    return score
+
+# 3b. REGISTERED FARMS NEAR A POINT
+@app.get("/api/farms/nearby")
+def get_nearby_farms(
+    lat: float = Query(..., ge=-90, le=90),
+    lng: float = Query(..., ge=-180, le=180),
+    k: int = Query(5, ge=1, le=100),
+    radius_m: Optional[float] = Query(None, gt=0, le=50_000),
+):
+    return {"farms": farm_service.nearby(lat, lng, k, radius_m)}
 
 # 4. SOIL ANALYSIS
 @app.post("/api/analyze/soil")
@@ -95,9 +258,114 @@ async def analyze_soil(data: SoilRequest):
         potassium=data.potassium,
         ph=data.ph,
         rainfall=data.rainfall,
-        lang=data.lang
+        language=data.lang
     )
-    return soil_service.recommend_crop(req)
+    result = await IO_POOL.run(soil_service.recommend_crop, req)  # blocking Gemini call
+    if audit_writer is not None:
+        audit_writer.record_soil(data, result, soil_service.model_version)
+    return result
+
+# 5. PRICE ALERTS (matched after every daily forecast refresh)
+@app.post("/api/alerts/subscribe")
+def subscribe_alert(data: AlertSubscription):
+    try:
+        return alert_service.subscribe(
+            data.farmer_id, data.crop_name, data.state, data.kind, data.threshold, data.signal, data.lang
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.get("/api/alerts/{farmer_id}")
+def list_alerts(farmer_id: str):
+    return {"subscriptions": alert_service.subscriptions(farmer_id)}
+
+@app.delete("/api/alerts/{farmer_id}/{subscription_id}")
+def delete_alert(farmer_id: str, subscription_id: int):
+    if not alert_service.unsubscribe(farmer_id, subscription_id):
+        raise HTTPException(status_code=404, detail="Subscription not found")
+    return {"deleted": subscription_id}
+
+@app.get("/api/alerts/{farmer_id}/notifications")
+def list_notifications(farmer_id: str, unread_only: bool = False, limit: int = Query(50, ge=1, le=500)):
+    return {"notifications": alert_service.notifications(farmer_id, unread_only, limit)}
+
+# 6. FARMER DASHBOARD (the home screen in one round trip)
+async def _within(awaitable, timeout_ms: float):
+    """(result, None), or (None, "timeout" / "error"): a slow part must not hold up the rest."""
+    try:
+        return await asyncio.wait_for(awaitable, timeout_ms / 1000), None
+    except asyncio.TimeoutError:
+        return None, "timeout"
+    except Exception as e:
+        logger.error(f"Dashboard part failed: {e}")
+        return None, "error"
+
+async def _district_soil_advice(district: str, lang: str):
+    soil = await IO_POOL.run(auth_service.repo.get_soil_data_by_district, district)
+    if soil is None:
+        return None
+    req = InternalSoilRequest(
+        district=district,
+        nitrogen=soil["Nitrogen"],
+        phosphorus=soil["Phosphorus"],
+        potassium=soil["Potassium"],
+        ph=soil["pH"],
+        rainfall=soil["Rainfall"],
+        language=lang,
+    )
+    return await IO_POOL.run(soil_service.recommend_crop, req)
+
+@app.get("/api/farmer/{farmer_id}/dashboard")
+async def farmer_dashboard(farmer_id: str):
+    """
+    Profile, farms and crops, then credit score, field health per farm,
+    a forecast per crop, district soil advice and unread alerts, fetched
+    concurrently. Parts that miss their deadline are left out and listed
+    in "unavailable" instead of delaying the whole response.
+    """
+    profile = await IO_POOL.run(auth_service.repo.get_farmer_by_id, farmer_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail=f"Farmer {farmer_id} not found")
+    local, upstream = settings.DASHBOARD_LOCAL_TIMEOUT_MS, settings.DASHBOARD_UPSTREAM_TIMEOUT_MS
+    state, lang = profile.get("state", ""), profile.get("language", "en")
+
+    farms = farm_service.farms_of(farmer_id)
+    crops, crops_missing = await _within(
+        IO_POOL.run(auth_service.repo.get_crops_for_farms, [f["farm_id"] for f in farms]), local
+    )
+    for farm in farms:
+        farm["crops"] = [c for c in crops or [] if c["farm_id"] == farm["farm_id"]]
+    crop_names = list(dict.fromkeys(c["crop_name"] for c in crops or []))
+
+    # (section, key) -> awaitable, deadline
+    parts = {
+        ("credit_score", None): (IO_POOL.run(credit_service.get_score, farmer_id), local),
+        ("alerts", None): (IO_POOL.run(alert_service.notifications, farmer_id, True, 10), local),
+        ("soil", None): (_district_soil_advice(profile.get("district", ""), lang), upstream),
+    }
+    for farm in farms[:settings.DASHBOARD_MAX_FARMS]:
+        loc = Location(lat=farm["lat"], lng=farm["lng"])
+        parts[("field_health", farm["farm_id"])] = (
+            IO_POOL.run(gee_service.get_field_health, loc, farm_id=farm["farm_id"]), upstream
+        )
+    today = date.today().isoformat()
+    for crop in crop_names:
+        parts[("market", crop)] = (market_service.predict_price_async(crop, state, 1, today, lang), upstream)
+
+    results = await asyncio.gather(*(_within(aw, ms) for aw, ms in parts.values()))
+
+    dashboard = {"farmer": profile, "farms": farms, "market": {}, "field_health": {}}
+    unavailable = {"crops": crops_missing} if crops_missing else {}
+    for (section, key), (result, missing) in zip(parts, results):
+        if missing:
+            unavailable[f"{section}.{key}" if key else section] = missing
+        elif key is None:
+            dashboard[section] = result
+        else:
+            dashboard[section][key] = result
+    dashboard["unavailable"] = unavailable
+    dashboard["partial"] = bool(unavailable)
+    return dashboard
 
 # ========================
 # AUTH ROUTES
@@ -111,6 +379,19 @@ def register_farmer(data: FarmerRegister):
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@app.post("/api/auth/register/bulk")
+def register_farmers_bulk(file: UploadFile = File(...), format: Optional[str] = Query(None, pattern="^(csv|ndjson)$")):
+    """
+    Register a co-op's members from one CSV or NDJSON upload (columns:
+    name, phone, state, district, language). Valid rows are registered
+    together; the report lists every row's outcome.
+    """
+    fmt = format or ("ndjson" if (file.filename or "").lower().endswith((".ndjson", ".jsonl")) else "csv")
+    try:
+        return auth_service.register_farmers_bulk(file.file, fmt)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @app.post("/api/auth/login-otp")
 def request_login_otp(data: LoginRequest):
     """
@@ -93,11 +93,18 @@ class MarketPriceResponse(BaseModel):
 class MarketHistoryItem(BaseModel):
     date: date
     price: float
+    # OHLC of the bucket (min/modal/max prices); absent for single-price rows
+    open: Optional[float] = None
+    high: Optional[float] = None
+    low: Optional[float] = None
+    close: Optional[float] = None
 
 
 class MarketHistoryResponse(BaseModel):
     crop_name: str
     state: str
+    market: Optional[str] = None
+    interval: str = Field(default="daily", example="weekly")
     history: List[MarketHistoryItem]
 
 
@@ -0,0 +1,164 @@
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from app.core.metrics import track
+from app.repositories.sqlite_base import SQLiteStore
+
+_SUBSCRIPTION_COLUMNS = ("id", "farmer_id", "crop", "state", "kind", "threshold", "signal", "lang", "created_at")
+_NOTIFICATION_COLUMNS = ("id", "notification_type", "title", "message", "priority", "is_read", "created_at", "expires_at")
+
+# One INSERT .. SELECT per alert kind: alert_batch holds a row per changed
+# (crop, state) x kind x language, and each is joined to its own subscribers
+# through idx_alert_match, so the work follows the matches, not the table.
+_FAN_OUT = {
+    # price rose to or through the threshold: threshold in (previous, price]
+    "above": "s.threshold > b.lo AND s.threshold <= b.hi",
+    # price fell to or through the threshold: threshold in [price, previous)
+    "below": "s.threshold >= b.lo AND s.threshold < b.hi",
+    # signal changed; a subscription without one takes any change
+    "signal": "(s.signal IS NULL OR s.signal = b.signal)",
+}
+
+
+class AlertStore(SQLiteStore):
+    """
+    Price alert subscriptions and the notifications they produce
+    (notifications in data/schema.sql).
+
+      alert_subscriptions  farmer -> (crop, state) with a price threshold or a signal
+      alert_state          last price / signal each (crop, state) was matched at
+      notifications        generated alerts, newest first per farmer
+
+    idx_alert_match is the inverted index: subscriptions keyed by
+    (crop, state, kind, lang) and ordered by threshold, so a price move
+    finds exactly the thresholds it crossed with one range scan.
+    """
+
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS alert_subscriptions ("
+        " id INTEGER PRIMARY KEY,"
+        " farmer_id TEXT NOT NULL,"
+        " crop TEXT NOT NULL,"
+        " state TEXT NOT NULL,"
+        " kind TEXT NOT NULL,"  # above | below | signal
+        " threshold REAL,"  # Rs/quintal, above/below only
+        " signal TEXT,"  # HOLD | SELL | STABLE; NULL = any change
+        " lang TEXT NOT NULL DEFAULT 'en',"
+        " created_at TEXT DEFAULT CURRENT_TIMESTAMP"
+        ")",
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_alert_unique ON alert_subscriptions"
+        "(farmer_id, crop, state, kind, IFNULL(threshold, 0), IFNULL(signal, ''))",
+        "CREATE INDEX IF NOT EXISTS idx_alert_match ON alert_subscriptions(crop, state, kind, lang, threshold)",
+        "CREATE INDEX IF NOT EXISTS idx_alert_farmer ON alert_subscriptions(farmer_id)",
+        "CREATE TABLE IF NOT EXISTS alert_state ("
+        " crop TEXT NOT NULL,"
+        " state TEXT NOT NULL,"
+        " price REAL NOT NULL,"
+        " signal TEXT NOT NULL,"
+        " as_of TEXT NOT NULL,"
+        " PRIMARY KEY (crop, state)"
+        ") WITHOUT ROWID",
+        "CREATE TABLE IF NOT EXISTS notifications ("
+        " id INTEGER PRIMARY KEY,"
+        " farmer_id TEXT NOT NULL,"
+        " notification_type TEXT NOT NULL,"
+        " title TEXT NOT NULL,"
+        " message TEXT NOT NULL,"
+        " priority TEXT DEFAULT 'medium',"
+        " is_read INTEGER DEFAULT 0,"
+        " created_at TEXT DEFAULT CURRENT_TIMESTAMP,"
+        " expires_at TEXT"
+        ")",
+        "CREATE INDEX IF NOT EXISTS idx_notification_farmer ON notifications(farmer_id, id)",
+    )
+
+    # -------------------------
+    # SUBSCRIPTIONS
+    # -------------------------
+    def subscribe(self, farmer_id: str, crop: str, state: str, kind: str,
+                  threshold: Optional[float], signal: Optional[str], lang: str) -> dict:
+        """Add a subscription (or return the identical one that exists); updates its language."""
+        with self.transaction():
+            conn = self._conn()
+            conn.execute(
+                "INSERT INTO alert_subscriptions (farmer_id, crop, state, kind, threshold, signal, lang)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT DO UPDATE SET lang = excluded.lang",
+                (farmer_id, crop, state, kind, threshold, signal, lang),
+            )
+            row = conn.execute(
+                f"SELECT {', '.join(_SUBSCRIPTION_COLUMNS)} FROM alert_subscriptions"
+                " WHERE farmer_id = ? AND crop = ? AND state = ? AND kind = ?"
+                " AND IFNULL(threshold, 0) = IFNULL(?, 0) AND IFNULL(signal, '') = IFNULL(?, '')",
+                (farmer_id, crop, state, kind, threshold, signal),
+            ).fetchone()
+        return dict(zip(_SUBSCRIPTION_COLUMNS, row))
+
+    def unsubscribe(self, farmer_id: str, subscription_id: int) -> bool:
+        cursor = self._conn().execute(
+            "DELETE FROM alert_subscriptions WHERE id = ? AND farmer_id = ?", (subscription_id, farmer_id)
+        )
+        return cursor.rowcount > 0
+
+    def subscriptions(self, farmer_id: str) -> List[dict]:
+        rows = self._conn().execute(
+            f"SELECT {', '.join(_SUBSCRIPTION_COLUMNS)} FROM alert_subscriptions WHERE farmer_id = ? ORDER BY id",
+            (farmer_id,),
+        ).fetchall()
+        return [dict(zip(_SUBSCRIPTION_COLUMNS, row)) for row in rows]
+
+    def notifications(self, farmer_id: str, unread_only: bool = False, limit: int = 50) -> List[dict]:
+        rows = self._conn().execute(
+            f"SELECT {', '.join(_NOTIFICATION_COLUMNS)} FROM notifications"
+            " WHERE farmer_id = ? AND (? = 0 OR is_read = 0) ORDER BY id DESC LIMIT ?",
+            (farmer_id, int(unread_only), limit),
+        ).fetchall()
+        return [dict(zip(_NOTIFICATION_COLUMNS, row)) for row in rows]
+
+    # -------------------------
+    # MATCHING
+    # -------------------------
+    def last_state(self) -> Dict[Tuple[str, str], Tuple[float, str]]:
+        """(crop, state) -> (price, signal) they were last matched at."""
+        return {
+            (crop, state): (price, signal)
+            for crop, state, price, signal in self._conn().execute("SELECT crop, state, price, signal FROM alert_state")
+        }
+
+    def fan_out(self, batch: Sequence[tuple], states: Sequence[tuple], expires_at: str) -> int:
+        """
+        Write the notifications for batch rows (crop, state, kind, lang, lo,
+        hi, signal, title, message, priority) and record states (crop, state,
+        price, signal, as_of) as matched, in one transaction, so a pair is
+        never alerted twice for the same move. A '{threshold}' in a message
+        is filled with the subscriber's own threshold.
+        """
+        with track("alert_fan_out"), self.transaction():
+            conn = self._conn()
+            conn.execute(
+                "CREATE TEMP TABLE IF NOT EXISTS alert_batch ("
+                " crop TEXT, state TEXT, kind TEXT, lang TEXT, lo REAL, hi REAL, signal TEXT,"
+                " title TEXT, message TEXT, priority TEXT)"
+            )
+            conn.execute("DELETE FROM alert_batch")
+            conn.executemany("INSERT INTO alert_batch VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", batch)
+
+            before = conn.total_changes
+            for kind, condition in _FAN_OUT.items():
+                conn.execute(
+                    "INSERT INTO notifications (farmer_id, notification_type, title, message, priority, expires_at)"
+                    " SELECT s.farmer_id, ?, b.title,"
+                    " REPLACE(b.message, '{threshold}', IFNULL(CAST(CAST(s.threshold AS INTEGER) AS TEXT), '')),"
+                    " b.priority, ?"
+                    " FROM alert_batch b JOIN alert_subscriptions s"
+                    " ON s.crop = b.crop AND s.state = b.state AND s.kind = b.kind AND s.lang = b.lang"
+                    f" AND {condition}"
+                    " WHERE b.kind = ?",
+                    ("price_alert" if kind != "signal" else "market_signal", expires_at, kind),
+                )
+            created = conn.total_changes - before
+
+            conn.executemany(
+                "INSERT OR REPLACE INTO alert_state (crop, state, price, signal, as_of) VALUES (?, ?, ?, ?, ?)", states
+            )
+            conn.execute("DELETE FROM alert_batch")
+        return created
@@ -0,0 +1,259 @@
+import json
+import logging
+import os
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Arrays start on 64-byte boundaries so every memmap view is cache-line aligned
+_ALIGN = 64
+
+
+# -------------------------
+# FLAT ARRAY BUNDLES
+# -------------------------
+# A bundle is <name>.bin (raw array bytes back to back) plus <name>.json
+# (dtype/shape/offset of each array and free-form metadata). Loading maps
+# the .bin read-only, so every worker process on the host shares the same
+# physical pages through the page cache instead of holding its own copy.
+
+def write_bundle(out_dir: Path, name: str, arrays: Dict[str, np.ndarray], meta: Dict[str, Any]) -> Path:
+    """Write arrays + meta as a bundle; both files are swapped in atomically."""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    bin_path, manifest_path = out_dir / f"{name}.bin", out_dir / f"{name}.json"
+    tmp_bin, tmp_manifest = bin_path.with_suffix(".bin.tmp"), manifest_path.with_suffix(".json.tmp")
+
+    layout, offset = {}, 0
+    with open(tmp_bin, "wb") as f:
+        for key, arr in arrays.items():
+            arr = np.ascontiguousarray(arr)
+            pad = -offset % _ALIGN
+            f.write(b"\0" * pad)
+            offset += pad
+            layout[key] = {"dtype": arr.dtype.str, "shape": list(arr.shape), "offset": offset}
+            f.write(arr.tobytes())
+            offset += arr.nbytes
+
+    with open(tmp_manifest, "w", encoding="utf-8") as f:
+        json.dump({"arrays": layout, "meta": meta, "bytes": offset}, f, ensure_ascii=False)
+
+    # .bin first: a reader that sees the new manifest always finds matching bytes
+    os.replace(tmp_bin, bin_path)
+    os.replace(tmp_manifest, manifest_path)
+    return bin_path
+
+
+@contextmanager
+def allocate_bundle(out_dir: Path, name: str, specs: Dict[str, Tuple[Any, tuple]], meta: Dict[str, Any]):
+    """
+    Streaming counterpart of write_bundle for arrays too large to build in
+    memory: yields writable memmaps ({key: (dtype, shape)} -> array) for the
+    caller to fill, then publishes the bundle atomically. Nothing is
+    published if the block raises.
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    bin_path, manifest_path = out_dir / f"{name}.bin", out_dir / f"{name}.json"
+    tmp_bin, tmp_manifest = bin_path.with_suffix(".bin.tmp"), manifest_path.with_suffix(".json.tmp")
+
+    layout, offset = {}, 0
+    for key, (dtype, shape) in specs.items():
+        dtype = np.dtype(dtype)
+        offset += -offset % _ALIGN
+        layout[key] = {"dtype": dtype.str, "shape": list(shape), "offset": offset}
+        offset += dtype.itemsize * int(np.prod(shape))
+
+    with open(tmp_bin, "wb") as f:
+        f.truncate(offset)
+    try:
+        arrays = {
+            key: np.memmap(tmp_bin, dtype=np.dtype(spec["dtype"]), mode="r+",
+                           offset=spec["offset"], shape=tuple(spec["shape"]))
+            for key, spec in layout.items()
+        }
+        yield arrays
+        for arr in arrays.values():
+            arr.flush()
+        del arrays
+    except BaseException:
+        tmp_bin.unlink(missing_ok=True)
+        raise
+
+    with open(tmp_manifest, "w", encoding="utf-8") as f:
+        json.dump({"arrays": layout, "meta": meta, "bytes": offset}, f, ensure_ascii=False)
+    os.replace(tmp_bin, bin_path)
+    os.replace(tmp_manifest, manifest_path)
+
+
+def read_manifest(out_dir: Path, name: str) -> Optional[Dict[str, Any]]:
+    path = Path(out_dir) / f"{name}.json"
+    if not path.exists():
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def load_bundle(out_dir: Path, name: str) -> Optional[Tuple[Dict[str, np.ndarray], Dict[str, Any]]]:
+    """Read-only memmap views of a bundle's arrays plus its meta, or None if absent."""
+    manifest = read_manifest(out_dir, name)
+    bin_path = Path(out_dir) / f"{name}.bin"
+    if manifest is None or not bin_path.exists():
+        return None
+    if bin_path.stat().st_size < manifest["bytes"]:
+        logger.warning(f"⚠️ Artifact {bin_path.name} is truncated; ignoring it.")
+        return None
+
+    arrays = {}
+    for key, spec in manifest["arrays"].items():
+        shape = tuple(spec["shape"])
+        if int(np.prod(shape)) == 0:
+            arrays[key] = np.empty(shape, dtype=np.dtype(spec["dtype"]))
+            continue
+        arrays[key] = np.memmap(bin_path, dtype=np.dtype(spec["dtype"]), mode="r",
+                                offset=spec["offset"], shape=shape)
+    return arrays, manifest["meta"]
+
+
+def file_signature(*paths) -> list:
+    """[name, mtime_ns, size] per path; used to tell whether an artifact is stale."""
+    sig = []
+    for p in paths:
+        p = Path(p)
+        st = p.stat()
+        sig.append([p.name, st.st_mtime_ns, st.st_size])
+    return sig
+
+
+# -------------------------
+# MARKET MODEL (NumPy MLP)
+# -------------------------
+MODEL_BUNDLE = "market_model"
+_LAYERS = ("0", "2", "4")  # Linear layers of the Sequential(Linear, ReLU, Linear, ReLU, Linear)
+
+
+def mlp_forward(x: np.ndarray, weights) -> np.ndarray:
+    """
+    ReLU MLP over (w, b) pairs. With stacked (K, in, out) ensemble weights
+    the (N, in) input broadcasts to (K, N, out): one batched matmul per
+    layer scores every member at once.
+    """
+    last = len(weights) - 1
+    for i, (w, b) in enumerate(weights):
+        x = np.matmul(x, w) + b
+        if i < last:
+            np.maximum(x, 0, out=x)
+    return x
+
+
+def load_ensemble(ensemble_path: Path) -> list:
+    """(w, b) pairs of market_ensemble.pth as float32 arrays: w (K, in, out), b (K, 1, out)."""
+    import torch
+
+    state = torch.load(ensemble_path, map_location="cpu")
+    return [
+        (state[f"w{i}"].numpy().astype(np.float32), state[f"b{i}"].numpy().astype(np.float32))
+        for i in range(len(_LAYERS))
+    ]
+
+
+def training_outputs(model_path: Path, scaler_path: Path, ensemble_path: Optional[Path] = None) -> list:
+    """The files a model artifact is built from; the ensemble only counts if it was trained."""
+    paths = [Path(model_path), Path(scaler_path)]
+    if ensemble_path is not None and Path(ensemble_path).exists():
+        paths.append(Path(ensemble_path))
+    return paths
+
+
+def export_market_model(model_path: Path, scaler_path: Path, out_dir: Path,
+                        ensemble_path: Optional[Path] = None) -> Path:
+    """
+    Flatten market_net.pth + scalers.pkl into a bundle: float32 weights,
+    the MinMax scaler parameters and the encoder class lists. The stacked
+    weights of market_ensemble.pth are added when it exists.
+    """
+    import joblib
+    import torch
+
+    state = torch.load(model_path, map_location="cpu")
+    scalers = joblib.load(scaler_path)
+    sources = training_outputs(model_path, scaler_path, ensemble_path)
+
+    arrays = {}
+    for i, layer in enumerate(_LAYERS):
+        arrays[f"w{i}"] = state[f"{layer}.weight"].numpy().astype(np.float32).T.copy()
+        arrays[f"b{i}"] = state[f"{layer}.bias"].numpy().astype(np.float32)
+    arrays["x_scale"] = scalers["scaler_X"].scale_.astype(np.float64)
+    arrays["x_min"] = scalers["scaler_X"].min_.astype(np.float64)
+    arrays["y_scale"] = scalers["scaler_y"].scale_.astype(np.float64)
+    arrays["y_min"] = scalers["scaler_y"].min_.astype(np.float64)
+
+    members = 0
+    if len(sources) > 2:
+        for i, (w, b) in enumerate(load_ensemble(sources[2])):
+            arrays[f"ew{i}"], arrays[f"eb{i}"] = w, b
+            members = w.shape[0]
+
+    meta = {
+        "crops": [str(c) for c in scalers["le_crop"].classes_],
+        "states": [str(s) for s in scalers["le_state"].classes_],
+        "ensemble": members,
+        "source": file_signature(*sources),
+    }
+    return write_bundle(out_dir, MODEL_BUNDLE, arrays, meta)
+
+
+class MarketModel:
+    """
+    NumPy forward pass of the market MLP over memmapped weights.
+    Inputs are raw [crop_index, state_index, date_ordinal] rows; outputs
+    are prices, with the MinMax scaling applied on both sides. When the
+    bundle carries an ensemble, predict_members() scores all of its
+    members in one stacked pass.
+    """
+
+    def __init__(self, arrays: Dict[str, np.ndarray], meta: Dict[str, Any]):
+        self.weights = [(arrays[f"w{i}"], arrays[f"b{i}"]) for i in range(len(_LAYERS))]
+        self.members = None
+        if meta.get("ensemble"):
+            self.members = [(arrays[f"ew{i}"], arrays[f"eb{i}"]) for i in range(len(_LAYERS))]
+        self.x_scale, self.x_min = arrays["x_scale"], arrays["x_min"]
+        self.y_scale, self.y_min = arrays["y_scale"], arrays["y_min"]
+        self.crops = meta["crops"]
+        self.states = meta["states"]
+        self.source = meta["source"]
+
+    @classmethod
+    def load(cls, out_dir: Path, model_path: Path, scaler_path: Path,
+             ensemble_path: Optional[Path] = None) -> Optional["MarketModel"]:
+        """The exported model, or None if missing or older than the .pth/.pkl files."""
+        bundle = load_bundle(out_dir, MODEL_BUNDLE)
+        if bundle is None:
+            return None
+        arrays, meta = bundle
+        try:
+            if meta.get("source") != file_signature(*training_outputs(model_path, scaler_path, ensemble_path)):
+                logger.warning("⚠️ Market model artifact is stale; re-run helper_functions/build_artifacts.py")
+                return None
+        except FileNotFoundError:
+            pass  # artifact shipped without the training outputs
+        return cls(arrays, meta)
+
+    def _scale(self, rows: np.ndarray) -> np.ndarray:
+        return (np.asarray(rows, dtype=np.float64) * self.x_scale + self.x_min).astype(np.float32)
+
+    def _unscale(self, y: np.ndarray) -> np.ndarray:
+        return (y.astype(np.float64) - self.y_min[0]) / self.y_scale[0]
+
+    def predict(self, rows: np.ndarray) -> np.ndarray:
+        return self._unscale(mlp_forward(self._scale(rows), self.weights)[:, 0])
+
+    def predict_members(self, rows: np.ndarray) -> Optional[np.ndarray]:
+        """(K, N) prices, one row per ensemble member; None without an ensemble."""
+        if self.members is None:
+            return None
+        return self._unscale(mlp_forward(self._scale(rows), self.members)[..., 0])
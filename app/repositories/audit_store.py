@@ -0,0 +1,73 @@
+from typing import Dict, List, Sequence
+
+from app.core.metrics import track
+from app.repositories.sqlite_base import SQLiteStore
+
+# kind -> (table, columns); records are tuples in this column order
+AUDIT_TABLES = {
+    "prediction": ("prediction_audit", (
+        "created_at", "model_version", "crop", "state", "prediction_date", "quantity",
+        "predicted_price", "price_p10", "price_p90", "confidence_score", "recommendation",
+    )),
+    "soil": ("soil_recommendation_audit", (
+        "created_at", "model_version", "district", "nitrogen", "phosphorus", "potassium",
+        "ph", "rainfall", "lang", "cultivable", "crops", "message",
+    )),
+}
+
+
+class AuditStore(SQLiteStore):
+    """
+    Append-only audit trail of analysis results served to users (for
+    lenders): one row per market forecast and per soil recommendation, with
+    the model version that produced it. Mirrors price_predictions and
+    soil_recommendations in data/schema.sql; the local price_predictions
+    table is the forecast cache, so audit rows live in their own tables.
+    """
+
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS prediction_audit ("
+        " created_at TEXT NOT NULL,"
+        " model_version TEXT,"
+        " crop TEXT NOT NULL,"
+        " state TEXT,"
+        " prediction_date TEXT,"
+        " quantity REAL,"
+        " predicted_price REAL NOT NULL,"
+        " price_p10 REAL,"
+        " price_p90 REAL,"
+        " confidence_score REAL,"
+        " recommendation TEXT"  # HOLD | SELL | STABLE
+        ")",
+        "CREATE INDEX IF NOT EXISTS idx_prediction_audit_created ON prediction_audit(created_at)",
+        "CREATE TABLE IF NOT EXISTS soil_recommendation_audit ("
+        " created_at TEXT NOT NULL,"
+        " model_version TEXT,"
+        " district TEXT,"
+        " nitrogen REAL, phosphorus REAL, potassium REAL, ph REAL, rainfall REAL,"
+        " lang TEXT,"
+        " cultivable INTEGER,"
+        " crops TEXT,"  # JSON list as returned to the user
+        " message TEXT"
+        ")",
+        "CREATE INDEX IF NOT EXISTS idx_soil_audit_created ON soil_recommendation_audit(created_at)",
+    )
+
+    def write(self, records: Sequence[tuple]) -> int:
+        """(kind, row) records; one multi-row insert per table, all in one transaction."""
+        by_kind: Dict[str, List[tuple]] = {}
+        for kind, row in records:
+            by_kind.setdefault(kind, []).append(row)
+
+        with track("audit_write"), self.transaction():
+            conn = self._conn()
+            for kind, rows in by_kind.items():
+                table, columns = AUDIT_TABLES[kind]
+                conn.executemany(
+                    f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+                    rows,
+                )
+        return len(records)
+
+    def count(self, kind: str) -> int:
+        return self._conn().execute(f"SELECT COUNT(*) FROM {AUDIT_TABLES[kind][0]}").fetchone()[0]
@@ -0,0 +1,189 @@
+import json
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from app.core.metrics import track
+from app.repositories.sqlite_base import SQLiteStore
+
+
+class CreditStore(SQLiteStore):
+    """
+    Inputs and results of incremental credit scoring.
+
+      credit_farms       farm -> farmer, acres, latest NDVI reading
+      credit_crops       one row per farm_crops record (history depth)
+      credit_claims      yields farmers claimed vs what satellite data supports
+      credit_dirty       farmers whose inputs changed since their last score
+      credit_watermarks  how far each input source has been read
+      credit_scores      one current score per farmer (credit_scores in data/schema.sql)
+
+    Writers only ever add farmers to credit_dirty; a refresh scores those
+    and removes them, so its cost follows the changes, not the portfolio.
+    Input writers do not commit on their own: callers wrap a batch and its
+    watermark in transaction() so a crash never skips or half-applies it.
+    """
+
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS credit_farms ("
+        " farm_id TEXT PRIMARY KEY,"
+        " farmer_id TEXT NOT NULL,"
+        " acres REAL,"
+        " ndvi REAL,"
+        " ndvi_date TEXT"
+        ")",
+        "CREATE INDEX IF NOT EXISTS idx_credit_farms_farmer ON credit_farms(farmer_id)",
+        "CREATE TABLE IF NOT EXISTS credit_crops ("
+        " crop_id TEXT PRIMARY KEY,"
+        " farm_id TEXT NOT NULL"
+        ") WITHOUT ROWID",
+        "CREATE INDEX IF NOT EXISTS idx_credit_crops_farm ON credit_crops(farm_id)",
+        "CREATE TABLE IF NOT EXISTS credit_claims ("
+        " farmer_id TEXT NOT NULL,"
+        " claimed_yield REAL NOT NULL,"
+        " supported_yield REAL NOT NULL,"
+        " created_at TEXT DEFAULT CURRENT_TIMESTAMP"
+        ")",
+        "CREATE INDEX IF NOT EXISTS idx_credit_claims_farmer ON credit_claims(farmer_id)",
+        # seq changes on every mark (AUTOINCREMENT never reuses one), so a refresh
+        # only clears marks it actually scored, not ones added meanwhile
+        "CREATE TABLE IF NOT EXISTS credit_dirty ("
+        " seq INTEGER PRIMARY KEY AUTOINCREMENT,"
+        " farmer_id TEXT NOT NULL UNIQUE"
+        ")",
+        "CREATE TABLE IF NOT EXISTS credit_watermarks (source TEXT PRIMARY KEY, value TEXT NOT NULL)",
+        "CREATE TABLE IF NOT EXISTS credit_scores ("
+        " farmer_id TEXT PRIMARY KEY,"
+        " score INTEGER NOT NULL,"
+        " calculation_date TEXT NOT NULL,"
+        " ndvi_factor REAL,"
+        " yield_consistency_factor REAL,"
+        " farm_size_factor REAL,"
+        " history_factor REAL,"
+        " loan_eligibility_amount REAL,"
+        " interest_rate REAL,"
+        " notes TEXT"
+        ") WITHOUT ROWID",
+    )
+
+    # -------------------------
+    # WATERMARKS
+    # -------------------------
+    def watermark(self, source: str) -> Optional[dict]:
+        row = self._conn().execute("SELECT value FROM credit_watermarks WHERE source = ?", (source,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set_watermark(self, source: str, value: dict) -> None:
+        self._conn().execute(
+            "INSERT OR REPLACE INTO credit_watermarks (source, value) VALUES (?, ?)", (source, json.dumps(value))
+        )
+
+    # -------------------------
+    # INPUTS (each marks the affected farmers dirty)
+    # -------------------------
+    def upsert_farms(self, rows: Sequence[Tuple[str, str, float]]) -> None:
+        """(farm_id, farmer_id, acres); keeps any NDVI already recorded for the farm."""
+        conn = self._conn()
+        conn.executemany(
+            "INSERT INTO credit_farms (farm_id, farmer_id, acres) VALUES (?, ?, ?)"
+            " ON CONFLICT(farm_id) DO UPDATE SET farmer_id = excluded.farmer_id, acres = excluded.acres",
+            rows,
+        )
+        conn.executemany("INSERT OR REPLACE INTO credit_dirty (farmer_id) VALUES (?)", [(r[1],) for r in rows])
+
+    def add_crops(self, rows: Sequence[Tuple[str, str]]) -> None:
+        """(crop_id, farm_id) farm_crops records; re-reading a record is a no-op."""
+        conn = self._conn()
+        conn.executemany("INSERT OR IGNORE INTO credit_crops (crop_id, farm_id) VALUES (?, ?)", rows)
+        self._mark_farms_dirty(conn, {r[1] for r in rows})
+
+    def set_ndvi(self, rows: Sequence[Tuple[str, str, float]]) -> None:
+        """(farm_id, image_date, ndvi); an older image never overwrites a newer one."""
+        conn = self._conn()
+        conn.executemany(
+            "UPDATE credit_farms SET ndvi = ?, ndvi_date = ?"
+            " WHERE farm_id = ? AND (ndvi_date IS NULL OR ndvi_date <= ?)",
+            [(ndvi, day, farm_id, day) for farm_id, day, ndvi in rows],
+        )
+        self._mark_farms_dirty(conn, {r[0] for r in rows})
+
+    def add_claim(self, farmer_id: str, claimed_yield: float, supported_yield: float) -> None:
+        with self.transaction():
+            conn = self._conn()
+            conn.execute(
+                "INSERT INTO credit_claims (farmer_id, claimed_yield, supported_yield) VALUES (?, ?, ?)",
+                (farmer_id, claimed_yield, supported_yield),
+            )
+            conn.execute("INSERT OR REPLACE INTO credit_dirty (farmer_id) VALUES (?)", (farmer_id,))
+
+    def _mark_farms_dirty(self, conn, farm_ids: Iterable[str]) -> None:
+        conn.executemany(
+            "INSERT OR REPLACE INTO credit_dirty (farmer_id) SELECT farmer_id FROM credit_farms WHERE farm_id = ?",
+            [(f,) for f in farm_ids],
+        )
+
+    # -------------------------
+    # RECOMPUTATION
+    # -------------------------
+    def dirty_batch(self, limit: int) -> List[Tuple[str, int]]:
+        """(farmer_id, seq) of up to limit farmers waiting for a score, oldest marks first."""
+        return self._conn().execute(
+            "SELECT farmer_id, seq FROM credit_dirty ORDER BY seq LIMIT ?", (limit,)
+        ).fetchall()
+
+    def dirty_count(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM credit_dirty").fetchone()[0]
+
+    def aggregates(self, farmer_ids: Sequence[str]) -> Dict[str, tuple]:
+        """
+        farmer_id -> (acres, ndvi acre-weighted sum, acres with NDVI, crop records,
+        claims, sum of min(1, supported/claimed)) for the given farmers only.
+        """
+        with track("credit_read"):
+            conn = self._conn()
+            conn.execute("CREATE TEMP TABLE IF NOT EXISTS credit_batch (farmer_id TEXT PRIMARY KEY)")
+            conn.execute("DELETE FROM credit_batch")
+            conn.executemany("INSERT OR IGNORE INTO credit_batch VALUES (?)", [(f,) for f in farmer_ids])
+
+            out = {f: [0.0, 0.0, 0.0, 0, 0, 0.0] for f in farmer_ids}
+            for farmer_id, acres, ndvi_sum, ndvi_acres in conn.execute(
+                "SELECT f.farmer_id, SUM(COALESCE(f.acres, 0)),"
+                " SUM(f.ndvi * COALESCE(f.acres, 1)), SUM(CASE WHEN f.ndvi IS NULL THEN 0 ELSE COALESCE(f.acres, 1) END)"
+                " FROM credit_batch b JOIN credit_farms f ON f.farmer_id = b.farmer_id GROUP BY f.farmer_id"
+            ):
+                out[farmer_id][0:3] = [acres or 0.0, ndvi_sum or 0.0, ndvi_acres or 0.0]
+            for farmer_id, records in conn.execute(
+                "SELECT f.farmer_id, COUNT(*) FROM credit_batch b"
+                " JOIN credit_farms f ON f.farmer_id = b.farmer_id"
+                " JOIN credit_crops c ON c.farm_id = f.farm_id GROUP BY f.farmer_id"
+            ):
+                out[farmer_id][3] = records
+            for farmer_id, claims, consistency in conn.execute(
+                "SELECT c.farmer_id, COUNT(*), SUM(MIN(1.0, c.supported_yield / c.claimed_yield))"
+                " FROM credit_batch b JOIN credit_claims c ON c.farmer_id = b.farmer_id GROUP BY c.farmer_id"
+            ):
+                out[farmer_id][4:6] = [claims, consistency]
+        return {f: tuple(v) for f, v in out.items()}
+
+    def save_scores(self, rows: Sequence[tuple], marks: Sequence[Tuple[str, int]], calculation_date: date) -> None:
+        """
+        Upsert (farmer_id, score, ndvi, yield, size, history, loan, rate, notes)
+        and clear the dirty marks they were computed for, in one transaction.
+        """
+        day = calculation_date.isoformat()
+        with track("credit_write"), self.transaction():
+            conn = self._conn()
+            conn.executemany(
+                "INSERT OR REPLACE INTO credit_scores"
+                " (farmer_id, score, calculation_date, ndvi_factor, yield_consistency_factor,"
+                "  farm_size_factor, history_factor, loan_eligibility_amount, interest_rate, notes)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(r[0], r[1], day, *r[2:]) for r in rows],
+            )
+            conn.executemany("DELETE FROM credit_dirty WHERE farmer_id = ? AND seq = ?", marks)
+
+    def score(self, farmer_id: str) -> Optional[dict]:
+        cursor = self._conn().execute("SELECT * FROM credit_scores WHERE farmer_id = ?", (farmer_id,))
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        return dict(zip([c[0] for c in cursor.description], row))
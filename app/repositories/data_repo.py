@@ -1,8 +1,18 @@
+import contextlib
 import json
+import os
+import threading
 import pandas as pd
 from pathlib import Path
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple
 from app.core.config import settings
+from app.core.metrics import track
+from app.repositories.vocab import CROPS, DISTRICTS, STATES, Vocabulary
+
+try:
+    import fcntl  # POSIX only; Windows dev setups run a single worker anyway
+except ImportError:
+    fcntl = None
 
 
 class DataRepository:
@@ -15,6 +25,15 @@ class DataRepository:
         self.soil_data_path: Path = settings.SOIL_DATA_PATH
         self.market_data_path: Path = settings.MARKET_DATA_PATH
         self.farmers_data_path: Path = settings.FARMERS_DATA_PATH
+        self.farm_crops_path: Path = settings.FARM_CROPS_DATA_PATH
+
+        # path -> (mtime_ns, frame, {column: vocab IDs}); re-read only when the file changes
+        self._encoded: Dict[Path, Tuple[int, pd.DataFrame, Dict[str, Any]]] = {}
+
+        # farmers.json read-modify-write guard: RLock for threads, flock for worker processes
+        self._farmers_rlock = threading.RLock()
+        self._farmers_lock_depth = 0
+        self._farmers_lock_file = None
         
         # Validate critical files exist at initialization
         self._validate_data_files()
@@ -35,32 +54,53 @@ class DataRepository:
                 f"Check {settings.DATA_DIR}"
             )
     
+    def _encoded_frame(
+        self, path: Path, loader, columns: Dict[str, Vocabulary]
+    ) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+        """
+        Frame plus int32 vocab IDs for the given logical columns
+        ({"crop": CROPS, ...}), matched to headers case-insensitively.
+        """
+        mtime = path.stat().st_mtime_ns
+        cached = self._encoded.get(path)
+        if cached and cached[0] == mtime:
+            return cached[1], cached[2]
+
+        df = loader()
+        lower = {col.lower(): col for col in df.columns}
+        ids = {
+            name: vocab.encode(df[lower[name]]) if name in lower else None
+            for name, vocab in columns.items()
+        }
+        self._encoded[path] = (mtime, df, ids)
+        return df, ids
+
     # -------------------------
     # SOIL DATA
     # -------------------------
     def load_soil_data(self) -> pd.DataFrame:
         """Load all soil data from CSV."""
         try:
-            return pd.read_csv(self.soil_data_path)
+            with track("file_read"):
+                return pd.read_csv(self.soil_data_path)
         except Exception as e:
             raise RuntimeError(f"Failed to load soil data: {str(e)}")
     
     def get_soil_data_by_district(self, district_name: str) -> Optional[Dict[str, Any]]:
-        """Get soil data for a specific district (case-insensitive)."""
+        """Get soil data for a specific district (case- and alias-insensitive)."""
         try:
-            df = self.load_soil_data()
-            # Handle multiple possible column names
-            district_col = next(
-                (col for col in df.columns if col.lower() == "district"),
-                "District"
+            df, ids = self._encoded_frame(
+                self.soil_data_path, self.load_soil_data, {"district": DISTRICTS}
             )
-            
-            data = df[df[district_col].str.lower() == district_name.lower()]
-            
-            if data.empty:
+            district_id = DISTRICTS.resolve(district_name)
+            if district_id is None or ids["district"] is None:
                 return None
-            
-            return data.iloc[0].to_dict()
+
+            rows = (ids["district"] == district_id).nonzero()[0]
+            if not len(rows):
+                return None
+
+            return df.iloc[rows[0]].to_dict()
         except Exception as e:
             raise RuntimeError(f"Error reading soil data for {district_name}: {str(e)}")
     
@@ -70,7 +110,8 @@ class DataRepository:
     def load_market_data(self) -> pd.DataFrame:
         """Load all market data from CSV."""
         try:
-            return pd.read_csv(self.market_data_path)
+            with track("file_read"):
+                return pd.read_csv(self.market_data_path)
         except Exception as e:
             raise RuntimeError(f"Failed to load market data: {str(e)}")
     
@@ -82,29 +123,57 @@ class DataRepository:
         Returns DataFrame (may be empty if no matches).
         """
         try:
-            df = self.load_market_data()
-            
-            # Handle multiple possible column names
-            crop_col = next(
-                (col for col in df.columns if col.lower() == "crop"),
-                "Crop"
+            df, ids = self._encoded_frame(
+                self.market_data_path, self.load_market_data, {"crop": CROPS, "state": STATES}
             )
-            
-            filtered = df[df[crop_col].str.lower() == crop_name.lower()]
-            
+            crop_id = CROPS.resolve(crop_name)
+            if crop_id is None or ids["crop"] is None:
+                return df.iloc[0:0]
+
+            mask = ids["crop"] == crop_id
             if state:
-                state_col = next(
-                    (col for col in df.columns if col.lower() == "state"),
-                    "State"
-                )
-                filtered = filtered[filtered[state_col].str.lower() == state.lower()]
+                state_id = STATES.resolve(state)
+                if state_id is None or ids["state"] is None:
+                    return df.iloc[0:0]
+                mask &= ids["state"] == state_id
             
-            return filtered
+            return df[mask]
         except Exception as e:
             raise RuntimeError(
                 f"Error reading market data for {crop_name}: {str(e)}"
             )
     
+    # -------------------------
+    # FARM CROPS
+    # -------------------------
+    def load_farm_crops(self) -> pd.DataFrame:
+        """Load farm_crops.csv, sorted by farm_id so a farm's crops are one slice."""
+        try:
+            with track("file_read"):
+                df = pd.read_csv(self.farm_crops_path, dtype={"id": str, "farm_id": str})
+            return df.sort_values("farm_id", kind="stable").reset_index(drop=True)
+        except Exception as e:
+            raise RuntimeError(f"Failed to load farm crops: {str(e)}")
+
+    def get_crops_for_farms(self, farm_ids: List[str]) -> List[Dict[str, Any]]:
+        """farm_crops records of the given farms, crop names canonical ("paddy" -> "Rice")."""
+        if not farm_ids or not self.farm_crops_path.exists():
+            return []
+        try:
+            df, ids = self._encoded_frame(self.farm_crops_path, self.load_farm_crops, {"crop_name": CROPS})
+            keys = df["farm_id"].to_numpy()
+            records = []
+            for farm_id in farm_ids:
+                lo, hi = keys.searchsorted(farm_id, "left"), keys.searchsorted(farm_id, "right")
+                for row in range(lo, hi):
+                    record = df.iloc[row].to_dict()
+                    if ids["crop_name"] is not None:
+                        record["crop_name"] = CROPS.name(int(ids["crop_name"][row]))
+                    records.append({k: (None if pd.isna(v) else v) for k, v in record.items()})
+            return records
+        except Exception as e:
+            raise RuntimeError(f"Error reading crops for farms: {str(e)}")
+
     # -------------------------
     # FARMER DATA (JSON)
     # -------------------------
@@ -114,19 +183,43 @@ class DataRepository:
             return {}
         
         try:
-            with open(self.farmers_data_path, "r", encoding="utf-8") as f:
+            with track("file_read"), open(self.farmers_data_path, "r", encoding="utf-8") as f:
                 return json.load(f)
         except json.JSONDecodeError:
             raise RuntimeError(f"Corrupted farmer data file: {self.farmers_data_path}")
         except Exception as e:
             raise RuntimeError(f"Error loading farmers: {str(e)}")
     
+    @contextlib.contextmanager
+    def farmers_lock(self):
+        """
+        Exclusive access to farmers.json across threads and worker processes.
+        Re-entrant, so callers can hold it around a check-then-add.
+        """
+        with self._farmers_rlock:
+            self._farmers_lock_depth += 1
+            try:
+                if self._farmers_lock_depth == 1 and fcntl is not None:
+                    self.farmers_data_path.parent.mkdir(parents=True, exist_ok=True)
+                    self._farmers_lock_file = open(self.farmers_data_path.with_suffix(".lock"), "a")
+                    fcntl.flock(self._farmers_lock_file, fcntl.LOCK_EX)
+                yield
+            finally:
+                if self._farmers_lock_depth == 1 and self._farmers_lock_file is not None:
+                    fcntl.flock(self._farmers_lock_file, fcntl.LOCK_UN)
+                    self._farmers_lock_file.close()
+                    self._farmers_lock_file = None
+                self._farmers_lock_depth -= 1
+
     def save_farmers(self, data: Dict[str, Any]) -> None:
         """Save farmer records to JSON (creates file if needed)."""
         try:
             self.farmers_data_path.parent.mkdir(parents=True, exist_ok=True)
-            with open(self.farmers_data_path, "w", encoding="utf-8") as f:
+            # Write aside and rename so readers in other workers never see half a file
+            tmp = self.farmers_data_path.with_suffix(f".{os.getpid()}.tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
                 json.dump(data, f, indent=2, ensure_ascii=False)
+            os.replace(tmp, self.farmers_data_path)
         except Exception as e:
             raise RuntimeError(f"Error saving farmers: {str(e)}")
     
@@ -152,12 +245,36 @@ class DataRepository:
     def add_farmer(self, farmer_data: Dict[str, Any]) -> None:
         """Add or update a farmer record."""
         try:
-            farmers = self.load_farmers()
-            farmers[farmer_data["farmer_id"]] = farmer_data
-            self.save_farmers(farmers)
+            with self.farmers_lock():
+                farmers = self.load_farmers()
+                farmers[farmer_data["farmer_id"]] = farmer_data
+                self.save_farmers(farmers)
         except Exception as e:
             raise RuntimeError(f"Error adding farmer: {str(e)}")
-    
+
+    def add_farmers(self, records: List[Dict[str, Any]]) -> List[bool]:
+        """
+        Add many farmer records in one rewrite of farmers.json. A record whose
+        phone is already registered is skipped; returns added flags per record.
+        """
+        try:
+            with self.farmers_lock():
+                farmers = self.load_farmers()
+                # Phone index of the file as it is now, under the lock
+                phones = {f.get("phone") for f in farmers.values()}
+                added = []
+                for record in records:
+                    fresh = record["phone"] not in phones
+                    if fresh:
+                        farmers[record["farmer_id"]] = record
+                        phones.add(record["phone"])
+                    added.append(fresh)
+                if any(added):
+                    self.save_farmers(farmers)
+                return added
+        except Exception as e:
+            raise RuntimeError(f"Error adding farmers: {str(e)}")
+
     def get_all_farmers(self) -> List[Dict[str, Any]]:
         """Get all farmers as a list."""
         try:
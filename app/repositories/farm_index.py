@@ -0,0 +1,216 @@
+import bisect
+import logging
+import math
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.repositories.artifacts import file_signature, load_bundle, write_bundle
+
+logger = logging.getLogger(__name__)
+
+FARM_BUNDLE = "farm_index"
+EARTH_RADIUS_M = 6_371_000.0
+ACRE_M2 = 4046.86
+_CX_OFFSET = 1 << 31  # keeps the column part of a cell key non-negative
+
+
+def haversine_m(lat: float, lng: float, lats: np.ndarray, lngs: np.ndarray) -> np.ndarray:
+    """Great-circle distance in metres from one point to arrays of points."""
+    p1, p2 = math.radians(lat), np.radians(lats)
+    dlat = p2 - p1
+    dlng = np.radians(lngs) - math.radians(lng)
+    a = np.sin(dlat / 2) ** 2 + math.cos(p1) * np.cos(p2) * np.sin(dlng / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def _cell(lat, lng, cell_deg: float):
+    return (np.floor(np.asarray(lat) / cell_deg).astype(np.int64),
+            np.floor(np.asarray(lng) / cell_deg).astype(np.int64))
+
+
+def _cell_key(cy, cx):
+    """Row-major cell id: grid row in the high 32 bits, column in the low."""
+    return (cy << 32) + (cx + _CX_OFFSET)
+
+
+def field_radius_m(area_acres: np.ndarray) -> np.ndarray:
+    """Radius of a circle with the farm's area: our stand-in for its boundary."""
+    return np.sqrt(np.nan_to_num(area_acres, nan=0.0).clip(min=0) * ACRE_M2 / np.pi)
+
+
+# -------------------------
+# GRID INDEX
+# -------------------------
+class FarmIndex:
+    """
+    Uniform-grid spatial index over registered farm locations.
+
+    Farms are sorted by grid cell (cell_deg degrees square), and only
+    non-empty cells are stored: `keys` (sorted cell ids) plus `starts`
+    (CSR offsets into the farm arrays). Cell ids are row-major, so the
+    cells of one grid row within a column range are a single slice; a
+    radius query is one binary search per grid row it spans, then an
+    exact haversine check on the candidates. Memory is linear in farms,
+    not in the area covered.
+
+    Each farm is treated as a circle with its registered area around its
+    centroid (farms.csv has no boundaries), which is what claim matching
+    tests against.
+    """
+
+    def __init__(self, arrays: Dict[str, np.ndarray], cell_deg: float):
+        self.cell_deg = cell_deg
+        self.lat = arrays["lat"]
+        self.lng = arrays["lng"]
+        self.radius = arrays["radius_m"]
+        self.farm_id = arrays["farm_id"]
+        self.farmer_id = arrays["farmer_id"]
+        self.keys = arrays["keys"]
+        self.starts = arrays["starts"]
+        self.by_farmer = arrays["by_farmer"]
+        self.max_radius_m = float(self.radius.max()) if len(self.radius) else 0.0
+
+    def __len__(self) -> int:
+        return len(self.lat)
+
+    @classmethod
+    def build(cls, frame: pd.DataFrame, cell_deg: float = 0.005) -> "FarmIndex":
+        """Index active farms of a farms.csv-shaped frame."""
+        if "is_active" in frame:
+            frame = frame[frame["is_active"].astype(str).str.lower() != "false"]
+        frame = frame.dropna(subset=["latitude", "longitude"])
+
+        lat = frame["latitude"].to_numpy(np.float64)
+        lng = frame["longitude"].to_numpy(np.float64)
+        cell = _cell_key(*_cell(lat, lng, cell_deg))
+        order = np.argsort(cell, kind="stable")
+        cell = cell[order]
+        keys, first = np.unique(cell, return_index=True)
+        farmer_id = frame["farmer_id"].to_numpy().astype(str).astype(np.bytes_)[order]
+
+        arrays = {
+            "lat": lat[order],
+            "lng": lng[order],
+            "radius_m": field_radius_m(frame["area_acres"].to_numpy(np.float64)[order]).astype(np.float32),
+            "farm_id": frame["id"].to_numpy().astype(str).astype(np.bytes_)[order],
+            "farmer_id": farmer_id,
+            "keys": keys,
+            "starts": np.append(first, len(cell)).astype(np.int64),
+            "by_farmer": np.argsort(farmer_id, kind="stable").astype(np.int64),
+        }
+        return cls(arrays, cell_deg)
+
+    def to_bundle(self) -> Tuple[Dict[str, np.ndarray], Dict[str, object]]:
+        arrays = {
+            "lat": self.lat, "lng": self.lng, "radius_m": self.radius,
+            "farm_id": self.farm_id, "farmer_id": self.farmer_id,
+            "keys": self.keys, "starts": self.starts, "by_farmer": self.by_farmer,
+        }
+        return arrays, {"cell_deg": self.cell_deg, "farms": len(self)}
+
+    # -------------------------
+    # QUERIES
+    # -------------------------
+    def _candidates(self, lat: float, lng: float, radius_m: float) -> np.ndarray:
+        """Row numbers of farms in the grid cells a radius_m circle touches."""
+        dlat = math.degrees(radius_m / EARTH_RADIUS_M)
+        dlng = dlat / max(math.cos(math.radians(min(abs(lat) + dlat, 89.9))), 1e-6)
+        (cy0, cy1), (cx0, cx1) = _cell([lat - dlat, lat + dlat], [lng - dlng, lng + dlng], self.cell_deg)
+
+        rows = np.arange(cy0, cy1 + 1, dtype=np.int64)
+        first = self.starts[np.searchsorted(self.keys, _cell_key(rows, cx0), side="left")]
+        last = self.starts[np.searchsorted(self.keys, _cell_key(rows, cx1), side="right")]
+        counts = last - first
+        total = int(counts.sum())
+        if not total:
+            return np.empty(0, dtype=np.int64)
+        # Concatenated [first, last) ranges without a Python loop
+        return np.repeat(first - np.cumsum(counts) + counts, counts) + np.arange(total)
+
+    def radius_query(self, lat: float, lng: float, radius_m: float) -> List[Tuple[int, float]]:
+        """(row, distance_m) of farms within radius_m, nearest first."""
+        rows = self._candidates(lat, lng, radius_m)
+        if not len(rows):
+            return []
+        dist = haversine_m(lat, lng, self.lat[rows], self.lng[rows])
+        hit = dist <= radius_m
+        rows, dist = rows[hit], dist[hit]
+        order = np.argsort(dist, kind="stable")
+        return [(int(rows[i]), float(dist[i])) for i in order]
+
+    def nearest(self, lat: float, lng: float, k: int = 1, max_m: float = 50_000.0) -> List[Tuple[int, float]]:
+        """
+        k nearest farms within max_m. The search radius starts at one cell
+        and doubles until k farms are found inside it, so sparse areas cost
+        a few more binary searches, not a scan.
+        """
+        radius = self.cell_deg * 111_320.0
+        while True:
+            radius = min(radius, max_m)
+            found = self.radius_query(lat, lng, radius)
+            if len(found) >= k or radius >= max_m:
+                return found[:k]
+            radius *= 2
+
+    def containing(self, lat: float, lng: float) -> List[Tuple[int, float]]:
+        """Farms whose field circle contains the point, nearest centroid first."""
+        return [
+            (row, dist) for row, dist in self.radius_query(lat, lng, self.max_radius_m)
+            if dist <= self.radius[row]
+        ]
+
+    def farmer_rows(self, farmer_id: str) -> List[int]:
+        """Rows of a farmer's farms: two binary searches over the by_farmer order."""
+        key = farmer_id.encode()
+        owner = lambda i: self.farmer_id[self.by_farmer[i]]  # noqa: E731
+        lo = bisect.bisect_left(range(len(self)), key, key=owner)
+        hi = bisect.bisect_right(range(len(self)), key, lo=lo, key=owner)
+        return sorted(self.by_farmer[lo:hi].tolist())
+
+    def farm(self, row: int, distance_m: Optional[float] = None) -> Dict[str, object]:
+        radius = float(self.radius[row])
+        farm = {
+            "farm_id": self.farm_id[row].decode(),
+            "farmer_id": self.farmer_id[row].decode(),
+            "lat": float(self.lat[row]),
+            "lng": float(self.lng[row]),
+            "area_acres": round(math.pi * radius * radius / ACRE_M2, 2),
+        }
+        if distance_m is not None:
+            farm["distance_m"] = round(distance_m, 1)
+        return farm
+
+
+# -------------------------
+# FLAT-FILE ARTIFACT
+# -------------------------
+_COLUMNS = ["id", "farmer_id", "area_acres", "latitude", "longitude", "is_active"]
+
+
+def read_farms(farms_path: Path) -> pd.DataFrame:
+    return pd.read_csv(farms_path, usecols=lambda c: c in _COLUMNS, dtype={"id": str, "farmer_id": str})
+
+
+def export_farm_index(farms_path: Path, out_dir: Path, cell_deg: float) -> Path:
+    """Index farms.csv and write it as a bundle tagged with the CSV's signature."""
+    arrays, meta = FarmIndex.build(read_farms(farms_path), cell_deg).to_bundle()
+    meta["source"] = file_signature(farms_path)
+    return write_bundle(out_dir, FARM_BUNDLE, arrays, meta)
+
+
+def load_farm_index(farms_path: Path, out_dir: Path, cell_deg: float) -> Optional[FarmIndex]:
+    """The prebuilt index if it matches farms.csv, else one built from the CSV (None without farms)."""
+    farms_path = Path(farms_path)
+    if not farms_path.exists():
+        return None
+    bundle = load_bundle(out_dir, FARM_BUNDLE)
+    if bundle is not None:
+        arrays, meta = bundle
+        if (meta.get("source") == file_signature(farms_path) and meta.get("cell_deg") == cell_deg
+                and "by_farmer" in arrays):
+            return FarmIndex(arrays, cell_deg)
+        logger.warning("⚠️ Farm index artifact is stale; re-run helper_functions/build_artifacts.py")
+    return FarmIndex.build(read_farms(farms_path), cell_deg)
@@ -0,0 +1,112 @@
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.metrics import track
+from app.repositories.sqlite_base import SQLiteStore
+
+
+class ForecastStore(SQLiteStore):
+    """
+    Materialized market forecasts (price_predictions in data/schema.sql).
+    One row per (model_version, crop, state, prediction_date), clustered on
+    that key, so serving a 7-day trend is a single index range scan.
+    price_p10/price_p90 are the ensemble band; NULL for a model without one.
+    """
+
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS price_predictions ("
+        " model_version TEXT NOT NULL,"
+        " crop TEXT NOT NULL,"
+        " state TEXT NOT NULL,"
+        " prediction_date TEXT NOT NULL,"
+        " predicted_price REAL NOT NULL,"
+        " price_p10 REAL,"
+        " price_p90 REAL,"
+        " confidence_score REAL,"
+        " created_at TEXT DEFAULT CURRENT_TIMESTAMP,"
+        " PRIMARY KEY (model_version, crop, state, prediction_date)"
+        ") WITHOUT ROWID",
+    )
+
+    def __init__(self, path):
+        super().__init__(path)
+        # The table is a cache rebuilt by every refresh, so a file from before
+        # the band columns is simply recreated rather than migrated
+        columns = {row[1] for row in self._conn().execute("PRAGMA table_info(price_predictions)")}
+        if "price_p10" not in columns:
+            self._conn().execute("DROP TABLE IF EXISTS price_predictions")
+            for statement in self.SCHEMA:
+                self._conn().execute(statement)
+
+    def replace_forecasts(
+        self,
+        model_version: str,
+        rows: Iterable[Tuple[str, str, str, float, Optional[float], Optional[float], Optional[float]]],
+        keep_from: date,
+    ) -> int:
+        """
+        Upsert (crop, state, date, price, p10, p90, confidence) rows for model_version
+        and drop rows of older versions or before keep_from, in one transaction.
+        """
+        rows = list(rows)
+        with track("forecast_write"), self.transaction():
+            conn = self._conn()
+            conn.executemany(
+                "INSERT OR REPLACE INTO price_predictions"
+                " (model_version, crop, state, prediction_date, predicted_price,"
+                "  price_p10, price_p90, confidence_score)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [(model_version, *row) for row in rows],
+            )
+            conn.execute(
+                "DELETE FROM price_predictions WHERE model_version != ? OR prediction_date < ?",
+                (model_version, keep_from.isoformat()),
+            )
+        return len(rows)
+
+    def lookup(
+        self, model_version: str, crop: str, state: str, start: date, end: date
+    ) -> Dict[str, Tuple[float, Optional[float], Optional[float]]]:
+        """{iso date: (price, p10, p90)} for crop/state between start and end (inclusive)."""
+        with track("forecast_read"):
+            rows = self._conn().execute(
+                "SELECT prediction_date, predicted_price, price_p10, price_p90 FROM price_predictions"
+                " WHERE model_version = ? AND crop = ? AND state = ?"
+                " AND prediction_date BETWEEN ? AND ?",
+                (model_version, crop, state, start.isoformat(), end.isoformat()),
+            ).fetchall()
+        return {day: (price, p10, p90) for day, price, p10, p90 in rows}
+
+    def trend_ends(
+        self, model_version: str, start: date, end: date
+    ) -> Tuple[List[Tuple[str, str]], np.ndarray, np.ndarray]:
+        """
+        ((crop, state) pairs, price on start, price on end) for every pair
+        materialized on both days, in one pass over model_version's rows.
+        """
+        with track("forecast_read"):
+            rows = self._conn().execute(
+                "SELECT s.crop, s.state, s.predicted_price, e.predicted_price"
+                " FROM price_predictions s JOIN price_predictions e"
+                " ON e.model_version = s.model_version AND e.crop = s.crop AND e.state = s.state"
+                " AND e.prediction_date = ?"
+                " WHERE s.model_version = ? AND s.prediction_date = ?",
+                (end.isoformat(), model_version, start.isoformat()),
+            ).fetchall()
+        pairs = [(crop, state) for crop, state, _, _ in rows]
+        start_prices = np.array([r[2] for r in rows], dtype=np.float64)
+        end_prices = np.array([r[3] for r in rows], dtype=np.float64)
+        return pairs, start_prices, end_prices
+
+    def coverage(self, model_version: str) -> Tuple[Optional[str], Optional[str], int]:
+        """(first date, last date, row count) materialized for model_version."""
+        return self._conn().execute(
+            "SELECT MIN(prediction_date), MAX(prediction_date), COUNT(*) FROM price_predictions"
+            " WHERE model_version = ?",
+            (model_version,),
+        ).fetchone()
+
+    def versions(self) -> List[str]:
+        return [r[0] for r in self._conn().execute("SELECT DISTINCT model_version FROM price_predictions")]
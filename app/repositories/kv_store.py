@@ -0,0 +1,62 @@
+import json
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+from app.core.metrics import track
+from app.repositories.sqlite_base import SQLiteStore
+
+
+class KVStore(SQLiteStore):
+    """
+    Small key-value store shared by every worker process on the host.
+    Backed by one SQLite file in WAL mode: readers never block, writers
+    serialize on the database lock, and expired keys are invisible.
+    Values are JSON.
+    """
+
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS kv ("
+        " namespace TEXT NOT NULL,"
+        " key TEXT NOT NULL,"
+        " value TEXT NOT NULL,"
+        " expires_at REAL,"
+        " PRIMARY KEY (namespace, key))",
+    )
+
+    def __init__(self, path: Path, namespace: str):
+        self.namespace = namespace
+        super().__init__(path)
+
+    # -------------------------
+    # BASIC OPERATIONS
+    # -------------------------
+    def get(self, key: str) -> Optional[Any]:
+        with track("kv_read"):
+            row = self._conn().execute(
+                "SELECT value FROM kv WHERE namespace = ? AND key = ?"
+                " AND (expires_at IS NULL OR expires_at > ?)",
+                (self.namespace, key, time.time()),
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        expires_at = time.time() + ttl if ttl else None
+        with track("kv_write"):
+            self._conn().execute(
+                "INSERT OR REPLACE INTO kv (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+                (self.namespace, key, json.dumps(value), expires_at),
+            )
+
+    def delete(self, key: str) -> None:
+        with track("kv_write"):
+            self._conn().execute("DELETE FROM kv WHERE namespace = ? AND key = ?", (self.namespace, key))
+
+    def purge_expired(self) -> int:
+        """Delete expired keys of this namespace; returns how many went."""
+        with track("kv_write"):
+            cur = self._conn().execute(
+                "DELETE FROM kv WHERE namespace = ? AND expires_at IS NOT NULL AND expires_at <= ?",
+                (self.namespace, time.time()),
+            )
+        return cur.rowcount
@@ -0,0 +1,163 @@
+import logging
+import math
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+from app.repositories.artifacts import allocate_bundle, load_bundle
+
+logger = logging.getLogger(__name__)
+
+# ESA WorldCover codes (0 = no data)
+LAND_NAMES = {
+    10: "Trees/Forest", 20: "Shrubland", 30: "Grassland", 40: "Cropland",
+    50: "Urban/Building", 60: "Barren Land", 80: "Water Body", 90: "Wetland", 95: "Mangroves",
+}
+FARMABLE_CLASSES = frozenset({30, 40})  # Grassland, Cropland
+NO_DATA = 0
+
+TILE_DEG = 3  # WorldCover tiles are 3° x 3°, named by their south-west corner
+BLOCK = 256   # 256 x 256 px = 64 KB per cached block
+
+
+def tile_name(south: int, west: int) -> str:
+    """worldcover_N27E075 for the tile whose south-west corner is (27, 75)."""
+    ns = f"{'N' if south >= 0 else 'S'}{abs(south):02d}"
+    ew = f"{'E' if west >= 0 else 'W'}{abs(west):03d}"
+    return f"worldcover_{ns}{ew}"
+
+
+# -------------------------
+# TILE EXPORT
+# -------------------------
+# A tile is an artifact bundle holding one uint8 array laid out block by
+# block, (rows/B, cols/B, B, B), so a block is one contiguous 64 KB run
+# of the file: a lookup touches one block's pages, not a 36000-px-wide
+# strip. Edges are padded with NO_DATA.
+
+def write_tile(
+    read_rows: Callable[[int, int], np.ndarray],
+    height: int,
+    width: int,
+    south: int,
+    west: int,
+    res: float,
+    out_dir: Path,
+    block: int = BLOCK,
+) -> Path:
+    """
+    Write a tile bundle from read_rows(r0, r1) -> (r1 - r0, width) class
+    codes, read one block row at a time so a 1.3 GB tile never has to fit
+    in memory. res is the pixel size in degrees; row 0 is the north edge.
+    """
+    name = tile_name(south, west)
+    nby, nbx = -(-height // block), -(-width // block)
+    meta = {
+        "south": south, "west": west, "north": south + TILE_DEG,
+        "res": res, "height": height, "width": width, "block": block,
+    }
+    with allocate_bundle(out_dir, name, {"blocks": (np.uint8, (nby, nbx, block, block))}, meta) as arrays:
+        blocks = arrays["blocks"]
+        for by in range(nby):
+            r0, r1 = by * block, min(height, (by + 1) * block)
+            strip = np.full((block, nbx * block), NO_DATA, dtype=np.uint8)
+            strip[: r1 - r0, :width] = read_rows(r0, r1)
+            blocks[by] = strip.reshape(block, nbx, block).swapaxes(0, 1)
+    return Path(out_dir) / f"{name}.bin"
+
+
+def export_geotiff(src_path: Path, out_dir: Path, block: int = BLOCK) -> Path:
+    """Convert one downloaded ESA_WorldCover_10m_*_Map.tif into a tile bundle (needs rasterio)."""
+    try:
+        import rasterio
+        from rasterio.windows import Window
+    except ImportError as e:
+        raise ImportError("Converting WorldCover GeoTIFFs needs rasterio: pip install rasterio") from e
+
+    with rasterio.open(src_path) as src:
+        transform = src.transform
+        west, north, res = transform.c, transform.f, transform.a
+        south = round(north - src.height * res)
+        return write_tile(
+            lambda r0, r1: src.read(1, window=Window(0, r0, src.width, r1 - r0)),
+            src.height, src.width, south, round(west), res, out_dir, block,
+        )
+
+
+# -------------------------
+# LOOKUP
+# -------------------------
+class LandCoverService:
+    """
+    Offline ESA WorldCover lookups from local tile bundles.
+
+    Tiles are memory-mapped at startup; a lookup maps lat/lng to a pixel,
+    copies that pixel's block out of the map on first use, and keeps the
+    most recently used `cache_blocks` blocks in memory. Farms cluster
+    around a few villages, so most lookups are one dict hit and an index.
+
+    land_class() returns None where no tile covers the point or the pixel
+    has no data; callers then fall back to Earth Engine.
+    """
+
+    def __init__(self, tile_dir: Path, cache_blocks: int = 256):
+        self.tile_dir = Path(tile_dir)
+        self.cache_blocks = cache_blocks
+        self._tiles: Dict[Tuple[int, int], Tuple[np.ndarray, dict]] = {}
+        self._cache: "OrderedDict[tuple, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = 0
+        self._load_tiles()
+
+    def _load_tiles(self) -> None:
+        if not self.tile_dir.exists():
+            return
+        for manifest in sorted(self.tile_dir.glob("worldcover_*.json")):
+            bundle = load_bundle(self.tile_dir, manifest.stem)
+            if bundle is None:
+                continue
+            arrays, meta = bundle
+            self._tiles[(meta["south"], meta["west"])] = (arrays["blocks"], meta)
+        if self._tiles:
+            logger.info(f"🗺️ Land cover: {len(self._tiles)} local WorldCover tiles")
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self._tiles)
+
+    def _block(self, key: tuple, blocks: np.ndarray, by: int, bx: int) -> np.ndarray:
+        with self._lock:
+            block = self._cache.get(key)
+            if block is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return block
+        block = np.array(blocks[by, bx])  # page in 64 KB once, then serve from memory
+        with self._lock:
+            self.misses += 1
+            self._cache[key] = block
+            if len(self._cache) > self.cache_blocks:
+                self._cache.popitem(last=False)
+        return block
+
+    def land_class(self, lat: float, lng: float) -> Optional[int]:
+        """WorldCover code at (lat, lng), or None if not available locally."""
+        tile_key = (math.floor(lat / TILE_DEG) * TILE_DEG, math.floor(lng / TILE_DEG) * TILE_DEG)
+        tile = self._tiles.get(tile_key)
+        if tile is None:
+            return None
+        blocks, meta = tile
+
+        # Pixel (row, col) from the tile's north-west origin
+        row = int((meta["north"] - lat) / meta["res"])
+        col = int((lng - meta["west"]) / meta["res"])
+        if not (0 <= row < meta["height"] and 0 <= col < meta["width"]):
+            return None
+
+        b = meta["block"]
+        block = self._block((tile_key, row // b, col // b), blocks, row // b, col // b)
+        code = int(block[row % b, col % b])
+        return None if code == NO_DATA else code
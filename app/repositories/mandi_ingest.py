@@ -0,0 +1,472 @@
+import logging
+import os
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.core.metrics import track
+
+logger = logging.getLogger(__name__)
+
+# --- NORMALIZED LAYOUT ---
+NORMALIZED_COLUMNS = [
+    "state", "district", "market", "crop", "variety", "grade",
+    "min_price", "max_price", "modal_price", "arrival_quantity", "date",
+]
+PRICE_COLUMNS = ("min_price", "max_price", "modal_price", "arrival_quantity")
+TEXT_COLUMNS = ("state", "district", "market", "crop", "variety", "grade")
+
+# Agmarknet / internal header variants -> normalized name
+RENAME_MAP = {
+    "state_name": "state",
+    "district_name": "district",
+    "market_name": "market",
+    "mandi_name": "market",
+    "commodity": "crop",
+    "price": "modal_price",
+    "price_date": "date",
+    "arrival_date": "date",
+}
+
+DEFAULT_CHUNK_ROWS = 100_000
+_HEADER_SCAN_LINES = 200
+_SNIFF_BYTES = 64 * 1024
+
+
+# -------------------------
+# FORMAT DETECTION
+# -------------------------
+def sniff_format(path: Path) -> Tuple[str, str, str]:
+    """
+    Detect (kind, encoding, separator) from the first bytes of a file.
+    kind is "excel" for .xlsx/.xls saved under a .csv name, else "csv".
+    """
+    with open(path, "rb") as f:
+        head = f.read(_SNIFF_BYTES)
+
+    if head.startswith(b"PK\x03\x04") or head.startswith(b"\xd0\xcf\x11\xe0"):
+        return "excel", "", ""
+    if head.startswith((b"\xff\xfe", b"\xfe\xff")):
+        text = head.decode("utf-16", errors="ignore")
+        return "csv", "utf-16", "\t" if "\t" in text.split("\n", 1)[0] else ","
+    if head.startswith(b"\xef\xbb\xbf"):
+        return "csv", "utf-8-sig", ","
+    try:
+        # Drop a possibly truncated multi-byte sequence at the cut
+        head[:-4].decode("utf-8")
+        return "csv", "utf-8", ","
+    except UnicodeDecodeError:
+        return "csv", "mac_roman", ","
+
+
+def is_header_line(line: str) -> bool:
+    """A mandi header mentions a state, a price and a market/crop column."""
+    lower = line.lower()
+    return "state" in lower and "price" in lower and ("market" in lower or "mandi" in lower
+                                                     or "crop" in lower or "commodity" in lower)
+
+
+def find_header_row(path: Path, encoding: str) -> int:
+    """Index of the real header row (skipping export preambles), or -1."""
+    with open(path, "r", encoding=encoding, errors="replace") as f:
+        for i, line in enumerate(f):
+            if i >= _HEADER_SCAN_LINES:
+                break
+            if is_header_line(line):
+                return i
+    return -1
+
+
+def normalize_columns(columns) -> List[str]:
+    """Lower-case, drop '(...)' suffixes, snake_case, then apply RENAME_MAP."""
+    cleaned = (
+        pd.Index(columns).astype(str).str.lower()
+        .str.replace(r"[\(].*?[\)]", "", regex=True).str.strip().str.replace(" ", "_")
+    )
+    return [RENAME_MAP.get(c, c) for c in cleaned]
+
+
+# -------------------------
+# CHUNK NORMALIZATION
+# -------------------------
+def _to_number(series: pd.Series) -> pd.Series:
+    return pd.to_numeric(series.astype(str).str.replace(",", "", regex=False), errors="coerce")
+
+
+def _to_date(series: pd.Series) -> pd.Series:
+    parsed = pd.to_datetime(series, format="%d-%m-%Y", errors="coerce")
+    missing = parsed.isna() & series.notna()
+    if missing.any():
+        parsed[missing] = pd.to_datetime(series[missing], format="ISO8601", errors="coerce")
+    return parsed
+
+
+def normalize_chunk(df: pd.DataFrame) -> Optional[pd.DataFrame]:
+    """
+    Map one raw chunk onto NORMALIZED_COLUMNS with typed prices and dates.
+    Returns None when the chunk has no crop/price columns (not a mandi file).
+    """
+    df.columns = normalize_columns(df.columns)
+    df = df.loc[:, ~pd.Index(df.columns).duplicated()]
+    if "crop" not in df.columns or "modal_price" not in df.columns:
+        return None
+
+    out = pd.DataFrame(index=df.index)
+    for col in TEXT_COLUMNS:
+        out[col] = df[col].astype(str).str.strip() if col in df.columns else ""
+    if "state" not in df.columns:
+        out["state"] = "India"
+    for col in PRICE_COLUMNS:
+        out[col] = _to_number(df[col]).astype("float32") if col in df.columns else np.float32("nan")
+    out["date"] = _to_date(df["date"]) if "date" in df.columns else pd.NaT
+
+    out = out.dropna(subset=["modal_price"])
+    return out[NORMALIZED_COLUMNS]
+
+
+def iter_mandi_chunks(path, chunk_rows: int = DEFAULT_CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    """
+    Stream one mandi export as normalized DataFrame chunks.
+    Peak memory is one chunk, whatever the file size. Yields nothing for
+    files that are not price exports (farmers.csv, soil data, ...).
+    """
+    path = Path(path)
+    kind, encoding, sep = sniff_format(path)
+
+    if kind == "excel":
+        # Spreadsheets cannot be streamed; they are small manual exports in practice.
+        logger.warning(f"⚠️ {path.name} is a spreadsheet saved as .csv; loading it whole.")
+        with track("file_read"):
+            raw = pd.read_excel(path, dtype=str)
+        for start in range(0, len(raw), chunk_rows):
+            chunk = normalize_chunk(raw.iloc[start:start + chunk_rows].copy())
+            if chunk is None:
+                return
+            yield chunk
+        return
+
+    header_row = find_header_row(path, encoding)
+    if header_row < 0:
+        return
+
+    reader = pd.read_csv(
+        path,
+        encoding=encoding,
+        encoding_errors="replace",
+        sep=sep,
+        skiprows=header_row,
+        chunksize=chunk_rows,
+        dtype=str,
+        on_bad_lines="skip",
+    )
+    with reader:
+        while True:
+            with track("file_read"):
+                raw = next(reader, None)
+            if raw is None:
+                return
+            chunk = normalize_chunk(raw)
+            if chunk is None:
+                return
+            yield chunk
+
+
+def list_mandi_files(src_dir) -> List[Path]:
+    """All *.csv files of a folder in a stable order."""
+    return sorted(Path(src_dir).glob("*.csv"))
+
+
+def iter_directory_chunks(src_dir, chunk_rows: int = DEFAULT_CHUNK_ROWS) -> Iterator[Tuple[Path, pd.DataFrame]]:
+    """Stream (source file, normalized chunk) pairs over every mandi file in src_dir."""
+    for path in list_mandi_files(src_dir):
+        try:
+            for chunk in iter_mandi_chunks(path, chunk_rows):
+                yield path, chunk
+        except Exception as e:
+            logger.warning(f"⚠️ Skipped {path.name}: {e}")
+
+
+# -------------------------
+# NORMALIZED STORE
+# -------------------------
+def ingest_file(src: Path, out_dir: Path, chunk_rows: int = DEFAULT_CHUNK_ROWS) -> Dict[str, object]:
+    """
+    Write the normalized version of src to out_dir/<name>.
+    The source is only read; output goes to a temp file renamed into place.
+    """
+    out_dir.mkdir(parents=True, exist_ok=True)
+    target = out_dir / src.name
+    tmp = target.with_suffix(target.suffix + ".tmp")
+    rows = 0
+    try:
+        for chunk in iter_mandi_chunks(src, chunk_rows):
+            chunk.to_csv(
+                tmp, mode="a" if rows else "w", header=not rows, index=False, date_format="%Y-%m-%d"
+            )
+            rows += len(chunk)
+    except Exception:
+        tmp.unlink(missing_ok=True)
+        raise
+
+    if not rows:
+        tmp.unlink(missing_ok=True)
+        return {"file": src.name, "status": "skipped", "rows": 0}
+    os.replace(tmp, target)
+    return {"file": src.name, "status": "ingested", "rows": rows}
+
+
+def ingest_directory(src_dir, out_dir, chunk_rows: int = DEFAULT_CHUNK_ROWS) -> List[Dict[str, object]]:
+    """Normalize every mandi file in src_dir into out_dir (non-destructive)."""
+    src_dir, out_dir = Path(src_dir), Path(out_dir)
+    reports = []
+    for path in list_mandi_files(src_dir):
+        try:
+            reports.append(ingest_file(path, out_dir, chunk_rows))
+        except Exception as e:
+            logger.error(f"❌ Ingest failed for {path.name}: {e}")
+            reports.append({"file": path.name, "status": "failed", "rows": 0, "error": str(e)})
+    return reports
+
+
+# -------------------------
+# PARALLEL COLUMNAR INGEST
+# -------------------------
+CODE_COLUMNS = ("state", "district", "market", "crop")
+VALUE_COLUMNS = ("min_price", "max_price", "modal_price", "arrival_quantity")
+_EPOCH = np.datetime64("1970-01-01", "D")
+MISSING_DAY = np.iinfo(np.int32).min
+
+# Below this much input a process pool costs more than it saves.
+PARALLEL_MIN_BYTES = 32 * 1024 * 1024
+
+
+class MandiArrays:
+    """
+    Compact columnar form of the mandi exports.
+    Text columns are int32 codes into per-column vocab lists, prices are
+    float32, dates are int32 days since 1970-01-01 (MISSING_DAY if unknown)
+    and `source` is the int16 index of the file each row came from.
+    """
+
+    def __init__(self, codes: Dict[str, np.ndarray], vocab: Dict[str, List[str]],
+                 values: Dict[str, np.ndarray], day: np.ndarray, source: np.ndarray,
+                 files: List[str]):
+        self.codes = codes
+        self.vocab = vocab
+        self.values = values
+        self.day = day
+        self.source = source
+        self.files = files
+
+    def __len__(self) -> int:
+        return len(self.day)
+
+    def to_frame(self) -> pd.DataFrame:
+        """DataFrame view with pandas categoricals for the text columns."""
+        data = {
+            col: pd.Categorical.from_codes(self.codes[col], categories=pd.Index(self.vocab[col]))
+            for col in CODE_COLUMNS
+        }
+        data.update(self.values)
+        data["date"] = pd.to_datetime(
+            np.where(self.day == MISSING_DAY, np.iinfo(np.int64).min, self.day.astype(np.int64) * 86400 * 10**9)
+        )
+        return pd.DataFrame(data)
+
+
+def _encode_chunk(chunk: pd.DataFrame, vocab: Dict[str, Dict[str, int]]) -> Dict[str, np.ndarray]:
+    """Factorize one chunk's text columns against the running per-file vocab."""
+    out = {}
+    for col in CODE_COLUMNS:
+        local_codes, uniques = pd.factorize(chunk[col], use_na_sentinel=False)
+        table = vocab[col]
+        remap = np.fromiter((table.setdefault(u, len(table)) for u in uniques), dtype=np.int32, count=len(uniques))
+        out[col] = remap[local_codes]
+    for col in VALUE_COLUMNS:
+        out[col] = chunk[col].to_numpy(dtype=np.float32, na_value=np.nan)
+    days = chunk["date"].to_numpy(dtype="datetime64[D]")
+    out["day"] = np.where(np.isnat(days), MISSING_DAY, (days - _EPOCH).astype(np.int64)).astype(np.int32)
+    return out
+
+
+def _file_columns(path: str, chunk_rows: int):
+    """Columnar arrays + vocab for one file (runs inside a worker)."""
+    vocab = {col: {} for col in CODE_COLUMNS}
+    parts = [_encode_chunk(chunk, vocab) for chunk in iter_mandi_chunks(path, chunk_rows)]
+    fields = CODE_COLUMNS + VALUE_COLUMNS + ("day",)
+    if parts:
+        arrays = {f: np.concatenate([p[f] for p in parts]) for f in fields}
+    else:
+        arrays = {f: np.empty(0, dtype=np.float32 if f in VALUE_COLUMNS else np.int32) for f in fields}
+    return arrays, {col: list(table) for col, table in vocab.items()}
+
+
+def _ingest_worker(path: str, chunk_rows: int) -> Dict[str, object]:
+    """
+    Process-pool entry point. Packs the file's arrays into one shared-memory
+    block and returns only its name, layout and the vocab lists, so no
+    DataFrame is ever pickled across the process boundary.
+    """
+    from multiprocessing import resource_tracker, shared_memory
+
+    arrays, vocab = _file_columns(path, chunk_rows)
+    rows = len(arrays["day"])
+    if rows == 0:
+        return {"path": path, "rows": 0, "vocab": vocab, "shm": None, "layout": []}
+
+    layout, offset = [], 0
+    for name, arr in arrays.items():
+        layout.append((name, arr.dtype.str, offset))
+        offset += arr.nbytes
+    shm = shared_memory.SharedMemory(create=True, size=offset)
+    for (name, _, start), arr in zip(layout, arrays.values()):
+        shm.buf[start:start + arr.nbytes] = arr.tobytes()
+    # The parent unlinks the block after copying it out.
+    resource_tracker.unregister(shm._name, "shared_memory")
+    shm.close()
+    return {"path": path, "rows": rows, "vocab": vocab, "shm": shm.name, "layout": layout}
+
+
+def _collect(result: Dict[str, object]):
+    """Copy a worker's shared-memory block into private arrays and release it."""
+    from multiprocessing import shared_memory
+
+    if not result["shm"]:
+        return {}
+    shm = shared_memory.SharedMemory(name=result["shm"])
+    try:
+        rows = result["rows"]
+        return {
+            name: np.frombuffer(shm.buf, dtype=np.dtype(dtype), count=rows, offset=offset).copy()
+            for name, dtype, offset in result["layout"]
+        }
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def load_mandi_arrays(src_dir, workers: int = 0, chunk_rows: int = DEFAULT_CHUNK_ROWS) -> MandiArrays:
+    """
+    Ingest every mandi file of src_dir into one MandiArrays.
+    Files fan out across a spawn-based process pool (one file per task);
+    the merge walks results in sorted file order so codes are deterministic.
+    workers=0 means os.cpu_count(); small folders are ingested in-process.
+    """
+    files = list_mandi_files(src_dir)
+    workers = workers or os.cpu_count() or 1
+    total_bytes = sum(p.stat().st_size for p in files)
+
+    per_file: List[Tuple[Dict[str, np.ndarray], Dict[str, List[str]]]] = []
+    if workers > 1 and len(files) > 1 and total_bytes >= PARALLEL_MIN_BYTES:
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=min(workers, len(files)), mp_context=ctx) as pool:
+            futures = [pool.submit(_ingest_worker, str(p), chunk_rows) for p in files]
+            for path, future in zip(files, futures):
+                try:
+                    result = future.result()
+                    per_file.append((_collect(result), result["vocab"]))
+                except Exception as e:
+                    logger.warning(f"⚠️ Skipped {path.name}: {e}")
+                    per_file.append(({}, {}))
+    else:
+        for path in files:
+            try:
+                per_file.append(_file_columns(str(path), chunk_rows))
+            except Exception as e:
+                logger.warning(f"⚠️ Skipped {path.name}: {e}")
+                per_file.append(({}, {}))
+
+    return _merge(files, per_file)
+
+
+def _merge(files: List[Path], per_file) -> MandiArrays:
+    """Deterministic merge: global vocab grows in file order, codes are remapped."""
+    global_vocab: Dict[str, Dict[str, int]] = {col: {} for col in CODE_COLUMNS}
+    codes = {col: [] for col in CODE_COLUMNS}
+    values = {col: [] for col in VALUE_COLUMNS}
+    days, sources = [], []
+
+    for file_idx, (arrays, vocab) in enumerate(per_file):
+        if not arrays or not len(arrays["day"]):
+            continue
+        for col in CODE_COLUMNS:
+            table = global_vocab[col]
+            remap = np.array([table.setdefault(v, len(table)) for v in vocab[col]], dtype=np.int32)
+            codes[col].append(remap[arrays[col]])
+        for col in VALUE_COLUMNS:
+            values[col].append(arrays[col])
+        days.append(arrays["day"])
+        sources.append(np.full(len(arrays["day"]), file_idx, dtype=np.int16))
+
+    def cat(parts, dtype):
+        return np.concatenate(parts) if parts else np.empty(0, dtype=dtype)
+
+    return MandiArrays(
+        codes={col: cat(codes[col], np.int32) for col in CODE_COLUMNS},
+        vocab={col: list(table) for col, table in global_vocab.items()},
+        values={col: cat(values[col], np.float32) for col in VALUE_COLUMNS},
+        day=cat(days, np.int32),
+        source=cat(sources, np.int16),
+        files=[p.name for p in files],
+    )
+
+
+def _aggregate_file(path: str, keys: Tuple[str, ...], value: str, chunk_rows: int) -> Dict[tuple, Tuple[float, int]]:
+    sums: Dict[tuple, Tuple[float, int]] = {}
+    for chunk in iter_mandi_chunks(path, chunk_rows):
+        partial = chunk.groupby(list(keys))[value].agg(["sum", "count"])
+        for key, (total, count) in zip(partial.index, partial.values):
+            key = key if isinstance(key, tuple) else (key,)
+            prev_total, prev_count = sums.get(key, (0.0, 0))
+            sums[key] = (prev_total + float(total), prev_count + int(count))
+    return sums
+
+
+def aggregate_directory(
+    src_dir,
+    keys: Tuple[str, ...] = ("crop", "state"),
+    value: str = "modal_price",
+    workers: int = 0,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+) -> Dict[tuple, Tuple[float, int]]:
+    """
+    Streaming (sum, count) of `value` per `keys` over every mandi file.
+    Each file is reduced in its own worker, so memory per worker is one
+    chunk and only the small per-key totals cross process boundaries.
+    """
+    files = list_mandi_files(src_dir)
+    workers = workers or os.cpu_count() or 1
+    parallel = workers > 1 and len(files) > 1 and sum(p.stat().st_size for p in files) >= PARALLEL_MIN_BYTES
+
+    if parallel:
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=min(workers, len(files)), mp_context=ctx) as pool:
+            futures = [pool.submit(_aggregate_file, str(p), keys, value, chunk_rows) for p in files]
+            partials = []
+            for path, future in zip(files, futures):
+                try:
+                    partials.append(future.result())
+                except Exception as e:
+                    logger.warning(f"⚠️ Skipped {path.name}: {e}")
+    else:
+        partials = []
+        for path in files:
+            try:
+                partials.append(_aggregate_file(str(path), keys, value, chunk_rows))
+            except Exception as e:
+                logger.warning(f"⚠️ Skipped {path.name}: {e}")
+
+    totals: Dict[tuple, Tuple[float, int]] = {}
+    for partial in partials:
+        for key, (total, count) in partial.items():
+            prev_total, prev_count = totals.get(key, (0.0, 0))
+            totals[key] = (prev_total + total, prev_count + count)
+    return totals
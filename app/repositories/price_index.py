@@ -0,0 +1,264 @@
+import logging
+from datetime import date
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.repositories.artifacts import file_signature, load_bundle, write_bundle
+from app.repositories.mandi_ingest import MISSING_DAY, MandiArrays, list_mandi_files, load_mandi_arrays
+from app.repositories.vocab import CROPS, STATES
+
+logger = logging.getLogger(__name__)
+
+_EPOCH = np.datetime64("1970-01-01", "D")
+INTERVALS = ("daily", "weekly", "monthly")
+INDEX_BUNDLE = "market_index"
+
+
+class _SortedBlock:
+    """
+    Price rows sorted by (group key, day) with the row range of every group.
+    Any group's date window is then two binary searches away.
+    """
+
+    def __init__(self, keys: Tuple[np.ndarray, ...], day: np.ndarray,
+                 low: np.ndarray, modal: np.ndarray, high: np.ndarray):
+        # np.lexsort sorts by the last key first
+        order = np.lexsort((day,) + tuple(reversed(keys)))
+        self.day = day[order]
+        self.low = low[order]
+        self.modal = modal[order]
+        self.high = high[order]
+
+        sorted_keys = [k[order] for k in keys]
+        if len(order):
+            changed = np.zeros(len(order), dtype=bool)
+            changed[0] = True
+            for k in sorted_keys:
+                changed[1:] |= k[1:] != k[:-1]
+            starts = np.flatnonzero(changed)
+            ends = np.append(starts[1:], len(order))
+        else:
+            starts = ends = np.empty(0, dtype=np.int64)
+        self.groups: Dict[tuple, Tuple[int, int]] = {
+            tuple(int(k[s]) for k in sorted_keys): (int(s), int(e)) for s, e in zip(starts, ends)
+        }
+
+    @classmethod
+    def from_parts(cls, day, low, modal, high, keys: np.ndarray, bounds: np.ndarray, remap) -> "_SortedBlock":
+        """Rebuild from stored arrays; remap translates stored key codes to live ones."""
+        block = cls.__new__(cls)
+        block.day, block.low, block.modal, block.high = day, low, modal, high
+        block.groups = {
+            remap(tuple(int(v) for v in key)): (int(s), int(e)) for key, (s, e) in zip(keys, bounds)
+        }
+        return block
+
+    def parts(self, prefix: str) -> Dict[str, np.ndarray]:
+        keys = list(self.groups)
+        width = len(keys[0]) if keys else 0
+        return {
+            f"{prefix}_day": self.day,
+            f"{prefix}_low": self.low,
+            f"{prefix}_modal": self.modal,
+            f"{prefix}_high": self.high,
+            f"{prefix}_keys": np.array(keys, dtype=np.int32).reshape(len(keys), width),
+            f"{prefix}_bounds": np.array(list(self.groups.values()), dtype=np.int64).reshape(len(keys), 2),
+        }
+
+    def window(self, key: tuple, start_day: int, end_day: int) -> Tuple[int, int]:
+        """Row range [lo, hi) of `key` with start_day <= day <= end_day."""
+        bounds = self.groups.get(key)
+        if bounds is None:
+            return 0, 0
+        s, e = bounds
+        lo = s + int(np.searchsorted(self.day[s:e], start_day, side="left"))
+        hi = s + int(np.searchsorted(self.day[s:e], end_day, side="right"))
+        return lo, hi
+
+
+class PriceIndex:
+    """
+    In-memory mandi price index.
+    Rows are held twice: sorted by (crop, state, market, date) for
+    per-mandi charts and by (crop, state, date) for state-wide charts.
+    Crop and state names resolve through the shared vocabulary, so any
+    alias finds the series; market names are matched case-insensitively.
+    """
+
+    def __init__(self, arrays: MandiArrays):
+        values = arrays.values
+        keep = (arrays.day != MISSING_DAY) & ~np.isnan(values["modal_price"])
+        modal = values["modal_price"][keep]
+        # Files with only a single price column get a flat low/high
+        low = np.where(np.isnan(values["min_price"][keep]), modal, values["min_price"][keep])
+        high = np.where(np.isnan(values["max_price"][keep]), modal, values["max_price"][keep])
+        day = arrays.day[keep]
+
+        # Crops and states map onto the shared vocabulary ("Paddy(Common)" and
+        # "rice" are one series); markets only fold case and whitespace.
+        self._markets: Dict[str, int] = {}
+        resolvers = {
+            "crop": CROPS.id,
+            "state": STATES.id,
+            "market": lambda name: self._markets.setdefault(str(name).strip().lower(), len(self._markets)),
+        }
+        folded = {}
+        for col, resolve in resolvers.items():
+            remap = np.array([resolve(name) for name in arrays.vocab[col]], dtype=np.int32)
+            folded[col] = remap[arrays.codes[col][keep]] if len(remap) else arrays.codes[col][keep]
+        crop, state, market = folded["crop"], folded["state"], folded["market"]
+        self.by_market = _SortedBlock((crop, state, market), day, low, modal, high)
+        self.by_state = _SortedBlock((crop, state), day, low, modal, high)
+        self.rows = int(keep.sum())
+        logger.info(f"📈 Price index built: {self.rows} rows, {len(self.by_market.groups)} mandi series")
+
+    # -------------------------
+    # FLAT-FILE ARTIFACT
+    # -------------------------
+    def to_bundle(self) -> Tuple[Dict[str, np.ndarray], Dict[str, object]]:
+        """Arrays + meta for artifacts.write_bundle (vocab IDs stored by name)."""
+        arrays = {**self.by_market.parts("market"), **self.by_state.parts("state")}
+        meta = {
+            "rows": self.rows,
+            "crops": list(CROPS.names),
+            "states": list(STATES.names),
+            "markets": self._markets,
+        }
+        return arrays, meta
+
+    @classmethod
+    def from_bundle(cls, arrays: Dict[str, np.ndarray], meta: Dict[str, object]) -> "PriceIndex":
+        """Index over memmapped arrays; only the small group tables are rebuilt."""
+        index = cls.__new__(cls)
+        crop_ids = [CROPS.id(name) for name in meta["crops"]]
+        state_ids = [STATES.id(name) for name in meta["states"]]
+        index._markets = dict(meta["markets"])
+        index.rows = meta["rows"]
+
+        def block(prefix, remap):
+            return _SortedBlock.from_parts(
+                arrays[f"{prefix}_day"], arrays[f"{prefix}_low"], arrays[f"{prefix}_modal"],
+                arrays[f"{prefix}_high"], arrays[f"{prefix}_keys"], arrays[f"{prefix}_bounds"], remap,
+            )
+
+        index.by_market = block("market", lambda k: (crop_ids[k[0]], state_ids[k[1]], k[2]))
+        index.by_state = block("state", lambda k: (crop_ids[k[0]], state_ids[k[1]]))
+        return index
+
+    def code(self, column: str, name: str) -> Optional[int]:
+        if column == "crop":
+            return CROPS.resolve(name)
+        if column == "state":
+            return STATES.resolve(name)
+        return self._markets.get(str(name).strip().lower())
+
+    def query(
+        self,
+        crop: str,
+        state: str,
+        market: Optional[str] = None,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+        interval: str = "daily",
+    ) -> Optional[List[Dict[str, object]]]:
+        """
+        OHLC history for crop/state (optionally one market) between start and end.
+        Returns None when the crop, state or market is unknown.
+        """
+        if interval not in INTERVALS:
+            raise ValueError(f"interval must be one of {', '.join(INTERVALS)}")
+
+        crop_code, state_code = self.code("crop", crop), self.code("state", state)
+        if crop_code is None or state_code is None:
+            return None
+        if market:
+            market_code = self.code("market", market)
+            if market_code is None:
+                return None
+            block, key = self.by_market, (crop_code, state_code, market_code)
+        else:
+            block, key = self.by_state, (crop_code, state_code)
+
+        start_day = (np.datetime64(start, "D") - _EPOCH).astype(int) if start else np.iinfo(np.int32).min
+        end_day = (np.datetime64(end, "D") - _EPOCH).astype(int) if end else np.iinfo(np.int32).max
+        lo, hi = block.window(key, start_day, end_day)
+        if lo >= hi:
+            return []
+        return _downsample(block, lo, hi, interval)
+
+
+def _bucket_days(day: np.ndarray, interval: str) -> np.ndarray:
+    """First day of the daily / weekly (Monday) / monthly bucket of each row."""
+    if interval == "weekly":
+        # 1970-01-01 was a Thursday, so shift by 3 to land buckets on Mondays
+        return (day + 3) // 7 * 7 - 3
+    if interval == "monthly":
+        months = (_EPOCH + day.astype("timedelta64[D]")).astype("datetime64[M]")
+        return (months.astype("datetime64[D]") - _EPOCH).astype(np.int64)
+    return day.astype(np.int64)
+
+
+def _downsample(block: _SortedBlock, lo: int, hi: int, interval: str) -> List[Dict[str, object]]:
+    day = block.day[lo:hi]
+    buckets = _bucket_days(day, interval)
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    ends = np.append(starts[1:], len(buckets)) - 1
+
+    modal = block.modal[lo:hi].astype(np.float64)
+    counts = np.diff(np.append(starts, len(buckets)))
+    mean = np.add.reduceat(modal, starts) / counts
+    low = np.minimum.reduceat(block.low[lo:hi], starts)
+    high = np.maximum.reduceat(block.high[lo:hi], starts)
+    dates = (_EPOCH + buckets[starts].astype("timedelta64[D]")).astype(object)
+
+    return [
+        {
+            "date": d,
+            "price": round(float(p), 2),
+            "open": round(float(o), 2),
+            "high": round(float(h), 2),
+            "low": round(float(l), 2),
+            "close": round(float(c), 2),
+        }
+        for d, p, o, h, l, c in zip(dates, mean, modal[starts], high, low, modal[ends])
+    ]
+
+
+def market_locations(arrays: MandiArrays) -> Dict[str, List[str]]:
+    """{state: [markets]} from the distinct (state, market) pairs of the arrays."""
+    locations: Dict[str, set] = {}
+    if len(arrays):
+        # Unique (state, market) code pairs without materializing strings per row
+        n_markets = len(arrays.vocab["market"])
+        keys = np.unique(arrays.codes["state"].astype(np.int64) * n_markets + arrays.codes["market"])
+        for state_code, market_code in zip(keys // n_markets, keys % n_markets):
+            s = STATES.canonical(arrays.vocab["state"][state_code])
+            m = str(arrays.vocab["market"][market_code]).title().strip()
+            if not m or m == "Nan":
+                continue
+            locations.setdefault(s, set()).add(m)
+    return {k: sorted(v) for k, v in locations.items()}
+
+
+def export_market_index(src_dir: Path, out_dir: Path, workers: int = 0) -> Path:
+    """Parse every mandi file of src_dir and write the sorted index + locations as a bundle."""
+    signature = file_signature(*list_mandi_files(src_dir))
+    arrays = load_mandi_arrays(src_dir, workers=workers)
+    index_arrays, meta = PriceIndex(arrays).to_bundle()
+    meta["locations"] = market_locations(arrays)
+    meta["source"] = signature
+    return write_bundle(out_dir, INDEX_BUNDLE, index_arrays, meta)
+
+
+def load_market_index(out_dir: Path, signature: list) -> Optional[Tuple[PriceIndex, Dict[str, List[str]]]]:
+    """(index, locations) from the bundle if it was built from exactly these files."""
+    bundle = load_bundle(out_dir, INDEX_BUNDLE)
+    if bundle is None:
+        return None
+    arrays, meta = bundle
+    if meta.get("source") != signature:
+        logger.warning("⚠️ Market index artifact is stale; re-run helper_functions/build_artifacts.py")
+        return None
+    return PriceIndex.from_bundle(arrays, meta), meta["locations"]
@@ -0,0 +1,82 @@
+from datetime import date
+from typing import Iterable, List, Optional, Tuple
+
+from app.core.metrics import track
+from app.repositories.sqlite_base import SQLiteStore
+
+
+class SatelliteStore(SQLiteStore):
+    """
+    Local satellite history (satellite_data in data/schema.sql), filled by
+    the nightly prefetch. One row per (farm_id, image_date), clustered on
+    that key, so "latest reading for a farm" is a single index seek.
+    """
+
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS satellite_data ("
+        " farm_id TEXT NOT NULL,"
+        " image_date TEXT NOT NULL,"
+        " ndvi_value REAL NOT NULL,"
+        " ndwi_value REAL NOT NULL,"
+        " land_class INTEGER,"
+        " source TEXT DEFAULT 'sentinel-2',"
+        " processing_date TEXT DEFAULT CURRENT_TIMESTAMP,"
+        " seq INTEGER NOT NULL DEFAULT 0,"
+        " PRIMARY KEY (farm_id, image_date)"
+        ") WITHOUT ROWID",
+    )
+
+    def __init__(self, path):
+        super().__init__(path)
+        conn = self._conn()
+        # Files from before the seq column: existing rows all get seq 0
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(satellite_data)")}
+        if "seq" not in columns:
+            conn.execute("ALTER TABLE satellite_data ADD COLUMN seq INTEGER NOT NULL DEFAULT 0")
+        conn.execute("DROP INDEX IF EXISTS idx_satellite_processed")
+        # Lets consumers (credit scoring) read only rows written since their watermark
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_satellite_seq ON satellite_data(seq, farm_id, image_date)")
+
+    def upsert(self, image_date: date, rows: Iterable[Tuple[str, float, float, Optional[int]]]) -> int:
+        """
+        Write (farm_id, ndvi, ndwi, land_class) readings for image_date in one
+        transaction. Every written row gets a new seq above all existing ones;
+        writers hold the write lock, so seqs follow commit order.
+        """
+        day = image_date.isoformat()
+        with track("satellite_write"), self.transaction():
+            conn = self._conn()
+            base = conn.execute("SELECT IFNULL(MAX(seq), 0) FROM satellite_data").fetchone()[0]
+            rows = [
+                (farm_id, day, ndvi, ndwi, land, base + i)
+                for i, (farm_id, ndvi, ndwi, land) in enumerate(rows, 1)
+            ]
+            conn.executemany(
+                "INSERT OR REPLACE INTO satellite_data"
+                " (farm_id, image_date, ndvi_value, ndwi_value, land_class, seq) VALUES (?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+        return len(rows)
+
+    def latest(self, farm_id: str, since: date) -> Optional[Tuple[str, float, float, Optional[int]]]:
+        """(image_date, ndvi, ndwi, land_class) of the newest reading on or after since."""
+        with track("satellite_read"):
+            return self._conn().execute(
+                "SELECT image_date, ndvi_value, ndwi_value, land_class FROM satellite_data"
+                " WHERE farm_id = ? AND image_date >= ? ORDER BY image_date DESC LIMIT 1",
+                (farm_id, since.isoformat()),
+            ).fetchone()
+
+    def written_since(self, after: Tuple[int, str, str], limit: int) -> List[Tuple[int, str, str, float]]:
+        """
+        (seq, farm_id, image_date, ndvi) of rows written after the
+        (seq, farm_id, image_date) position, in that order; pass the last
+        row back as `after` to page on. New rows always sort after every
+        committed one, so a position is never passed over by a later write.
+        """
+        return self._conn().execute(
+            "SELECT seq, farm_id, image_date, ndvi_value FROM satellite_data"
+            " WHERE (seq, farm_id, image_date) > (?, ?, ?)"
+            " ORDER BY seq, farm_id, image_date LIMIT ?",
+            (*after, limit),
+        ).fetchall()
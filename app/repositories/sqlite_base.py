@@ -0,0 +1,50 @@
+import contextlib
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Iterator
+
+
+class SQLiteStore:
+    """
+    Base for the local SQLite stores shared by all worker processes.
+    WAL mode lets readers run alongside the single writer; each thread
+    gets its own connection (sqlite3 connections are not thread-safe).
+    Subclasses put their CREATE TABLE statements in SCHEMA.
+    """
+
+    SCHEMA: tuple = ()
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._local = threading.local()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = self._conn()
+        for statement in self.SCHEMA:
+            conn.execute(statement)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @contextlib.contextmanager
+    def transaction(self) -> Iterator["SQLiteStore"]:
+        """
+        Exclusive read-modify-write across processes.
+        Takes the write lock up front (BEGIN IMMEDIATE) so two workers
+        cannot both read the same record and then both update it.
+        """
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield self
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        else:
+            conn.execute("COMMIT")
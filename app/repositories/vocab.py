@@ -0,0 +1,144 @@
+import re
+import sys
+import threading
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# -------------------------
+# ALIAS TABLES
+# -------------------------
+# Canonical name -> spellings seen in Agmarknet exports, the frontend and
+# farmers' own input. Matching ignores case, punctuation and "(...)" qualifiers,
+# so "Paddy(Common)" and "paddy" are the same key.
+CROP_ALIASES = {
+    "Rice": ["paddy", "paddy dhan", "dhan", "chawal", "basmati", "basmati rice"],
+    "Wheat": ["gehun", "gehu", "wheat atta"],
+    "Maize": ["corn", "makka", "makkai"],
+    "Soybean": ["soyabean", "soya bean", "soy bean", "soya"],
+    "Cotton": ["kapas", "cotton lint", "narma"],
+    "Mustard": ["sarson", "rapeseed mustard", "rape seed", "rapeseed", "mustard seed"],
+    "Chana": ["gram", "bengal gram", "chickpea", "chick pea", "kabuli chana", "bengal gram dal", "chana dal"],
+    "Tur": ["arhar", "red gram", "pigeon pea", "arhar dal", "tur dal"],
+    "Bajra": ["pearl millet"],
+    "Jowar": ["sorghum"],
+    "Barley": ["jau"],
+    "Onion": ["pyaz", "pyaaz"],
+    "Potato": ["aloo", "alu"],
+    "Tomato": ["tamatar"],
+    "Groundnut": ["peanut", "moongphali"],
+    "Sugarcane": ["ganna"],
+}
+
+STATE_ALIASES = {
+    "Odisha": ["orissa"],
+    "Puducherry": ["pondicherry"],
+    "Uttarakhand": ["uttaranchal"],
+    "Chhattisgarh": ["chattisgarh", "chhatisgarh"],
+    "Delhi": ["nct of delhi", "new delhi"],
+    "Jammu And Kashmir": ["jammu kashmir", "j k"],
+    "Madhya Pradesh": ["mp"],
+    "Uttar Pradesh": ["up"],
+    "Andhra Pradesh": ["ap"],
+    "Tamil Nadu": ["tamilnadu", "tn"],
+    "West Bengal": ["wb"],
+}
+
+DISTRICT_ALIASES = {
+    "Gurugram": ["gurgaon"],
+    "Prayagraj": ["allahabad"],
+    "Bengaluru": ["bangalore", "bengaluru urban", "bangalore urban"],
+    "Mysuru": ["mysore"],
+    "Belagavi": ["belgaum"],
+    "Kalaburagi": ["gulbarga", "kalburgi"],
+    "Vijayapura": ["bijapur"],
+    "Sri Ganganagar": ["ganganagar"],
+    "Nuh": ["mewat"],
+}
+
+_QUALIFIER = re.compile(r"\(.*?\)")
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+
+
+def normalize_key(name) -> str:
+    """Lookup key: lower-case, "(...)" qualifiers dropped, punctuation collapsed."""
+    key = _QUALIFIER.sub(" ", str(name).lower())
+    return _NON_ALNUM.sub(" ", key).strip()
+
+
+# -------------------------
+# VOCABULARY
+# -------------------------
+class Vocabulary:
+    """
+    Interned canonical names with stable integer IDs.
+    Every alias and spelling variant resolves to the ID of its canonical
+    name. id() / encode() intern unknown names on first sight (title-cased),
+    so the same spelling always gets the same ID for the life of the
+    process; they are for loaders only, request paths use resolve() /
+    canonical(), which never add entries.
+    """
+
+    def __init__(self, aliases: Dict[str, Iterable[str]]):
+        self._lock = threading.Lock()
+        self.names: List[str] = []
+        self._ids: Dict[str, int] = {}
+        for canonical, spellings in aliases.items():
+            cid = self._intern(canonical)
+            for spelling in spellings:
+                self._ids.setdefault(normalize_key(spelling), cid)
+
+    def _intern(self, canonical: str) -> int:
+        key = normalize_key(canonical)
+        if key in self._ids:
+            return self._ids[key]
+        cid = len(self.names)
+        self.names.append(sys.intern(canonical))
+        self._ids[key] = cid
+        return cid
+
+    def resolve(self, name) -> Optional[int]:
+        """ID of a known name or alias, else None."""
+        if name is None:
+            return None
+        return self._ids.get(normalize_key(name))
+
+    def id(self, name) -> int:
+        """ID of name, interning it as a new canonical entry if unseen."""
+        key = normalize_key(name)
+        cid = self._ids.get(key)
+        if cid is None:
+            with self._lock:
+                cid = self._ids.get(key)
+                if cid is None:
+                    cid = self._intern(str(name).strip().title())
+        return cid
+
+    def name(self, cid: int) -> str:
+        return self.names[cid]
+
+    def canonical(self, name) -> str:
+        """
+        Canonical spelling, e.g. "Paddy(Common)" -> "Rice". Unknown names come
+        back title-cased but are not interned: this is called with user input,
+        and only the data and model loaders (id / encode) grow the vocabulary.
+        """
+        cid = self.resolve(name)
+        return self.names[cid] if cid is not None else str(name).strip().title()
+
+    def encode(self, values) -> np.ndarray:
+        """int32 IDs for a column; each distinct spelling is resolved only once."""
+        codes, uniques = pd.factorize(pd.Series(values, dtype=object), use_na_sentinel=True)
+        lookup = np.fromiter((self.id(u) for u in uniques), dtype=np.int32, count=len(uniques))
+        return np.where(codes >= 0, lookup[codes], -1).astype(np.int32)
+
+    def categorical(self, values) -> pd.Categorical:
+        """Pandas categorical of canonical names over this vocabulary."""
+        codes = self.encode(values)
+        return pd.Categorical.from_codes(codes, categories=pd.Index(list(self.names)))
+
+
+CROPS = Vocabulary(CROP_ALIASES)
+STATES = Vocabulary(STATE_ALIASES)
+DISTRICTS = Vocabulary(DISTRICT_ALIASES)
@@ -0,0 +1,113 @@
+import logging
+import math
+from datetime import date, timedelta
+from typing import List, Optional, Sequence, Tuple
+
+from app.core.config import settings
+from app.core.i18n import LANGUAGES, normalize_lang, t
+from app.repositories.alert_store import AlertStore
+from app.repositories.vocab import CROPS, STATES
+
+logger = logging.getLogger(__name__)
+
+
+class AlertService:
+    """
+    Pushes forecast changes to the farmers subscribed to them.
+
+    A subscription is (farmer, crop, state) plus either a price threshold
+    ("above" / "below", in Rs/quintal) or a market signal (HOLD / SELL /
+    STABLE, or any change). After the daily forecasts are materialized,
+    dispatch() compares each (crop, state) with the price and signal it was
+    last matched at; only pairs that moved are looked up, each against its
+    own subscribers, and all notifications are inserted in one transaction.
+    """
+
+    KINDS = ("above", "below", "signal")
+    SIGNALS = ("HOLD", "SELL", "STABLE")
+
+    def __init__(self, store: AlertStore = None):
+        self.store = store or AlertStore(settings.DB_PATH)
+
+    # -------------------------
+    # SUBSCRIPTIONS
+    # -------------------------
+    def subscribe(self, farmer_id: str, crop: str, state: str, kind: str,
+                  threshold: Optional[float] = None, signal: Optional[str] = None, lang: str = "en") -> dict:
+        if kind not in self.KINDS:
+            raise ValueError(f"kind must be one of {', '.join(self.KINDS)}")
+        if kind == "signal":
+            if signal is not None and signal.upper() not in self.SIGNALS:
+                raise ValueError(f"signal must be one of {', '.join(self.SIGNALS)}")
+            threshold, signal = None, signal.upper() if signal else None
+        else:
+            if threshold is None or not math.isfinite(threshold) or threshold <= 0:
+                raise ValueError("A positive threshold price is required for price alerts")
+            signal = None
+        # Canonical names, as forecast_signals() reports them, so aliases match;
+        # an unknown name could never match a forecast
+        crop_id, state_id = CROPS.resolve(crop), STATES.resolve(state)
+        if crop_id is None:
+            raise ValueError(f"Unknown crop: {crop}")
+        if state_id is None:
+            raise ValueError(f"Unknown state: {state}")
+        return self.store.subscribe(
+            farmer_id, CROPS.names[crop_id], STATES.names[state_id], kind, threshold, signal, normalize_lang(lang)
+        )
+
+    def unsubscribe(self, farmer_id: str, subscription_id: int) -> bool:
+        return self.store.unsubscribe(farmer_id, subscription_id)
+
+    def subscriptions(self, farmer_id: str) -> List[dict]:
+        return self.store.subscriptions(farmer_id)
+
+    def notifications(self, farmer_id: str, unread_only: bool = False, limit: int = 50) -> List[dict]:
+        return self.store.notifications(farmer_id, unread_only, limit)
+
+    # -------------------------
+    # DISPATCH
+    # -------------------------
+    def dispatch(self, signals: Sequence[Tuple[str, str, int, str]], today: Optional[date] = None) -> str:
+        """
+        Daily job step: notify subscribers of the (crop, state, price, signal)
+        forecasts that changed since the last dispatch.
+        """
+        today = today or date.today()
+        previous = self.store.last_state()
+        batch, states = [], []
+        for crop, state, price, signal in signals:
+            last = previous.get((crop, state))
+            if last is not None and last == (price, signal):
+                continue
+            states.append((crop, state, price, signal, today.isoformat()))
+            batch.extend(self._batch_rows(crop, state, price, signal, last))
+
+        if not states:
+            return "no forecast changes"
+        expires = (today + timedelta(days=settings.ALERT_EXPIRY_DAYS)).isoformat()
+        created = self.store.fan_out(batch, states, expires)
+        logger.info(f"🔔 {len(states)} forecast changes -> {created} notifications")
+        return f"{len(states)} changed pairs, {created} notifications"
+
+    def _batch_rows(self, crop, state, price, signal, last) -> List[tuple]:
+        """alert_batch rows for one changed pair: each kind that can fire, in every language."""
+        rows = []
+        prev_price, prev_signal = last if last is not None else (None, None)
+        for lang in LANGUAGES:
+            params = {"crop": crop, "state": state, "price": price, "threshold": "{threshold}"}
+            # A pair seen for the first time fires every threshold it is already past
+            if prev_price is None or price > prev_price:
+                lo = -math.inf if prev_price is None else prev_price
+                rows.append((crop, state, "above", lang, lo, price, None,
+                             t("alert.above.title", lang, **params), t("alert.above.message", lang, **params), "high"))
+            if prev_price is None or price < prev_price:
+                hi = math.inf if prev_price is None else prev_price
+                rows.append((crop, state, "below", lang, price, hi, None,
+                             t("alert.below.title", lang, **params), t("alert.below.message", lang, **params), "high"))
+            if signal != prev_signal:
+                advice = t(f"market.recommendation.{signal}", lang)
+                rows.append((crop, state, "signal", lang, None, None, signal,
+                             t("alert.signal.title", lang, **params),
+                             t("alert.signal.message", lang, advice=advice, **params),
+                             "high" if signal == "SELL" else "medium"))
+        return rows
@@ -1,10 +1,16 @@
+import json
 import random
 import logging
 import os
 from google.oauth2 import service_account
 from datetime import datetime, timedelta
-from typing import Dict, Optional, Tuple
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from app.core.config import settings
 from app.repositories.data_repo import DataRepository
+from app.repositories.kv_store import KVStore
 from app.models.schemas import (
     FarmerRegister,
     FarmerResponse,
@@ -13,6 +19,9 @@ from app.models.schemas import (
 
 logger = logging.getLogger(__name__)
 
+# Columns of a bulk registration upload (FarmerRegister's fields)
+BULK_FIELDS = list(FarmerRegister.model_fields)
+
 
 class AuthService:
     """
@@ -28,8 +37,9 @@ class AuthService:
     
     def __init__(self):
         self.repo = DataRepository()
-        self._otp_store: Dict[str, Dict] = {}  # In-memory OTP cache
-        self._otp_cooldown: Dict[str, float] = {}  # Track OTP request rate limiting
+        # OTP state lives in a host-wide SQLite file so every worker process sees it
+        self._otp_store = KVStore(settings.KV_STORE_PATH, "otp")
+        self._otp_cooldown = KVStore(settings.KV_STORE_PATH, "otp_cooldown")  # Track OTP request rate limiting
     
     # -------------------------
     # REGISTRATION
@@ -40,28 +50,30 @@ class AuthService:
         Raises ValueError if phone already registered.
         """
         try:
-            # Check if farmer already exists
-            existing = self.repo.get_farmer_by_phone(farmer.phone)
-            if existing:
-                raise ValueError(f"Farmer with phone {farmer.phone} already registered")
-            
-            # Generate farmer ID (phone-based)
-            farmer_id = f"FARM_{farmer.phone}_{datetime.utcnow().timestamp():.0f}"
-            
-            # Create farmer record
-            farmer_data = {
-                "farmer_id": farmer_id,
-                "name": farmer.name,
-                "state": farmer.state,
-                "district": farmer.district,
-                "phone": farmer.phone,
-                "language": farmer.language,
-                "created_at": datetime.utcnow().isoformat(),
-                "verified": False,  # Requires OTP verification
-            }
+            # Duplicate check and insert happen under one lock (other workers included)
+            with self.repo.farmers_lock():
+                # Check if farmer already exists
+                existing = self.repo.get_farmer_by_phone(farmer.phone)
+                if existing:
+                    raise ValueError(f"Farmer with phone {farmer.phone} already registered")
+            
+                # Generate farmer ID (phone-based)
+                farmer_id = f"FARM_{farmer.phone}_{datetime.utcnow().timestamp():.0f}"
             
-            # Save to repository
-            self.repo.add_farmer(farmer_data)
+                # Create farmer record
+                farmer_data = {
+                    "farmer_id": farmer_id,
+                    "name": farmer.name,
+                    "state": farmer.state,
+                    "district": farmer.district,
+                    "phone": farmer.phone,
+                    "language": farmer.language,
+                    "created_at": datetime.utcnow().isoformat(),
+                    "verified": False,  # Requires OTP verification
+                }
+            
+                # Save to repository
+                self.repo.add_farmer(farmer_data)
             
             logger.info(f"Farmer registered: {farmer_id} ({farmer.phone})")
             
@@ -71,6 +83,145 @@ class AuthService:
             logger.error(f"Registration failed for {farmer.phone}: {str(e)}")
             raise
     
+    # -------------------------
+    # BULK REGISTRATION
+    # -------------------------
+    @staticmethod
+    def _csv_chunks(stream: BinaryIO, chunk_rows: int) -> Iterator[Tuple[pd.DataFrame, List[Optional[str]]]]:
+        try:
+            for frame in pd.read_csv(stream, dtype=str, chunksize=chunk_rows, skipinitialspace=True):
+                yield frame, [None] * len(frame)
+        except pd.errors.EmptyDataError:
+            return
+        except pd.errors.ParserError as e:
+            raise ValueError(f"Malformed CSV: {e}")
+
+    @staticmethod
+    def _ndjson_chunks(stream: BinaryIO, chunk_rows: int) -> Iterator[Tuple[pd.DataFrame, List[Optional[str]]]]:
+        """One JSON object per line; a line that does not parse becomes a row error."""
+        records, errors = [], []
+        for line in stream:
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+                if not isinstance(record, dict):
+                    raise ValueError("not an object")
+                records.append({k: None if v is None else str(v) for k, v in record.items()})
+                errors.append(None)
+            except ValueError:
+                records.append({})
+                errors.append("invalid JSON line")
+            if len(records) == chunk_rows:
+                yield pd.DataFrame.from_records(records, columns=BULK_FIELDS), errors
+                records, errors = [], []
+        if records:
+            yield pd.DataFrame.from_records(records, columns=BULK_FIELDS), errors
+
+    @staticmethod
+    def _validate(frame: pd.DataFrame, errors: List[Optional[str]], seen: set) -> Tuple[pd.DataFrame, np.ndarray]:
+        """
+        FarmerRegister's rules on a whole chunk at once: (normalized frame,
+        error per row or "" when valid). seen holds the upload's earlier phones.
+        """
+        frame = frame.reindex(columns=BULK_FIELDS)
+        # object on pandas 2, "str" on pandas 3; columns absent from the upload stay all-NaN floats
+        frame = frame.apply(lambda col: col.str.strip() if pd.api.types.is_string_dtype(col) else col)
+        name, phone = frame["name"].fillna(""), frame["phone"].fillna("")
+        frame["language"] = frame["language"].replace("", np.nan).fillna("en")
+
+        message = np.select(
+            [
+                pd.notna(pd.Series(errors, index=frame.index)),
+                name == "",
+                name.str.contains(r"\d"),
+                phone == "",
+                ~phone.str.fullmatch(r"\d{10}"),
+                frame["state"].isna(),
+                frame["district"].isna(),
+            ],
+            [
+                pd.Series(errors, index=frame.index).fillna(""),
+                "name: field required",
+                "name: Name cannot contain numbers",
+                "phone: field required",
+                "phone: must be 10 digits",
+                "state: field required",
+                "district: field required",
+            ],
+            default="",
+        )
+        # Only rows that pass every other rule claim a phone, so a rejected row
+        # never blocks a later valid one, whichever chunk it falls in
+        passed = message == ""
+        repeated = passed & (phone.where(passed).duplicated() | phone.isin(seen)).to_numpy()
+        message = np.where(repeated, "phone repeated earlier in the upload", message)
+        seen.update(phone[message == ""])
+        return frame, message
+
+    def register_farmers_bulk(self, stream: BinaryIO, fmt: str, max_rows: int = None, chunk_rows: int = None) -> Dict[str, Any]:
+        """
+        Register every valid row of a CSV / NDJSON upload, read chunk by
+        chunk, validated per chunk in vectorized form and written to the
+        farmer file in one rewrite. Returns a per-row report (rows numbered
+        from 1, header excluded).
+        """
+        max_rows = max_rows or settings.BULK_REGISTER_MAX_ROWS
+        chunk_rows = chunk_rows or settings.BULK_REGISTER_CHUNK_ROWS
+        chunks = self._csv_chunks(stream, chunk_rows) if fmt == "csv" else self._ndjson_chunks(stream, chunk_rows)
+
+        seen, frames, messages = set(), [], []
+        received = 0
+        for frame, errors in chunks:
+            received += len(frame)
+            if received > max_rows:
+                raise ValueError(f"Upload has more than {max_rows} rows; split it into smaller files")
+            frame, message = self._validate(frame, errors, seen)
+            frames.append(frame)
+            messages.append(message)
+        if not frames:
+            return {"received": 0, "registered": 0, "rejected": 0, "results": []}
+
+        frame = pd.concat(frames, ignore_index=True)
+        message = np.concatenate(messages).astype(object)
+        valid = np.flatnonzero(message == "")
+
+        now = datetime.utcnow()
+        created_at, stamp = now.isoformat(), f"{now.timestamp():.0f}"
+        records = [
+            {
+                "farmer_id": f"FARM_{row['phone']}_{stamp}",
+                "name": row["name"],
+                "state": row["state"],
+                "district": row["district"],
+                "phone": row["phone"],
+                "language": row["language"],
+                "created_at": created_at,
+                "verified": False,  # Requires OTP verification
+            }
+            for row in frame.iloc[valid].to_dict("records")
+        ]
+        added = self.repo.add_farmers(records)
+
+        farmer_ids = np.full(len(frame), None, dtype=object)
+        for i, record, fresh in zip(valid, records, added):
+            if fresh:
+                farmer_ids[i] = record["farmer_id"]
+            else:
+                message[i] = f"Farmer with phone {record['phone']} already registered"
+
+        # Missing phones are NaN in the frame; report them as null, not as invalid JSON
+        phones = frame["phone"].astype(object).where(frame["phone"].notna(), None).tolist()
+        results = [
+            {"row": i + 1, "phone": phone, "status": "registered", "farmer_id": farmer_id}
+            if farmer_id is not None else
+            {"row": i + 1, "phone": phone, "status": "rejected", "error": error}
+            for i, (phone, farmer_id, error) in enumerate(zip(phones, farmer_ids, message))
+        ]
+        registered = int(sum(added))
+        logger.info(f"Bulk registration: {registered} of {len(frame)} farmers registered")
+        return {"received": len(frame), "registered": registered, "rejected": len(frame) - registered, "results": results}
+
     # -------------------------
     # OTP GENERATION
     # -------------------------
@@ -91,28 +242,31 @@ class AuthService:
             if not farmer:
                 raise ValueError("Farmer not registered. Please register first.")
             
-            # Rate limiting: prevent OTP spam
-            last_otp_time = self._otp_cooldown.get(phone, 0)
-            time_since_last = datetime.utcnow().timestamp() - last_otp_time
-            
-            if time_since_last < self.OTP_COOLDOWN_SECONDS:
-                wait_time = self.OTP_COOLDOWN_SECONDS - int(time_since_last)
-                raise ValueError(f"Please wait {wait_time}s before requesting another OTP")
+            # Rate limiting: prevent OTP spam (check + set is atomic across workers)
+            with self._otp_cooldown.transaction():
+                last_otp_time = self._otp_cooldown.get(phone) or 0
+                time_since_last = datetime.utcnow().timestamp() - last_otp_time
+                
+                if time_since_last < self.OTP_COOLDOWN_SECONDS:
+                    wait_time = self.OTP_COOLDOWN_SECONDS - int(time_since_last)
+                    raise ValueError(f"Please wait {wait_time}s before requesting another OTP")
+                
+                # Update cooldown
+                self._otp_cooldown.set(phone, datetime.utcnow().timestamp(), ttl=self.OTP_COOLDOWN_SECONDS)
             
             # Generate 6-digit OTP
             otp = str(random.randint(10**5, 10**6 - 1))
             
-            # Store OTP with metadata
-            self._otp_store[phone] = {
+            # Store OTP with metadata; the row outlives expires_at so an
+            # expired code still gets the "expired" message, not "not requested"
+            now = datetime.utcnow()
+            self._otp_store.set(phone, {
                 "otp": otp,
-                "created_at": datetime.utcnow(),
-                "expires_at": datetime.utcnow() + timedelta(seconds=self.OTP_EXPIRY_SECONDS),
+                "created_at": now.isoformat(),
+                "expires_at": (now + timedelta(seconds=self.OTP_EXPIRY_SECONDS)).timestamp(),
                 "attempts": 0,
                 "verified": False,
-            }
-            
-            # Update cooldown
-            self._otp_cooldown[phone] = datetime.utcnow().timestamp()
+            }, ttl=self.OTP_EXPIRY_SECONDS * 2)
             
             # Log OTP (in production, send via SMS/email)
             self._log_otp_for_development(phone, otp)
@@ -143,32 +297,37 @@ class AuthService:
             if not self._is_valid_phone(phone):
                 return False, "Invalid phone number format"
             
-            # Check if OTP was requested
-            otp_record = self._otp_store.get(phone)
-            if not otp_record:
-                return False, "OTP not requested. Please request OTP first."
-            
-            # Check if OTP expired
-            if datetime.utcnow() > otp_record["expires_at"]:
-                del self._otp_store[phone]
-                logger.warning(f"Expired OTP verification attempt for {phone}")
-                return False, "OTP expired. Please request a new OTP."
-            
-            # Check attempt limit
-            if otp_record["attempts"] >= self.MAX_OTP_ATTEMPTS:
-                del self._otp_store[phone]
-                logger.warning(f"Max OTP attempts exceeded for {phone}")
-                return False, "Maximum attempts exceeded. Please request a new OTP."
-            
-            # Verify OTP (case-sensitive string match)
-            if otp_record["otp"] != input_otp.strip():
-                otp_record["attempts"] += 1
-                remaining = self.MAX_OTP_ATTEMPTS - otp_record["attempts"]
-                logger.warning(f"Invalid OTP attempt for {phone} (attempt {otp_record['attempts']})")
-                return False, f"Invalid OTP. {remaining} attempts remaining."
+            # Read-modify-write of the attempt counter is atomic across workers
+            with self._otp_store.transaction():
+                # Check if OTP was requested
+                otp_record = self._otp_store.get(phone)
+                if not otp_record:
+                    return False, "OTP not requested. Please request OTP first."
+                
+                # Check if OTP expired
+                if datetime.utcnow().timestamp() > otp_record["expires_at"]:
+                    self._otp_store.delete(phone)
+                    logger.warning(f"Expired OTP verification attempt for {phone}")
+                    return False, "OTP expired. Please request a new OTP."
+                
+                # Check attempt limit
+                if otp_record["attempts"] >= self.MAX_OTP_ATTEMPTS:
+                    self._otp_store.delete(phone)
+                    logger.warning(f"Max OTP attempts exceeded for {phone}")
+                    return False, "Maximum attempts exceeded. Please request a new OTP."
+                
+                # Verify OTP (case-sensitive string match)
+                if otp_record["otp"] != input_otp.strip():
+                    otp_record["attempts"] += 1
+                    self._otp_store.set(phone, otp_record, ttl=self.OTP_EXPIRY_SECONDS * 2)
+                    remaining = self.MAX_OTP_ATTEMPTS - otp_record["attempts"]
+                    logger.warning(f"Invalid OTP attempt for {phone} (attempt {otp_record['attempts']})")
+                    return False, f"Invalid OTP. {remaining} attempts remaining."
+                
+                # Clean up OTP record after successful verification (single use)
+                self._otp_store.delete(phone)
             
             # OTP verified successfully
-            otp_record["verified"] = True
             farmer = self.repo.get_farmer_by_phone(phone)
             
             if farmer:
@@ -177,9 +336,6 @@ class AuthService:
                 farmer["last_login"] = datetime.utcnow().isoformat()
                 self.repo.add_farmer(farmer)
             
-            # Clean up OTP record after successful verification
-            del self._otp_store[phone]
-            
             logger.info(f"Farmer verified: {phone}")
             
             return True, "OTP verified successfully"
@@ -223,13 +379,7 @@ class AuthService:
         Remove expired OTP records (call periodically).
         Useful for long-running servers.
         """
-        expired_phones = [
-            phone for phone, record in self._otp_store.items()
-            if datetime.utcnow() > record["expires_at"]
-        ]
-        
-        for phone in expired_phones:
-            del self._otp_store[phone]
+        removed = self._otp_store.purge_expired() + self._otp_cooldown.purge_expired()
         
-        if expired_phones:
-            logger.info(f"Cleaned up {len(expired_phones)} expired OTP records")
\ No newline at end of file
+        if removed:
+            logger.info(f"Cleaned up {removed} expired OTP records")
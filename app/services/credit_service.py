@@ -0,0 +1,183 @@
+import hashlib
+import io
+import logging
+import math
+from datetime import date
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.core.config import settings
+from app.repositories.credit_store import CreditStore
+from app.repositories.satellite_store import SatelliteStore
+from app.services.gee_service import supported_yield
+
+logger = logging.getLogger(__name__)
+
+_HEAD_BYTES = 4096
+_BLOCK_BYTES = 16 * 1024 * 1024
+
+
+class CreditScoringService:
+    """
+    Keeps credit_scores current by rescoring only farmers whose inputs changed.
+
+    Inputs and how new data is found:
+      farms.csv, farm_crops.csv  append-only; read from a byte-offset watermark
+      satellite_data             rows written after a (seq, key) watermark
+      yield claims               recorded by the credit route as they happen
+    Each marks its farmers dirty; refresh() then scores the dirty farmers in
+    batches: one set of SQL aggregates and one vectorized pass per batch.
+
+    Factors, each in [0, 1] (NEUTRAL where there is no evidence yet):
+      ndvi_factor               acre-weighted latest NDVI, 0.2 (bare) .. 0.8 (lush)
+      yield_consistency_factor  mean of min(1, supported / claimed yield)
+      farm_size_factor          log acres, saturating at FULL_SIZE_ACRES
+      history_factor            farm_crops records, saturating at FULL_HISTORY_RECORDS
+    """
+
+    WEIGHTS = np.array([0.35, 0.25, 0.15, 0.25])  # ndvi, yield consistency, size, history
+    NEUTRAL = 0.5
+    FULL_SIZE_ACRES = 25.0
+    FULL_HISTORY_RECORDS = 6
+
+    def __init__(self, store: CreditStore = None, satellite: SatelliteStore = None):
+        self.store = store or CreditStore(settings.DB_PATH)
+        self.satellite = satellite or SatelliteStore(settings.DB_PATH)
+
+    # -------------------------
+    # CHANGE CAPTURE
+    # -------------------------
+    def _csv_blocks(self, path: Path, source: str) -> Iterator[Tuple[pd.DataFrame, dict]]:
+        """
+        (rows, watermark) blocks of the lines appended to path since the last
+        watermark. A file that shrank or whose first bytes changed was
+        rewritten, so it is read again from the top (the inputs are upserts).
+        """
+        path = Path(path)
+        if not path.exists():
+            return
+        with open(path, "rb") as f:
+            head = f.read(_HEAD_BYTES)
+            head_hash = hashlib.sha1(head).hexdigest()
+            size = path.stat().st_size
+
+            mark = self.store.watermark(source) or {}
+            offset = mark.get("offset", 0)
+            if mark.get("head") != head_hash or offset > size:
+                offset = 0
+
+            f.seek(0)
+            header_line = f.readline()
+            columns = header_line.decode("utf-8-sig").strip().split(",")
+            offset = max(offset, len(header_line))
+
+            while offset < size:
+                f.seek(offset)
+                block = f.read(min(_BLOCK_BYTES, size - offset))
+                end = block.rfind(b"\n") + 1
+                if end == 0:
+                    if offset + len(block) < size:
+                        raise ValueError(f"{path.name}: line longer than {_BLOCK_BYTES} bytes at {offset}")
+                    break  # trailing line still being written
+                offset += end
+                frame = pd.read_csv(io.BytesIO(block[:end]), names=columns, header=None, dtype=str)
+                yield frame, {"offset": offset, "head": head_hash}
+
+    def ingest_farms(self) -> int:
+        rows = 0
+        for frame, mark in self._csv_blocks(settings.FARMS_DATA_PATH, "farms.csv"):
+            acres = pd.to_numeric(frame["area_acres"], errors="coerce").fillna(0.0)
+            if "is_active" in frame:
+                acres = acres.where(frame["is_active"].str.lower() != "false", 0.0)
+            with self.store.transaction():
+                self.store.upsert_farms(list(zip(frame["id"], frame["farmer_id"], acres.tolist())))
+                self.store.set_watermark("farms.csv", mark)
+            rows += len(frame)
+        return rows
+
+    def ingest_crops(self) -> int:
+        rows = 0
+        for frame, mark in self._csv_blocks(settings.FARM_CROPS_DATA_PATH, "farm_crops.csv"):
+            with self.store.transaction():
+                self.store.add_crops(list(zip(frame["id"], frame["farm_id"])))
+                self.store.set_watermark("farm_crops.csv", mark)
+            rows += len(frame)
+        return rows
+
+    def ingest_satellite(self, page: int = 10_000) -> int:
+        rows = 0
+        # Watermarks from before seq paging (no "seq_after") start over once; readings are upserts
+        after = tuple((self.store.watermark("satellite_data") or {}).get("seq_after", (-1, "", "")))
+        while True:
+            readings = self.satellite.written_since(after, page)
+            if not readings:
+                return rows
+            after = tuple(readings[-1][:3])
+            with self.store.transaction():
+                self.store.set_ndvi([(farm_id, day, ndvi) for _, farm_id, day, ndvi in readings])
+                self.store.set_watermark("satellite_data", {"seq_after": list(after)})
+            rows += len(readings)
+
+    def record_claim(self, farmer_id: str, claimed_yield: float, ndvi: float) -> None:
+        """A yield a farmer claimed in a credit check, against the NDVI seen for the field."""
+        # supported / claimed is the consistency ratio, so only a positive claim keeps it in (0, 1]
+        if not math.isfinite(claimed_yield) or claimed_yield <= 0:
+            raise ValueError(f"claimed_yield must be a positive number, got {claimed_yield}")
+        self.store.add_claim(farmer_id, float(claimed_yield), supported_yield(ndvi))
+
+    # -------------------------
+    # SCORING
+    # -------------------------
+    def score_batch(self, farmer_ids: List[str], aggregates: np.ndarray) -> List[tuple]:
+        """Score rows for farmers from their (n, 6) CreditStore.aggregates, in one vectorized pass."""
+        acres, ndvi_sum, ndvi_acres, records, claims, consistency = aggregates.T
+        has_ndvi, has_claims = ndvi_acres > 0, claims > 0
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ndvi = np.where(has_ndvi, np.clip((ndvi_sum / ndvi_acres - 0.2) / 0.6, 0, 1), self.NEUTRAL)
+            yield_consistency = np.where(has_claims, consistency / claims, self.NEUTRAL)
+        size = np.clip(np.log1p(acres) / np.log1p(self.FULL_SIZE_ACRES), 0, 1)
+        history = np.clip(records / self.FULL_HISTORY_RECORDS, 0, 1)
+
+        factors = np.round(np.column_stack([ndvi, yield_consistency, size, history]), 3)
+        score = np.rint(factors @ self.WEIGHTS * 1000).astype(int)
+        # Same loan / rate scale as the seeded credit_scores
+        loan = np.round(score * 350.0, -3)
+        rate = np.round(12.0 - score / 200.0, 1)
+
+        notes = [
+            "; ".join(n for n, missing in (("no satellite reading", not s), ("no yield claims", not c)) if missing)
+            or None
+            for s, c in zip(has_ndvi, has_claims)
+        ]
+        return [
+            (farmer_ids[i], int(score[i]), *factors[i].tolist(), float(loan[i]), float(rate[i]), notes[i])
+            for i in range(len(farmer_ids))
+        ]
+
+    def recompute(self, today: Optional[date] = None, batch_size: Optional[int] = None) -> int:
+        """Score every dirty farmer; returns how many scores were written."""
+        today = today or date.today()
+        batch_size = batch_size or settings.CREDIT_BATCH_SIZE
+        scored = 0
+        while True:
+            marks = self.store.dirty_batch(batch_size)
+            if not marks:
+                return scored
+            farmer_ids = [farmer_id for farmer_id, _ in marks]
+            aggregates = self.store.aggregates(farmer_ids)
+            rows = self.score_batch(farmer_ids, np.array([aggregates[f] for f in farmer_ids], dtype=np.float64))
+            self.store.save_scores(rows, marks, today)
+            scored += len(rows)
+
+    def refresh(self, today: Optional[date] = None) -> str:
+        """Daily job: pick up new inputs, then rescore only the farmers they touched."""
+        changed = self.ingest_farms() + self.ingest_crops() + self.ingest_satellite()
+        scored = self.recompute(today)
+        return f"{changed} new input rows, {scored} scores updated"
+
+    def get_score(self, farmer_id: str) -> Optional[dict]:
+        return self.store.score(farmer_id)
@@ -0,0 +1,60 @@
+import logging
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+from app.repositories.farm_index import FarmIndex, load_farm_index
+
+logger = logging.getLogger(__name__)
+
+
+class FarmService:
+    """
+    Registered-farm lookups by location: nearest farms for a point, and
+    which farm (and farmer) a credit claim's coordinates belong to; plus
+    a farmer's own farms.
+    """
+
+    def __init__(self):
+        self.index: Optional[FarmIndex] = load_farm_index(
+            settings.FARMS_DATA_PATH, settings.ARTIFACT_DIR, settings.FARM_INDEX_CELL_DEG
+        )
+        if self.index is not None:
+            logger.info(f"📍 Farm index: {len(self.index)} farms")
+
+    def nearby(self, lat: float, lng: float, k: int = 5, radius_m: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Up to k farms nearest to the point, or all within radius_m if given."""
+        if self.index is None:
+            return []
+        if radius_m is not None:
+            hits = self.index.radius_query(lat, lng, radius_m)[:k]
+        else:
+            hits = self.index.nearest(lat, lng, k)
+        return [self.index.farm(row, dist) for row, dist in hits]
+
+    def farms_of(self, farmer_id: str) -> List[Dict[str, Any]]:
+        if self.index is None:
+            return []
+        return [self.index.farm(row) for row in self.index.farmer_rows(farmer_id)]
+
+    def match_claim(self, lat: float, lng: float, farmer_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        The registered farm whose field contains the point (the claimant's
+        own when farmer_id is given), plus fields of *other* farmers that
+        contain it too: the same land pledged twice.
+        """
+        containing = self.index.containing(lat, lng) if self.index is not None else []
+        farms = [self.index.farm(row, dist) for row, dist in containing]
+
+        own = None
+        if farmer_id is not None:
+            own = next((f for f in farms if f["farmer_id"] == farmer_id), None)
+        elif farms:
+            own = farms[0]
+        claimant = farmer_id if farmer_id is not None else (own or {}).get("farmer_id")
+        others = [f for f in farms if f["farmer_id"] != claimant]
+
+        return {
+            "farm_id": own["farm_id"] if own else None,
+            "overlapping_claims": others,
+            "duplicate_claim": bool(others),
+        }
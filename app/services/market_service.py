@@ -1,31 +1,97 @@
 import logging
 import datetime
+import hashlib
+import json
 import random
-import torch
-import joblib
-import pandas as pd
 import numpy as np
 import os
-import glob
 from datetime import timedelta
+from typing import List, Tuple
+from app.core.batching import InferenceBatcher
+from app.core.config import settings
+from app.core.executors import CPU_POOL, IO_POOL
+from app.core.i18n import t
+from app.core.metrics import track, count_event
+from app.repositories.artifacts import MarketModel, file_signature, load_ensemble, mlp_forward, training_outputs
+from app.repositories.forecast_store import ForecastStore
+from app.repositories.mandi_ingest import list_mandi_files, load_mandi_arrays
+from app.repositories.price_index import PriceIndex, load_market_index, market_locations
+from app.repositories.vocab import CROPS, STATES
 
 logger = logging.getLogger(__name__)
 
 # --- CONFIG ---
 MODEL_PATH = "app/models/market_net.pth"
 SCALER_PATH = "app/models/scalers.pkl"
+ENSEMBLE_PATH = "app/models/market_ensemble.pth"
 DATA_DIR = "data/"
 
+
+def band_confidence(price, p10, p90) -> np.ndarray:
+    """
+    0..1 confidence per point: one minus the width of the P10-P90 band
+    relative to the price, so a band as wide as the price itself scores 0.
+    """
+    price = np.maximum(np.abs(np.asarray(price, dtype=np.float64)), 1.0)
+    return np.clip(1.0 - (np.asarray(p90) - np.asarray(p10)) / price, 0.0, 1.0)
+
+
+SIGNAL_BAND_PCT = 2.0
+
+
+def trend_signal(start_price, end_price) -> np.ndarray:
+    """HOLD / SELL / STABLE per trend: the 7-day change beyond +/- SIGNAL_BAND_PCT."""
+    start = np.asarray(start_price, dtype=np.float64)
+    change = (np.asarray(end_price) - start) / np.where(start == 0, 1.0, start) * 100
+    return np.select([change > SIGNAL_BAND_PCT, change < -SIGNAL_BAND_PCT], ["HOLD", "SELL"], "STABLE")
+
+
 class MarketService:
     def __init__(self):
         self.model = None
         self.scalers = None
+        self._ensemble = None
+        self._mandi_signature = None
+        self._locations = {}
+        self._price_index = None
+        self._crop_index = {}
+        self._state_index = {}
+        self._crop_names = []
+        self._state_names = []
+        self.model_version = None
+        self._forecasts = ForecastStore(settings.DB_PATH)
         self._load_ai_brain()
+        # Concurrent cache misses share one forward pass. The NumPy artifact
+        # pass takes microseconds and stays on the event loop; the torch
+        # fallback goes to the CPU process pool (or io threads without one)
+        predict, executor = self._predict_bands, None
+        if self.model is not None and not isinstance(self.model, MarketModel):
+            predict, executor = (_predict_bands_in_process, CPU_POOL) if CPU_POOL.enabled else (predict, IO_POOL)
+        self._batcher = InferenceBatcher(
+            predict,
+            max_rows=settings.INFERENCE_BATCH_MAX_ROWS,
+            max_wait_ms=settings.INFERENCE_BATCH_WAIT_MS,
+            executor=executor,
+        )
 
     def _load_ai_brain(self):
-        """Loads the PyTorch model and Scalers if they exist."""
+        """
+        Loads the market model. Prefers the flat artifact from
+        helper_functions/build_artifacts.py (memmapped, shared by all workers,
+        no torch import); falls back to the PyTorch model and Scalers.
+        The uncertainty ensemble is optional: without it forecasts carry no
+        P10/P90 band and no confidence.
+        """
         try:
-            if os.path.exists(MODEL_PATH) and os.path.exists(SCALER_PATH):
+            artifact = MarketModel.load(settings.ARTIFACT_DIR, MODEL_PATH, SCALER_PATH, ENSEMBLE_PATH)
+            if artifact is not None:
+                self.model = artifact
+                crops, states = artifact.crops, artifact.states
+                logger.info("✅ AI Brain Loaded Successfully (memory-mapped artifact)")
+            elif os.path.exists(MODEL_PATH) and os.path.exists(SCALER_PATH):
+                import joblib
+                import torch
+
                 # 1. Load Architecture
                 self.model = torch.nn.Sequential(
                     torch.nn.Linear(3, 128), torch.nn.ReLU(),
@@ -37,174 +103,294 @@ class MarketService:
                 
                 # 2. Load Scalers
                 self.scalers = joblib.load(SCALER_PATH)
+                crops, states = self.scalers['le_crop'].classes_, self.scalers['le_state'].classes_
+                if os.path.exists(ENSEMBLE_PATH):
+                    self._ensemble = load_ensemble(ENSEMBLE_PATH)
                 logger.info("✅ AI Brain Loaded Successfully")
             else:
                 logger.warning("⚠️ AI Model files not found. Service will use fallback simulation.")
+                return
+
+            # Canonical vocab ID -> encoder index, so any alias of a trained
+            # crop/state ("paddy", "Paddy(Common)") reaches the same input
+            self._crop_index = {CROPS.id(c): i for i, c in enumerate(crops)}
+            self._state_index = {STATES.id(s): i for i, s in enumerate(states)}
+            self._crop_names = [str(c) for c in crops]
+            self._state_names = [str(s) for s in states]
+
+            # Version = fingerprint of the training outputs; materialized
+            # forecasts of any other version are never served
+            if artifact is not None:
+                source = artifact.source
+            else:
+                source = file_signature(*training_outputs(MODEL_PATH, SCALER_PATH, ENSEMBLE_PATH))
+            self.model_version = hashlib.sha1(json.dumps(source).encode()).hexdigest()[:12]
         except Exception as e:
+            self.model = None
             logger.error(f"❌ Failed to load AI Brain: {e}")
 
+    def _predict_rows(self, rows: np.ndarray) -> np.ndarray:
+        """Prices for raw [crop_index, state_index, date_ordinal] rows in one forward pass."""
+        with track("torch_inference"):
+            if isinstance(self.model, MarketModel):
+                return self.model.predict(rows)
+            import torch
+
+            with torch.no_grad():
+                scaled = self.scalers['scaler_X'].transform(rows)
+                out = self.model(torch.FloatTensor(scaled)).numpy()
+                return self.scalers['scaler_y'].inverse_transform(out)[:, 0]
+
+    def _predict_members(self, rows: np.ndarray) -> np.ndarray:
+        """(K, N) ensemble prices for rows, or None when no ensemble is trained."""
+        if isinstance(self.model, MarketModel):
+            return self.model.predict_members(rows)
+        if self._ensemble is None:
+            return None
+        scaled = self.scalers['scaler_X'].transform(rows).astype(np.float32)
+        out = mlp_forward(scaled, self._ensemble)[..., 0]
+        return self.scalers['scaler_y'].inverse_transform(out.reshape(-1, 1)).reshape(out.shape)
+
+    def _predict_bands(self, rows: np.ndarray):
+        """
+        (price, p10, p90) arrays for rows. The price is the main model's
+        forecast (the P50); the ensemble spread around its own median is
+        re-centred on it. p10/p90 are None without an ensemble.
+        """
+        prices = self._predict_rows(rows)
+        with track("ensemble_inference"):
+            members = self._predict_members(rows)
+            if members is None:
+                return prices, None, None
+            q10, q50, q90 = np.percentile(members, [10, 50, 90], axis=0)
+        return prices, prices + (q10 - q50), prices + (q90 - q50)
+
+    # -------------------------
+    # FORECAST MATERIALIZATION
+    # -------------------------
+    def refresh_forecasts(self, start_date: datetime.date = None, horizon_days: int = None) -> int:
+        """
+        Score every trained crop x state over start_date .. start_date + horizon
+        (+6 days so every target in the horizon has its 7-day trend) in one
+        batch and store the results for model_version. Returns rows written.
+        """
+        if self.model is None:
+            return 0
+        start_date = start_date or datetime.date.today()
+        horizon_days = horizon_days if horizon_days is not None else settings.FORECAST_HORIZON_DAYS
+        days = np.arange(start_date.toordinal(), start_date.toordinal() + horizon_days + 7)
+
+        crop_idx, state_idx, day_idx = np.meshgrid(
+            np.arange(len(self._crop_names)), np.arange(len(self._state_names)), days, indexing="ij"
+        )
+        rows = np.stack([crop_idx.ravel(), state_idx.ravel(), day_idx.ravel()], axis=1)
+        prices, p10, p90 = self._predict_bands(rows)
+        prices = prices.astype(np.int64)
+        if p10 is None:
+            p10 = p90 = confidence = [None] * len(rows)
+        else:
+            confidence = band_confidence(prices, p10, p90).round(3).tolist()
+            p10, p90 = p10.astype(np.int64).tolist(), p90.astype(np.int64).tolist()
+
+        iso = {int(d): datetime.date.fromordinal(int(d)).isoformat() for d in days}
+        records = (
+            (self._crop_names[c], self._state_names[st], iso[int(d)], float(p), lo, hi, conf)
+            for (c, st, d), p, lo, hi, conf in zip(rows, prices, p10, p90, confidence)
+        )
+        return self._forecasts.replace_forecasts(self.model_version, records, keep_from=start_date)
+
+    def forecast_signals(self, day: datetime.date = None) -> List[Tuple[str, str, int, str]]:
+        """
+        (crop, state, price, signal) for every materialized crop x state on day:
+        the forecast price and the HOLD/SELL/STABLE signal of its 7-day trend.
+        Names are canonical vocabulary spellings, as alert subscriptions store them.
+        """
+        if self.model is None:
+            return []
+        day = day or datetime.date.today()
+        pairs, start, end = self._forecasts.trend_ends(self.model_version, day, day + timedelta(days=6))
+        if not pairs:
+            return []
+        signals = trend_signal(start, end)
+        return [
+            (CROPS.canonical(crop), STATES.canonical(state), int(price), str(signal))
+            for (crop, state), price, signal in zip(pairs, start, signals)
+        ]
+
+    def _materialized_trend(self, crop_enc: int, state_enc: int, days):
+        """Stored (price, p10, p90) arrays for days, or None unless every day is materialized."""
+        stored = self._forecasts.lookup(
+            self.model_version, self._crop_names[crop_enc], self._state_names[state_enc], days[0], days[-1]
+        )
+        if len(stored) < len(days):
+            return None
+        prices, p10, p90 = (np.array(col) for col in zip(*(stored[d.isoformat()] for d in days)))
+        if any(v is None for v in p10):
+            return prices, None, None
+        return prices, p10.astype(np.float64), p90.astype(np.float64)
+
+    def _refresh_mandi_data(self):
+        """
+        (Re)load the mandi exports in DATA_DIR when a file was added, removed
+        or modified. Uses the memmapped market index artifact when it was
+        built from exactly these files; otherwise parses them (process pool).
+        The derived locations and price index are cached until the next change.
+        """
+        signature = file_signature(*list_mandi_files(DATA_DIR))
+        if self._mandi_signature == signature:
+            count_event("cache_hit", "market")
+            return
+
+        prebuilt = load_market_index(settings.ARTIFACT_DIR, signature)
+        if prebuilt is not None:
+            self._price_index, self._locations = prebuilt
+        else:
+            arrays = load_mandi_arrays(DATA_DIR, workers=settings.INGEST_WORKERS)
+            self._locations = market_locations(arrays)
+            self._price_index = PriceIndex(arrays)
+        self._mandi_signature = signature
+
     def get_market_locations(self):
         """
         Scans CSV files in data/ to find available States and Markets.
         Returns: { "Punjab": ["Ludhiana", "Khanna"], ... }
         """
-        locations = {}
-        csv_files = glob.glob(os.path.join(DATA_DIR, "*.csv"))
-        
-        for file in csv_files:
-            try:
-                df = pd.read_csv(file)
-                # Clean headers
-                df.columns = df.columns.str.lower().str.replace(r'[\(].*?[\)]', '', regex=True).str.strip().str.replace(' ', '_')
-                rename_map = {"state_name": "state", "district_name": "state", "market_name": "market"}
-                df = df.rename(columns=rename_map)
-                
-                if 'state' in df.columns and 'market' in df.columns:
-                    pairs = df[['state', 'market']].drop_duplicates().values
-                    for state, market in pairs:
-                        s = str(state).title().strip()
-                        m = str(market).title().strip()
-                        if s not in locations: locations[s] = set()
-                        locations[s].add(m)
-            except: pass
-        
-        # Convert sets to sorted lists
-        return {k: sorted(list(v)) for k, v in locations.items()}
+        self._refresh_mandi_data()
+        return self._locations
+
+    def get_price_history(self, crop_name: str, state: str, market: str = None,
+                          start=None, end=None, interval: str = "daily"):
+        """
+        Daily/weekly/monthly OHLC of modal prices from the mandi exports.
+        Returns None if the crop, state or market is not in the data.
+        """
+        self._refresh_mandi_data()
+        return self._price_index.query(crop_name, state, market, start, end, interval)
+
+    # -------------------------
+    # PRICE FORECAST
+    # -------------------------
+    @staticmethod
+    def _parse_target_date(target_date_str) -> datetime.date:
+        try:
+            if target_date_str:
+                return datetime.datetime.strptime(target_date_str, "%Y-%m-%d").date()
+        except (ValueError, TypeError):
+            pass
+        return datetime.date.today()
+
+    def _lookup_forecast(self, crop_name: str, state: str, target_date: datetime.date):
+        """
+        (days, rows, bands) for the target date + 7-day trend (day 0 is the
+        target). bands is the materialized forecast, or None when rows still
+        need a forward pass. Raises ValueError for an untrained crop/state.
+        """
+        # Encode (alias-aware; unknown names fall through to the simulation)
+        crop_enc = self._crop_index.get(CROPS.resolve(crop_name))
+        state_enc = self._state_index.get(STATES.resolve(state))
+        if crop_enc is None or state_enc is None:
+            raise ValueError(f"no trained series for {crop_name} / {state}")
+
+        days = [target_date + timedelta(days=i) for i in range(7)]
+        rows = np.array([[crop_enc, state_enc, d.toordinal()] for d in days])
+        bands = self._materialized_trend(crop_enc, state_enc, days)
+        count_event("cache_hit" if bands is not None else "cache_miss", "forecast")
+        return days, rows, bands
+
+    def _forecast_result(self, crop_name, target_date, quantity, lang, days=None, bands=None):
+        """
+        Response body from the model's bands, or from the simulation when
+        bands is None; "source" says which, "signal" is the untranslated
+        HOLD / SELL / STABLE code behind "recommendation".
+        """
+        confidence = None
+        if bands is not None:
+            prices, p10, p90 = bands
+            predicted_price = int(prices[0])
+            trend = [
+                {"date": d.strftime("%b %d"), "price": int(p)}
+                for d, p in zip(days, prices)
+            ]
+            # P10/P50/P90 per point; confidence is the mean band tightness in %
+            if p10 is not None:
+                for point, lo, hi in zip(trend, p10, p90):
+                    point.update(p10=int(lo), p50=point["price"], p90=int(hi))
+                confidence = round(float(band_confidence(prices, p10, p90).mean()) * 100, 1)
+        else:
+            predicted_price, trend = self._run_simulation_fallback(crop_name, target_date)
+
+        # 3. RECOMMENDATION LOGIC
+        if not trend: # Safety check
+            trend = [{"date": "Today", "price": predicted_price}] * 7
+
+        rec_key = str(trend_signal(trend[0]["price"], trend[-1]["price"]))
+
+        # 4. TRANSLATION (shared catalog, app/core/messages.json)
+        final_rec = t(f"market.recommendation.{rec_key}", lang)
+
+        return {
+            "forecast_price": predicted_price,
+            "trend": trend,
+            "recommendation": final_rec,
+            "signal": rec_key,
+            "source": "model" if bands is not None else "simulation",
+            "confidence": confidence,
+            "quantity_value": predicted_price * float(quantity)
+        }
+
+    def _forecast_error(self, error, lang):
+        logger.error(f"Market Prediction Failed: {error}")
+        count_event("error", "market")
+        return {
+            "forecast_price": 0, "trend": [], "recommendation": t("market.recommendation.ERROR", lang),
+            "signal": "ERROR", "source": None, "confidence": None, "quantity_value": 0
+        }
 
     def predict_price(self, crop_name: str, state: str, quantity: float, target_date_str: str, lang: str = "en", market: str = ""):
         """
         Generates forecast using AI Model (if avail) or Fallback.
         """
         try:
-            # 1. Parse Date
-            try:
-                if target_date_str:
-                    target_date = datetime.datetime.strptime(target_date_str, "%Y-%m-%d").date()
-                else:
-                    target_date = datetime.date.today()
-            except (ValueError, TypeError):
-                target_date = datetime.date.today()
-            
-            predicted_price = 0
-            trend = []
-
-            # 2. AI PREDICTION LOGIC
-            if self.model and self.scalers:
+            target_date = self._parse_target_date(target_date_str)
+            days = bands = None
+            if self.model is not None:
                 try:
-                    # Prepare Inputs
-                    crop_clean = str(crop_name).title()
-                    state_clean = str(state).title()
-                    
-                    # Encode
-                    crop_enc = self.scalers['le_crop'].transform([crop_clean])[0]
-                    state_enc = self.scalers['le_state'].transform([state_clean])[0]
-                    date_val = target_date.toordinal()
-                    
-                    # Predict Target Price
-                    input_data = np.array([[crop_enc, state_enc, date_val]])
-                    input_scaled = self.scalers['scaler_X'].transform(input_data)
-                    
-                    with torch.no_grad():
-                        tensor_in = torch.FloatTensor(input_scaled)
-                        p_scaled = self.model(tensor_in)
-                        predicted_price = int(self.scalers['scaler_y'].inverse_transform(p_scaled.numpy())[0][0])
-
-                    # Generate 7-Day Trend using AI
-                    for i in range(7):
-                        future_date = target_date + timedelta(days=i)
-                        f_ordinal = future_date.toordinal()
-                        f_in = np.array([[crop_enc, state_enc, f_ordinal]])
-                        f_scaled = self.scalers['scaler_X'].transform(f_in)
-                        with torch.no_grad():
-                            p_val = self.scalers['scaler_y'].inverse_transform(self.model(torch.FloatTensor(f_scaled)).numpy())[0][0]
-                        
-                        trend.append({
-                            "date": future_date.strftime("%b %d"),
-                            "price": int(p_val)
-                        })
-
+                    days, rows, bands = self._lookup_forecast(crop_name, state, target_date)
+                    if bands is None:
+                        bands = self._predict_bands(rows)
                 except Exception as ai_error:
-                    logger.error(f"AI Inference failed (unknown crop/state?): {ai_error}")
                     # Fallback to simulation if AI fails for specific input
-                    predicted_price, trend = self._run_simulation_fallback(crop_name, target_date)
-            else:
-                # Fallback if Model not loaded
-                predicted_price, trend = self._run_simulation_fallback(crop_name, target_date)
-
-            # 3. RECOMMENDATION LOGIC
-            if not trend: # Safety check
-                trend = [{"date": "Today", "price": predicted_price}] * 7
-
-            start_price = trend[0]["price"]
-            end_price = trend[-1]["price"]
-            price_diff = end_price - start_price
-            
-            if start_price == 0: start_price = 1
-            percent_change = (price_diff / start_price) * 100
-            
-            rec_key = "STABLE"
-            if percent_change > 2: rec_key = "HOLD"
-            elif percent_change < -2: rec_key = "SELL"
-
-            # 4. TRANSLATION MAP
-            rec_map = {
-                "en": {
-                    "STABLE": "STABLE - Market is steady.",
-                    "HOLD": "HOLD - Prices are rising. Wait for better rates.",
-                    "SELL": "SELL NOW - Prices are dropping fast."
-                },
-                "hi": {
-                    "STABLE": "स्थिर - बाजार स्थिर है।",
-                    "HOLD": "रुको - कीमतें बढ़ रही हैं। बेहतर दरों की प्रतीक्षा करें।",
-                    "SELL": "अभी बेचें - कीमतें तेजी से गिर रही हैं।"
-                },
-                "pb": {
-                    "STABLE": "ਸਥਿਰ - ਮਾਰਕੀਟ ਸਥਿਰ ਹੈ।",
-                    "HOLD": "ਰੋਕੋ - ਕੀਮਤਾਂ ਵੱਧ ਰਹੀਆਂ ਹਨ। ਵਧੀਆ ਰੇਟਾਂ ਦੀ ਉਡੀਕ ਕਰੋ।",
-                    "SELL": "ਹੁਣੇ ਵੇਚੋ - ਕੀਮਤਾਂ ਤੇਜ਼ੀ ਨਾਲ ਡਿੱਗ ਰਹੀਆਂ ਹਨ।"
-                },
-                "gj": {
-                    "STABLE": "સ્થિર - બજાર સ્થિર છે.",
-                    "HOLD": "રાહ જુઓ - ભાવ વધી રહ્યા છે.",
-                    "SELL": "હવે વેચો - ભાવ ઘટી રહ્યા છે."
-                },
-                "ta": {
-                    "STABLE": "நிலையானது - சந்தை சீராக உள்ளது.",
-                    "HOLD": "காத்திருங்கள் - விலை உயர்கிறது.",
-                    "SELL": "இப்போது விற்கவும் - விலை குறைகிறது."
-                },
-                "te": {
-                    "STABLE": "స్థిరంగా ఉంది - మార్కెట్ స్థిరంగా ఉంది.",
-                    "HOLD": "వేచి ఉండండి - ధరలు పెరుగుతున్నాయి.",
-                    "SELL": "ఇప్పుడే అమ్మండి - ధరలు తగ్గుతున్నాయి."
-                },
-                "bn": {
-                    "STABLE": "স্থিতিশীল - বাজার স্থিতিশীল।",
-                    "HOLD": "অপেক্ষা করুন - দাম বাড়ছে।",
-                    "SELL": "এখন বিক্রি করুন - দাম কমছে।"
-                }
-            }
-
-            final_rec = rec_map.get(lang, rec_map["en"]).get(rec_key, rec_map["en"][rec_key])
-
-            return {
-                "forecast_price": predicted_price,
-                "trend": trend,
-                "recommendation": final_rec,
-                "confidence": 88, 
-                "quantity_value": predicted_price * float(quantity)
-            }
+                    logger.error(f"AI Inference failed (unknown crop/state?): {ai_error}")
+                    bands = None
+            return self._forecast_result(crop_name, target_date, quantity, lang, days, bands)
+        except Exception as e:
+            return self._forecast_error(e, lang)
 
+    async def predict_price_async(self, crop_name: str, state: str, quantity: float, target_date_str: str, lang: str = "en", market: str = ""):
+        """
+        predict_price for async routes: cache misses are queued on the
+        micro-batcher, so concurrent requests share one forward pass.
+        """
+        try:
+            target_date = self._parse_target_date(target_date_str)
+            days = bands = None
+            if self.model is not None:
+                try:
+                    days, rows, bands = self._lookup_forecast(crop_name, state, target_date)
+                    if bands is None:
+                        bands = await self._batcher.submit(rows)
+                except Exception as ai_error:
+                    logger.error(f"AI Inference failed (unknown crop/state?): {ai_error}")
+                    bands = None
+            return self._forecast_result(crop_name, target_date, quantity, lang, days, bands)
         except Exception as e:
-            logger.error(f"Market Prediction Failed: {e}")
-            return {
-                "forecast_price": 0, "trend": [], "recommendation": "Error", "confidence": 0, "quantity_value": 0
-            }
+            return self._forecast_error(e, lang)
 
     def _run_simulation_fallback(self, crop_name, target_date):
         """Helper to generate fake data if AI fails or isn't trained"""
-        base_prices = { "Wheat": 2200, "Rice": 2800, "Cotton": 6500, "Maize": 2100, "Corn": 2100, "Mustard": 5400, "Soybean": 4600 }
-        base = base_prices.get(str(crop_name).title(), 2000)
+        count_event("fallback", "market")
+        base_prices = { "Wheat": 2200, "Rice": 2800, "Cotton": 6500, "Maize": 2100, "Mustard": 5400, "Soybean": 4600 }
+        base = base_prices.get(CROPS.canonical(crop_name), 2000)
         
         predicted = int(base * random.uniform(0.9, 1.1))
         trend = []
@@ -217,12 +403,26 @@ class MarketService:
         return predicted, trend
 
 # --- 5. MODULE EXPORTS (This makes run.py work!) ---
-# Create a single instance of the service
-_service = MarketService()
+# A single instance, created on first use so importing this module (as
+# app.main does) doesn't load a second copy of the model per worker
+_service = None
+
+def _get_service():
+    global _service
+    if _service is None:
+        _service = MarketService()
+    return _service
+
+def _predict_bands_in_process(rows):
+    """CPU pool entry point: each worker process loads its own service once."""
+    return _get_service()._predict_bands(rows)
 
 # Wrapper functions that run.py can call directly
 def get_market_locations():
-    return _service.get_market_locations()
+    return _get_service().get_market_locations()
 
 def predict_price(crop_name, state, quantity, target_date_str, lang="en", market=""):
-    return _service.predict_price(crop_name, state, quantity, target_date_str, lang, market)
\ No newline at end of file
+    return _get_service().predict_price(crop_name, state, quantity, target_date_str, lang, market)
+
+async def predict_price_async(crop_name, state, quantity, target_date_str, lang="en", market=""):
+    return await _get_service().predict_price_async(crop_name, state, quantity, target_date_str, lang, market)
@@ -2,17 +2,21 @@ import json
 import logging
 import google.generativeai as genai
 from app.core.config import settings
+from app.core.i18n import normalize_lang, t
 from app.models.schemas import SoilRequest
+from app.core.metrics import track, count_event
 
 logger = logging.getLogger(__name__)
 
 class SoilService:
+    MODEL_NAME = "gemini-2.5-flash"
+
     def __init__(self):
         try:
             print(f"DEBUG: API Key available? {'Yes' if settings.GEMINI_API_KEY else 'No'}")
             
             genai.configure(api_key=settings.GEMINI_API_KEY)
-            self.model = genai.GenerativeModel("gemini-2.5-flash")
+            self.model = genai.GenerativeModel(self.MODEL_NAME)
             logger.info("✓ Gemini AI Connected (Soil Service)")
         except Exception as e:
             # DEBUG LINE: Print the actual error
@@ -20,6 +24,11 @@ class SoilService:
             logger.error(f"⚠️ Gemini Init Failed: {e}")
             self.model = None
 
+    @property
+    def model_version(self) -> str:
+        """Recorded in the audit trail; 'offline' when answers come from the fallback."""
+        return self.MODEL_NAME if self.model else "offline"
+
     # 🔒 HARD AGRONOMY RULE (Safety First: Do not let AI hallucinate cultivability)
     def _is_cultivable(self, ph: float) -> bool:
         return 4.0 <= ph <= 9.0
@@ -33,18 +42,15 @@ class SoilService:
         
         # 1. Check Hard Rule
         cultivable = self._is_cultivable(request.ph)
-        lang = getattr(request, 'lang', 'en')  # Default to English if missing
+        # schemas.SoilRequest names the field 'language'; older callers set 'lang'
+        lang = normalize_lang(getattr(request, 'lang', None) or getattr(request, 'language', 'en'))
 
         # ❌ If NOT cultivable → Return immediately (Safety)
         if not cultivable:
-            msg = "Land Not Cultivable (pH is outside safe range 4.0-9.0)"
-            if lang == 'hi': msg = "भूमि खेती योग्य नहीं है (pH 4.0-9.0 की सुरक्षित सीमा से बाहर है)"
-            if lang == 'pb': msg = "ਜ਼ਮੀਨ ਖੇਤੀ ਯੋਗ ਨਹੀਂ ਹੈ (pH 4.0-9.0 ਦੀ ਸੁਰੱਖਿਅਤ ਸੀਮਾ ਤੋਂ ਬਾਹਰ ਹੈ)"
-            
             return {
                 "cultivable": False,
-                "message": msg,
-                "explanation": "Soil pH remediation is required before cultivation.",
+                "message": t("soil.not_cultivable.message", lang),
+                "explanation": t("soil.not_cultivable.explanation", lang),
                 "crops": []
             }
 
@@ -53,21 +59,7 @@ class SoilService:
             return self._get_mock_fallback(request, "Gemini API not connected", lang)
 
         # 2. Dynamic Language Instruction
-        lang_instruction = "Answer in English."
-        if lang == 'hi':
-            lang_instruction = "Answer strictly in Hindi (Devanagari script). Use simple agricultural terminology."
-        elif lang == 'pb':
-            lang_instruction = "Answer strictly in Punjabi (Gurmukhi script). Use terms farmers understand."
-        elif lang == 'gj':
-            lang_instruction = "Answer strictly in Gujarati."
-        elif lang == 'mr':
-            lang_instruction = "Answer strictly in Marathi."
-        elif lang == 'ta':
-            lang_instruction = "Answer strictly in Tamil."
-        elif lang == 'te':
-            lang_instruction = "Answer strictly in Telugu."
-        elif lang == 'bn':
-            lang_instruction = "Answer strictly in Bengali."
+        lang_instruction = t("soil.prompt.language", lang)
 
         # 🧠 AI PROMPT
         prompt = f"""
@@ -111,7 +103,8 @@ class SoilService:
 
         try:
             # Generate Content
-            response = self.model.generate_content(prompt)
+            with track("gemini_generate_content"):
+                response = self.model.generate_content(prompt)
             
             # Clean response (remove markdown code blocks if AI adds them)
             clean_text = response.text.replace("```json", "").replace("```", "").strip()
@@ -135,16 +128,10 @@ class SoilService:
         """
         Generates realistic fake data if the AI fails, roughly translated.
         """
-        msg = f"AI Offline (System Error: {error_msg})"
-        expl = "Using historical data for your district due to connection failure."
-        
-        # Simple hardcoded translations for the Fallback Message
-        if lang == 'hi':
-            msg = "सिस्टम ऑफ़लाइन (कनेक्शन त्रुटि)"
-            expl = "कनेक्शन विफलता के कारण आपके जिले के ऐतिहासिक डेटा का उपयोग किया जा रहा है।"
-        elif lang == 'pb':
-            msg = "ਸਿਸਟਮ ਔਫਲਾਈਨ (ਕਨੈਕਸ਼ਨ ਗਲਤੀ)"
-            expl = "ਕਨੈਕਸ਼ਨ ਫੇਲ ਹੋਣ ਕਾਰਨ ਤੁਹਾਡੇ ਜ਼ਿਲ੍ਹੇ ਦੇ ਪੁਰਾਣੇ ਡੇਟਾ ਦੀ ਵਰਤੋਂ ਕੀਤੀ ਜਾ ਰਹੀ ਹੈ।"
+        count_event("fallback", "soil")
+        msg = t("soil.fallback.message", lang, error=error_msg)
+        expl = t("soil.fallback.explanation", lang)
+        reason = t("soil.fallback.reason", lang)
 
         return {
             "cultivable": True,
@@ -157,7 +144,7 @@ class SoilService:
                     "urea_dose": "45",
                     "dap_dose": "25",
                     "mop_dose": "10",
-                    "reason": "Standard fallback recommendation."
+                    "reason": reason
                 },
                 {
                     "crop": "Rice (Simulated)",
@@ -165,7 +152,7 @@ class SoilService:
                     "urea_dose": "60",
                     "dap_dose": "30",
                     "mop_dose": "20",
-                    "reason": "Standard fallback recommendation."
+                    "reason": reason
                 }
             ]
         }
\ No newline at end of file
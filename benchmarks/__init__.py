@@ -0,0 +1 @@
+"""Benchmark suite for TriNetra services and routes (python -m benchmarks.run)."""
@@ -0,0 +1,62 @@
+"""
+Scaled data folders for benchmarking.
+
+Scale 1 is BASE_FARMERS farmers and BASE_MANDI_ROWS rows per Agmarknet crop
+file; scale N multiplies both. Everything is produced by
+helper_functions/generate_data.py, so the files follow data/schema.sql and
+the Agmarknet export layout.
+"""
+import shutil
+from pathlib import Path
+
+import numpy as np
+
+from app.repositories.land_cover import write_tile
+from helper_functions.generate_data import AGMARKNET_CROPS, farmer_id_for, generate, phone_for
+
+BASE_FARMERS = 100
+BASE_MANDI_ROWS = 500
+
+# Synthetic WorldCover tile N24E075 (Rajasthan) at 1/10 of the real
+# resolution: cropland, with an urban square around URBAN_POINT
+LANDCOVER_RES = 1 / 1200
+URBAN_POINT = (25.5, 76.5)
+
+
+def build_dataset(scale: int, out_dir: Path, seed: int = 42) -> dict:
+    """
+    Materialize a scaled data folder in out_dir.
+    Returns metadata the benchmarks need (phone numbers, ids, row counts).
+    """
+    out_dir = Path(out_dir)
+    if out_dir.exists():
+        shutil.rmtree(out_dir)
+
+    farmers = BASE_FARMERS * scale
+    summary = generate(
+        out_dir,
+        farmers=farmers,
+        price_rows=BASE_MANDI_ROWS * scale * len(AGMARKNET_CROPS),
+        seed=seed + scale,
+        log=lambda msg: None,
+    )
+
+    write_landcover_tile(out_dir / "landcover")
+
+    return {
+        "scale": scale,
+        "data_dir": str(out_dir),
+        "farmers": farmers,
+        "mandi_rows": sum(summary["agmarknet"].values()),
+        "phones": [str(p) for p in phone_for(range(farmers))],
+        "last_farmer_id": farmer_id_for(farmers - 1),
+    }
+
+
+def write_landcover_tile(out_dir: Path) -> Path:
+    south, west, size = 24, 75, round(3 / LANDCOVER_RES)
+    classes = np.full((size, size), 40, dtype=np.uint8)
+    row = int((south + 3 - URBAN_POINT[0]) / LANDCOVER_RES)
+    col = int((URBAN_POINT[1] - west) / LANDCOVER_RES)
+    classes[row - 50: row + 50, col - 50: col + 50] = 50
+    return write_tile(lambda r0, r1: classes[r0:r1], size, size, south, west, LANDCOVER_RES, out_dir)
@@ -0,0 +1,177 @@
+"""
+Timing helpers and a minimal in-process ASGI client.
+
+The client drives the FastAPI app directly (no sockets, no httpx), so route
+numbers measure routing + validation + service code and nothing else.
+"""
+import asyncio
+import contextlib
+import json
+import statistics
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """Latency stats in microseconds."""
+    ordered = sorted(samples)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    return {
+        "n": len(ordered),
+        "min_us": ordered[0] * 1e6,
+        "median_us": statistics.median(ordered) * 1e6,
+        "p95_us": p95 * 1e6,
+        "mean_us": statistics.fmean(ordered) * 1e6,
+    }
+
+
+def bench(
+    fn: Callable[[int], Any],
+    iterations: int,
+    warmup: int = 1,
+    budget_s: Optional[float] = None,
+) -> Dict[str, float]:
+    """
+    Time fn(i) for i in range(iterations), one sample per call.
+    Stops early once budget_s seconds are spent (always at least 3 samples).
+    """
+    for i in range(warmup):
+        fn(i)
+    samples = []
+    deadline = time.perf_counter() + budget_s if budget_s else None
+    for i in range(iterations):
+        start = time.perf_counter()
+        fn(i)
+        samples.append(time.perf_counter() - start)
+        if deadline and len(samples) >= 3 and start > deadline:
+            break
+    return summarize(samples)
+
+
+# -------------------------
+# IN-PROCESS ASGI CLIENT
+# -------------------------
+class ASGIClient:
+    """Sends requests straight into an ASGI app and collects the response."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        json_body: Optional[Any] = None,
+        query: str = "",
+        headers: Optional[List[Tuple[bytes, bytes]]] = None,
+    ) -> Tuple[int, bytes]:
+        if "?" in path:
+            path, query = path.split("?", 1)
+        body = json.dumps(json_body).encode() if json_body is not None else b""
+        raw_headers = list(headers or [])
+        if json_body is not None:
+            raw_headers.append((b"content-type", b"application/json"))
+        raw_headers.append((b"content-length", str(len(body)).encode()))
+
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": method,
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "root_path": "",
+            "query_string": query.encode(),
+            "headers": raw_headers,
+            "server": ("bench", 80),
+            "client": ("127.0.0.1", 50000),
+        }
+        sent = False
+
+        async def receive():
+            nonlocal sent
+            if not sent:
+                sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            await asyncio.sleep(3600)
+
+        status = 0
+        chunks: List[bytes] = []
+
+        async def send(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+
+        await self.app(scope, receive, send)
+        return status, b"".join(chunks)
+
+    @contextlib.asynccontextmanager
+    async def lifespan(self):
+        """Run the app's startup handlers on enter and shutdown handlers on exit."""
+        queue: asyncio.Queue = asyncio.Queue()
+        started, stopped = asyncio.Event(), asyncio.Event()
+
+        async def receive():
+            return await queue.get()
+
+        async def send(message):
+            if message["type"].startswith("lifespan.startup."):
+                started.set()
+            elif message["type"].startswith("lifespan.shutdown."):
+                stopped.set()
+
+        scope = {"type": "lifespan", "asgi": {"version": "3.0"}, "state": {}}
+        task = asyncio.ensure_future(self.app(scope, receive, send))
+        await queue.put({"type": "lifespan.startup"})
+        await started.wait()
+        try:
+            yield self
+        finally:
+            await queue.put({"type": "lifespan.shutdown"})
+            await stopped.wait()
+            await task
+
+
+async def load_test(
+    client: ASGIClient,
+    make_request: Callable[[int], Tuple],
+    requests: int,
+    concurrency: int,
+) -> Dict[str, float]:
+    """
+    Fire `requests` calls with at most `concurrency` in flight.
+    make_request(i) gives (method, path, body) or (method, path, body, headers).
+    Returns latency stats plus throughput, mean response bytes and non-2xx count.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    samples: List[float] = []
+    failures = 0
+    sizes: List[int] = []
+
+    async def one(i: int):
+        nonlocal failures
+        method, path, body, *headers = make_request(i)
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                status, payload = await client.request(method, path, body, headers=headers[0] if headers else None)
+                sizes.append(len(payload))
+            except Exception:
+                status = 500  # unhandled errors re-raise out of Starlette's error middleware
+            samples.append(time.perf_counter() - start)
+        if status >= 300:
+            failures += 1
+
+    wall_start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    wall = time.perf_counter() - wall_start
+
+    stats = summarize(samples)
+    stats["rps"] = requests / wall if wall else 0.0
+    stats["bytes"] = sum(sizes) / len(sizes) if sizes else 0.0
+    stats["non_2xx"] = failures
+    return stats
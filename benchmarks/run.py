@@ -0,0 +1,342 @@
+"""
+TriNetra benchmark runner.
+
+    python -m benchmarks.run                         # scales 10, 100, 1000
+    python -m benchmarks.run --scales 10 --save-baseline
+    python -m benchmarks.run --scales 10 100 --baseline benchmarks/results/baseline.json
+
+Every service hot path gets a micro-benchmark and every route a load test
+through the in-process ASGI client. Earth Engine and Gemini are replaced by
+benchmarks.stubs. Results are written as JSON; when a baseline is given (or
+benchmarks/results/baseline.json exists) medians slower than --threshold are
+reported as regressions and the process exits with status 1.
+"""
+import argparse
+import asyncio
+import datetime
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+os.chdir(ROOT)  # services resolve model/data paths relative to the repo root
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from benchmarks import stubs  # noqa: E402
+
+stubs.install()
+
+from app import main  # noqa: E402
+from app.core.config import settings  # noqa: E402
+from app.models.schemas import FarmerRegister, Location, SoilRequest  # noqa: E402
+from app.services import market_service as market_module  # noqa: E402
+from app.repositories.audit_store import AuditStore  # noqa: E402
+from app.repositories.kv_store import KVStore  # noqa: E402
+from app.services.alert_service import AlertService  # noqa: E402
+from app.services.auth_service import AuthService  # noqa: E402
+from app.services.credit_service import CreditScoringService  # noqa: E402
+from app.services.farm_service import FarmService  # noqa: E402
+from app.services.gee_service import GEEService  # noqa: E402
+from app.services.market_service import MarketService  # noqa: E402
+from app.services.soil_service import SoilService  # noqa: E402
+from benchmarks.datasets import URBAN_POINT, build_dataset  # noqa: E402
+from helper_functions.build_artifacts import build_artifacts  # noqa: E402
+from benchmarks.harness import ASGIClient, bench, load_test  # noqa: E402
+
+RESULTS_DIR = ROOT / "benchmarks" / "results"
+DEFAULT_BASELINE = RESULTS_DIR / "baseline.json"
+
+TARGET_DATE = "2026-02-01"
+UNCACHED_DATE = datetime.date(2027, 1, 1)
+CROPS = ["Wheat", "Rice", "Maize", "Cotton", "Soybean"]
+STATES = ["Punjab", "Haryana", "Rajasthan", "Madhya Pradesh", "Maharashtra"]
+
+
+# -------------------------
+# ENVIRONMENT
+# -------------------------
+def point_services_at(data_dir: Path) -> None:
+    """Re-target settings and rebuild the app's service singletons on data_dir."""
+    settings.DATA_DIR = data_dir
+    settings.SOIL_DATA_PATH = data_dir / "soil_database_real.csv"
+    settings.MARKET_DATA_PATH = data_dir / "market_history.csv"
+    settings.FARMERS_DATA_PATH = data_dir / "farmers.json"
+    settings.FARMS_DATA_PATH = data_dir / "farms.csv"
+    settings.FARM_CROPS_DATA_PATH = data_dir / "farm_crops.csv"
+    settings.KV_STORE_PATH = data_dir / "shared_state.db"
+    settings.ARTIFACT_DIR = data_dir / "artifacts"
+    settings.DB_PATH = data_dir / "trinetra.db"
+    settings.LANDCOVER_DIR = data_dir / "landcover"
+    settings.FORECAST_SCHEDULE_ENABLED = False  # materialized explicitly below
+    # Measure the EE code path, not the quota: the fake ee has no account limit
+    settings.EE_RATE_PER_S = 1e6
+    settings.EE_BURST = 1_000_000
+    market_module.DATA_DIR = str(data_dir) + os.sep
+
+    # Same startup path as production: workers memory-map prebuilt artifacts
+    build_artifacts(data_dir, settings.ARTIFACT_DIR)
+
+    main.gee_service = GEEService()
+    main.gee_service.gee_enabled = True  # exercise the real code path against the fake ee
+    main.soil_service = SoilService()
+    main.market_service = MarketService()
+    main.market_service.refresh_forecasts(datetime.date.fromisoformat(TARGET_DATE))
+    main.auth_service = AuthService()
+    main.farm_service = FarmService()
+    # What the nightly job leaves behind: a reading for every registered farm
+    main.gee_service.prefetch_field_health(main.farm_service.index, KVStore(settings.KV_STORE_PATH, "jobs"))
+    main.credit_service = CreditScoringService()
+    main.audit_writer.store = AuditStore(settings.DB_PATH)
+    # A subscriber per crop x state, alerted by the materialized forecasts
+    main.alert_service = AlertService()
+    for i, (crop, state) in enumerate((c, s) for c in CROPS for s in STATES):
+        main.alert_service.subscribe(f"bench-{i % 10}", crop, state, "signal")
+    main.alert_service.dispatch(main.market_service.forecast_signals(datetime.date.fromisoformat(TARGET_DATE)))
+
+
+def _git_revision() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except Exception:
+        return "unknown"
+
+
+# -------------------------
+# MICRO-BENCHMARKS
+# -------------------------
+def run_micro(meta: dict, iterations: int, budget_s: float) -> dict:
+    phones = meta["phones"]
+    repo = main.auth_service.repo
+    market = main.market_service
+    prefetched = [f.decode() for f in main.farm_service.index.farm_id[:50]]
+    results = {}
+
+    def predict(i):
+        market.predict_price(CROPS[i % len(CROPS)], STATES[i % len(STATES)], 10, TARGET_DATE)
+
+    def soil_request(i):
+        return SoilRequest(
+            district="Pune", nitrogen=40 + i % 20, phosphorus=30, potassium=40, ph=6.5, rainfall=110
+        )
+
+    cases = {
+        "MarketService.predict_price": predict,
+        "MarketService.get_market_locations": lambda i: market.get_market_locations(),
+        "MarketService.get_price_history": lambda i: market.get_price_history(
+            "Wheat", STATES[i % len(STATES)], interval=("daily", "weekly", "monthly")[i % 3]
+        ),
+        "DataRepository.get_farmer_by_phone": lambda i: repo.get_farmer_by_phone(phones[(i * 7919) % len(phones)]),
+        "DataRepository.get_farmer_by_id": lambda i: repo.get_farmer_by_id(meta["last_farmer_id"]),
+        "DataRepository.get_soil_data_by_district": lambda i: repo.get_soil_data_by_district("Ludhiana"),
+        "DataRepository.get_market_data_for_crop": lambda i: repo.get_market_data_for_crop("Wheat", "Haryana"),
+        "GEEService.get_field_health": lambda i: main.gee_service.get_field_health(
+            Location(lat=26.9 + i * 1e-4, lng=75.78), claimed_yield=20
+        ),
+        "GEEService.get_field_health (prefetched)": lambda i: main.gee_service.get_field_health(
+            Location(lat=26.9, lng=75.78), claimed_yield=20, farm_id=prefetched[i % len(prefetched)]
+        ),
+        "GEEService.get_field_health (rejected)": lambda i: main.gee_service.get_field_health(
+            Location(lat=URBAN_POINT[0] + i * 1e-5, lng=URBAN_POINT[1]), claimed_yield=20
+        ),
+        "LandCoverService.land_class": lambda i: main.gee_service.land_cover.land_class(26.9 + i * 1e-4, 75.78),
+        "FarmService.match_claim": lambda i: main.farm_service.match_claim(26.9 + i * 1e-4, 75.78),
+        "FarmService.nearby": lambda i: main.farm_service.nearby(26.9 + i * 1e-3, 75.78, 5),
+        "SoilService.recommend_crop": lambda i: main.soil_service.recommend_crop(soil_request(i)),
+    }
+    for name, fn in cases.items():
+        results[name] = bench(fn, iterations, budget_s=budget_s)
+
+    # Registration mutates the farmer file, so it runs last on fresh phones.
+    fresh = AuthService()
+
+    def register(i):
+        fresh.register_farmer(FarmerRegister(
+            name="Bench Farmer", phone=f"{5_000_000_000 + i}", state="Punjab", district="Ludhiana"
+        ))
+
+    results["AuthService.register_farmer"] = bench(register, max(3, iterations // 10), warmup=0, budget_s=budget_s)
+
+    def register_bulk(i):
+        rows = "".join(f"Bulk Farmer,{3_000_000_000 + i * 1000 + j},Punjab,Ludhiana,en\n" for j in range(1000))
+        fresh.register_farmers_bulk(io.BytesIO(("name,phone,state,district,language\n" + rows).encode()), "csv")
+
+    results["AuthService.register_farmers_bulk (1k rows)"] = bench(
+        register_bulk, max(3, iterations // 10), warmup=0, budget_s=budget_s
+    )
+    return results
+
+
+# -------------------------
+# ROUTE LOAD TESTS
+# -------------------------
+def run_routes(meta: dict, requests: int, concurrency: int) -> dict:
+    phones = meta["phones"]
+    heavy = max(5, requests // meta["scale"])
+    farmer_ids = [f.decode() for f in main.farm_service.index.farmer_id[:50]]
+
+    routes = {
+        "GET /": (requests, lambda i: ("GET", "/", None)),
+        "GET /api/market/locations": (heavy, lambda i: ("GET", "/api/market/locations", None)),
+        "GET /api/market/locations (gzip)": (heavy, lambda i: (
+            "GET", "/api/market/locations", None, [(b"accept-encoding", b"gzip")]
+        )),
+        "GET /api/market/history": (requests, lambda i: (
+            "GET", f"/api/market/history?crop=Wheat&state={STATES[i % len(STATES)].replace(' ', '%20')}&interval=weekly", None
+        )),
+        "GET /api/market/history (gzip)": (requests, lambda i: (
+            "GET", f"/api/market/history?crop=Wheat&state={STATES[i % len(STATES)].replace(' ', '%20')}&interval=weekly",
+            None, [(b"accept-encoding", b"gzip")]
+        )),
+        "POST /api/analyze/market": (requests, lambda i: ("POST", "/api/analyze/market", {
+            "crop_name": CROPS[i % len(CROPS)], "state": STATES[i % len(STATES)],
+            "quantity": 10, "target_date_str": TARGET_DATE,
+        })),
+        # Dates past the materialized horizon: every request needs a forward pass (micro-batched)
+        "POST /api/analyze/market (uncached)": (requests, lambda i: ("POST", "/api/analyze/market", {
+            "crop_name": CROPS[i % len(CROPS)], "state": STATES[i % len(STATES)],
+            "quantity": 10, "target_date_str": (UNCACHED_DATE + datetime.timedelta(days=i % 300)).isoformat(),
+        })),
+        "POST /api/analyze/credit": (requests, lambda i: ("POST", "/api/analyze/credit", {
+            "lat": 26.9 + i * 1e-4, "lng": 75.78, "claimed_yield": 20,
+        })),
+        "GET /api/farms/nearby": (requests, lambda i: (
+            "GET", f"/api/farms/nearby?lat={26.9 + i * 1e-3}&lng=75.78&k=5", None
+        )),
+        "GET /api/alerts/notifications": (requests, lambda i: (
+            "GET", f"/api/alerts/bench-{i % 10}/notifications?limit=20", None
+        )),
+        "GET /api/farmer/{id}/dashboard": (requests, lambda i: (
+            "GET", f"/api/farmer/{farmer_ids[i % len(farmer_ids)]}/dashboard", None
+        )),
+        "POST /api/analyze/soil": (requests, lambda i: ("POST", "/api/analyze/soil", {
+            "district": "Pune", "nitrogen": 45, "phosphorus": 30, "potassium": 40,
+            "ph": 6.5, "rainfall": 120, "lang": "hi",
+        })),
+        "POST /api/auth/login-otp": (min(requests, len(phones)), lambda i: (
+            "POST", "/api/auth/login-otp", {"phone": phones[i % len(phones)]}
+        )),
+        "POST /api/auth/verify-otp": (requests, lambda i: (
+            "POST", "/api/auth/verify-otp", {"phone": phones[(i * 31) % len(phones)], "otp": "123456"}
+        )),
+    }
+    # farmers.json is rewritten without locking, so writers must not overlap.
+    serial_routes = {
+        "POST /api/auth/register": (heavy, lambda i: ("POST", "/api/auth/register", {
+            "name": "Load Farmer", "phone": f"{4_000_000_000 + i}", "state": "Punjab", "district": "Ludhiana",
+        })),
+    }
+
+    async def drive():
+        client = ASGIClient(main.app)
+        out = {}
+        async with client.lifespan():
+            for name, (count, make) in routes.items():
+                out[name] = await load_test(client, make, count, concurrency)
+            for name, (count, make) in serial_routes.items():
+                out[name] = await load_test(client, make, count, 1)
+        return out
+
+    return asyncio.run(drive())
+
+
+# -------------------------
+# REGRESSION CHECK
+# -------------------------
+def compare(current: dict, baseline: dict, threshold: float, min_delta_us: float) -> list:
+    """Flag every shared key whose median slowed by more than threshold."""
+    regressions = []
+    for key, stats in current.items():
+        old = baseline.get(key)
+        if not old:
+            continue
+        before, after = old["median_us"], stats["median_us"]
+        if after > before * (1 + threshold) and after - before > min_delta_us:
+            regressions.append({
+                "benchmark": key,
+                "baseline_median_us": round(before, 1),
+                "current_median_us": round(after, 1),
+                "ratio": round(after / before, 3) if before else None,
+            })
+    return regressions
+
+
+def main_cli(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="TriNetra benchmark suite")
+    parser.add_argument("--scales", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--budget", type=float, default=10.0, help="seconds per micro-benchmark")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--skip-routes", action="store_true")
+    parser.add_argument("--output", type=Path, default=None)
+    parser.add_argument("--baseline", type=Path, default=None)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--threshold", type=float, default=0.15, help="allowed median slowdown")
+    parser.add_argument("--min-delta-us", type=float, default=50.0, help="ignore smaller absolute slowdowns")
+    args = parser.parse_args(argv)
+
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="trinetra-bench-") as tmp:
+        for scale in args.scales:
+            print(f"📦 Building {scale}x dataset...")
+            meta = build_dataset(scale, Path(tmp) / f"x{scale}")
+            point_services_at(Path(meta["data_dir"]))
+
+            print(f"⏱️  Micro-benchmarks @ {scale}x")
+            for name, stats in run_micro(meta, args.iterations, args.budget).items():
+                results[f"x{scale}/micro/{name}"] = stats
+
+            if not args.skip_routes:
+                print(f"🚦 Route load tests @ {scale}x")
+                for name, stats in run_routes(meta, args.requests, args.concurrency).items():
+                    results[f"x{scale}/route/{name}"] = stats
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "git_revision": _git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "scales": args.scales,
+        },
+        "results": results,
+        "regressions": [],
+    }
+
+    baseline_path = args.baseline or (DEFAULT_BASELINE if DEFAULT_BASELINE.exists() else None)
+    if baseline_path and not args.save_baseline:
+        baseline = json.loads(Path(baseline_path).read_text())
+        report["regressions"] = compare(results, baseline["results"], args.threshold, args.min_delta_us)
+        report["meta"]["baseline"] = str(baseline_path)
+
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    output = args.output or RESULTS_DIR / f"bench_{time.strftime('%Y%m%d_%H%M%S')}.json"
+    output.write_text(json.dumps(report, indent=2))
+    if args.save_baseline:
+        DEFAULT_BASELINE.write_text(json.dumps(report, indent=2))
+
+    for key, stats in results.items():
+        extra = f"  {stats['rps']:.0f} req/s  {stats.get('bytes', 0):.0f} B" if "rps" in stats else ""
+        print(f"   {key:<60} median {stats['median_us']:>12.1f} µs{extra}")
+    print(f"📝 Results written to {output}")
+
+    if report["regressions"]:
+        print(f"❌ {len(report['regressions'])} regression(s) vs {baseline_path}:")
+        for r in report["regressions"]:
+            print(f"   {r['benchmark']}: {r['baseline_median_us']} → {r['current_median_us']} µs (x{r['ratio']})")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
@@ -0,0 +1,170 @@
+"""
+Local stand-ins for the `ee` and `google.generativeai` SDKs.
+
+install() must run before any `app.*` import so the services bind to the
+fakes. Latency and error injection are controlled through FAKE_EE / FAKE_GEMINI.
+"""
+import json
+import random
+import sys
+import time
+import types
+
+
+class FakeUpstream:
+    """
+    Shared knobs: fixed latency per call, a probability of raising, and
+    fail_next to make the next N calls fail outright (outage / quota burst).
+    """
+
+    def __init__(self, latency_s: float = 0.0, error_rate: float = 0.0, seed: int = 7,
+                 error_message: str = "Injected upstream failure"):
+        self.latency_s = latency_s
+        self.error_rate = error_rate
+        self.error_message = error_message
+        self.fail_next = 0
+        self.calls = 0
+        self._rng = random.Random(seed)
+
+    def hit(self) -> None:
+        self.calls += 1
+        if self.latency_s:
+            time.sleep(self.latency_s)
+        if self.fail_next > 0:
+            self.fail_next -= 1
+            raise RuntimeError(self.error_message)
+        if self.error_rate and self._rng.random() < self.error_rate:
+            raise RuntimeError(self.error_message)
+
+
+FAKE_EE = FakeUpstream()
+FAKE_GEMINI = FakeUpstream()
+
+# Values the fake Earth Engine answers with.
+EE_VALUES = {"Map": 40, "nd": 0.62}
+
+
+# -------------------------
+# FAKE EARTH ENGINE
+# -------------------------
+class _Computed:
+    def __init__(self, key=None):
+        self._key = key
+
+    def get(self, key):
+        return _Computed(key)
+
+    def getInfo(self):
+        FAKE_EE.hit()
+        return EE_VALUES.get(self._key)
+
+
+class _Regions:
+    """reduceRegions() result: every feature gets the fake band values."""
+
+    def __init__(self, collection):
+        self._collection = collection
+
+    def getInfo(self):
+        FAKE_EE.hit()
+        bands = {"ndvi": EE_VALUES["nd"], "ndwi": EE_VALUES["nd"], "Map": EE_VALUES["Map"]}
+        return {"features": [{"properties": {**props, **bands}} for props in self._collection.features]}
+
+
+class _FeatureCollection:
+    def __init__(self, features):
+        self.features = [props for _, props in features]
+
+
+class _Image:
+    def reduceRegion(self, *args, **kwargs):
+        return _Computed()
+
+    def reduceRegions(self, collection, *args, **kwargs):
+        return _Regions(collection)
+
+    def rename(self, *args):
+        return self
+
+    def select(self, *args):
+        return self
+
+    def mosaic(self):
+        return self
+
+    def normalizedDifference(self, bands):
+        return _Image()
+
+    def first(self):
+        return _Image()
+
+    def filterBounds(self, *args):
+        return self
+
+    def filterDate(self, *args):
+        return self
+
+    def filter(self, *args):
+        return self
+
+    def sort(self, *args):
+        return self
+
+
+def _build_ee() -> types.ModuleType:
+    ee = types.ModuleType("ee")
+    ee.__fake__ = True
+    ee.Initialize = lambda *args, **kwargs: None
+    ee.Geometry = types.SimpleNamespace(Point=lambda coords: tuple(coords))
+    ee.ImageCollection = lambda *args, **kwargs: _Image()
+    ee.Image = types.SimpleNamespace(cat=lambda images: _Image())
+    ee.Feature = lambda geometry, props: (geometry, props)
+    ee.FeatureCollection = _FeatureCollection
+    ee.Reducer = types.SimpleNamespace(first=lambda: "first", mean=lambda: "mean")
+    ee.Filter = types.SimpleNamespace(lt=lambda *args: ("lt",) + args)
+    return ee
+
+
+# -------------------------
+# FAKE GEMINI
+# -------------------------
+_GEMINI_REPLY = json.dumps({
+    "message": "Soil is balanced.",
+    "explanation": "Nitrogen and potassium are adequate; phosphorus is slightly low.",
+    "crops": [
+        {"crop": "Wheat", "confidence": "High", "urea_dose": "45", "dap_dose": "25",
+         "mop_dose": "10", "reason": "Fits pH and rainfall."},
+    ],
+})
+
+
+class _GenerativeModel:
+    def __init__(self, name, *args, **kwargs):
+        self.name = name
+
+    def generate_content(self, prompt):
+        FAKE_GEMINI.hit()
+        return types.SimpleNamespace(text=_GEMINI_REPLY)
+
+
+def _build_genai() -> types.ModuleType:
+    genai = types.ModuleType("google.generativeai")
+    genai.configure = lambda **kwargs: None
+    genai.GenerativeModel = _GenerativeModel
+    return genai
+
+
+def install() -> None:
+    """Register the fakes in sys.modules (idempotent)."""
+    if getattr(sys.modules.get("ee"), "__fake__", False):
+        return
+    if "app.services.gee_service" in sys.modules or "app.services.soil_service" in sys.modules:
+        raise RuntimeError("benchmarks.stubs.install() must run before importing app services")
+    sys.modules["ee"] = _build_ee()
+    genai = _build_genai()
+    sys.modules["google.generativeai"] = genai
+    try:
+        import google
+        google.generativeai = genai
+    except ImportError:
+        pass
@@ -39,6 +39,7 @@ CREATE TABLE IF NOT EXISTS farms (
 );
 
 CREATE INDEX idx_farms_farmer ON farms(farmer_id);
+-- Exact lookups only; radius / nearest-farm queries use the API's grid index (app/repositories/farm_index.py)
 CREATE INDEX idx_farms_location ON farms(latitude, longitude);
 
 -- ===========================================
@@ -66,6 +67,8 @@ CREATE TABLE IF NOT EXISTS satellite_data (
     farm_id UUID NOT NULL REFERENCES farms(id) ON DELETE CASCADE,
     image_date DATE NOT NULL,
     ndvi_value DECIMAL(5,3) NOT NULL,
+    ndwi_value DECIMAL(5,3),
+    land_class SMALLINT, -- ESA WorldCover code
     ndvi_category VARCHAR(20),
     cloud_coverage_percent DECIMAL(5,2),
     image_url TEXT,
@@ -167,8 +170,11 @@ CREATE TABLE IF NOT EXISTS price_predictions (
     id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
     farm_id UUID REFERENCES farms(id) ON DELETE CASCADE,
     crop VARCHAR(100) NOT NULL,
+    state VARCHAR(100),
     prediction_date DATE NOT NULL,
     predicted_price DECIMAL(10,2) NOT NULL,
+    price_p10 DECIMAL(10,2),
+    price_p90 DECIMAL(10,2),
     confidence_score DECIMAL(5,3),
     recommendation VARCHAR(20) CHECK (recommendation IN ('HOLD', 'SELL', 'WAIT')),
     reasoning TEXT,
@@ -181,6 +187,7 @@ CREATE TABLE IF NOT EXISTS price_predictions (
 CREATE INDEX idx_prediction_farm ON price_predictions(farm_id);
 CREATE INDEX idx_prediction_crop ON price_predictions(crop);
 CREATE INDEX idx_prediction_date ON price_predictions(prediction_date);
+CREATE INDEX idx_prediction_lookup ON price_predictions(model_version, crop, state, prediction_date);
 
 -- ===========================================
 -- WEATHER DATA CACHE
@@ -219,6 +226,23 @@ CREATE TABLE IF NOT EXISTS notifications (
 CREATE INDEX idx_notification_farmer ON notifications(farmer_id);
 CREATE INDEX idx_notification_read ON notifications(is_read);
 
+-- Price alert subscriptions; idx_alert_match is the (crop, state) inverted
+-- index the daily forecast refresh matches changed pairs against
+CREATE TABLE IF NOT EXISTS alert_subscriptions (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    farmer_id UUID NOT NULL REFERENCES farmers(id) ON DELETE CASCADE,
+    crop VARCHAR(100) NOT NULL,
+    state VARCHAR(100) NOT NULL,
+    kind VARCHAR(20) NOT NULL CHECK (kind IN ('above', 'below', 'signal')),
+    threshold DECIMAL(10, 2),
+    signal VARCHAR(10),
+    lang VARCHAR(5) DEFAULT 'en',
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX idx_alert_match ON alert_subscriptions(crop, state, kind, lang, threshold);
+CREATE INDEX idx_alert_farmer ON alert_subscriptions(farmer_id);
+
 -- ===========================================
 -- AUDIT LOG (All Changes)
 -- ===========================================
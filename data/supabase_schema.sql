@@ -104,6 +104,8 @@ CREATE TABLE IF NOT EXISTS satellite_data (
     farm_id UUID NOT NULL REFERENCES farms(id) ON DELETE CASCADE,
     image_date DATE NOT NULL,
     ndvi_value DECIMAL(5,3) NOT NULL,
+    ndwi_value DECIMAL(5,3),
+    land_class SMALLINT, -- ESA WorldCover code
     ndvi_category VARCHAR(20),
     cloud_coverage_percent DECIMAL(5,2),
     image_url TEXT,
@@ -243,8 +245,11 @@ CREATE TABLE IF NOT EXISTS price_predictions (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
     farm_id UUID REFERENCES farms(id) ON DELETE CASCADE,
     crop VARCHAR(100) NOT NULL,
+    state VARCHAR(100),
     prediction_date DATE NOT NULL,
     predicted_price DECIMAL(10,2) NOT NULL,
+    price_p10 DECIMAL(10,2),
+    price_p90 DECIMAL(10,2),
     confidence_score DECIMAL(5,3),
     recommendation VARCHAR(20) CHECK (recommendation IN ('HOLD', 'SELL', 'WAIT')),
     reasoning TEXT,
@@ -264,6 +269,7 @@ CREATE POLICY "Allow authenticated users to read price_predictions"
 CREATE INDEX idx_prediction_farm ON price_predictions(farm_id);
 CREATE INDEX idx_prediction_crop ON price_predictions(crop);
 CREATE INDEX idx_prediction_date ON price_predictions(prediction_date DESC);
+CREATE INDEX idx_prediction_lookup ON price_predictions(model_version, crop, state, prediction_date);
 
 -- ===========================================
 -- WEATHER DATA CACHE
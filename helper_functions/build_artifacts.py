@@ -0,0 +1,55 @@
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Add Root to Python System Path (so `app` imports work when run as a script)
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.append(str(ROOT_DIR))
+
+from app.core.config import settings  # noqa: E402
+from app.repositories.artifacts import export_market_model  # noqa: E402
+from app.repositories.farm_index import export_farm_index  # noqa: E402
+from app.repositories.price_index import export_market_index  # noqa: E402
+from app.services.market_service import ENSEMBLE_PATH, MODEL_PATH, SCALER_PATH  # noqa: E402
+
+
+def build_artifacts(data_dir: Path, out_dir: Path, skip_model: bool = False, skip_index: bool = False):
+    """
+    Writes the read-only files every API worker memory-maps at startup:
+      market_index.bin/.json  sorted mandi price arrays + locations
+      market_model.bin/.json  MLP (+ ensemble) weights, scaler params, encoder classes
+      farm_index.bin/.json    farms.csv sorted into the spatial grid
+    Re-run after new mandi exports land, farms are added or after train_market_ai.py.
+    """
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    if not skip_index:
+        start = time.perf_counter()
+        path = export_market_index(data_dir, out_dir, workers=settings.INGEST_WORKERS)
+        print(f"   ✅ {path.name}: {path.stat().st_size / 1e6:.1f} MB in {time.perf_counter() - start:.1f}s")
+
+    farms_path = data_dir / "farms.csv"
+    if farms_path.exists():
+        start = time.perf_counter()
+        path = export_farm_index(farms_path, out_dir, settings.FARM_INDEX_CELL_DEG)
+        print(f"   ✅ {path.name}: {path.stat().st_size / 1e6:.1f} MB in {time.perf_counter() - start:.1f}s")
+
+    if not skip_model:
+        if Path(MODEL_PATH).exists() and Path(SCALER_PATH).exists():
+            path = export_market_model(Path(MODEL_PATH), Path(SCALER_PATH), out_dir, Path(ENSEMBLE_PATH))
+            print(f"   ✅ {path.name}: {path.stat().st_size / 1e3:.1f} KB")
+        else:
+            print("   ⏭️  No trained model in app/models/, skipped (run train_market_ai.py first)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build memory-mapped TriNetra artifacts")
+    parser.add_argument("--data", type=Path, default=settings.DATA_DIR)
+    parser.add_argument("--out", type=Path, default=settings.ARTIFACT_DIR)
+    parser.add_argument("--skip-model", action="store_true")
+    parser.add_argument("--skip-index", action="store_true")
+    args = parser.parse_args()
+
+    print(f"📦 Building artifacts {args.data} -> {args.out}...")
+    build_artifacts(args.data, args.out, args.skip_model, args.skip_index)
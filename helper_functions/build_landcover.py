@@ -0,0 +1,39 @@
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Add Root to Python System Path (so `app` imports work when run as a script)
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.append(str(ROOT_DIR))
+
+from app.core.config import settings  # noqa: E402
+from app.repositories.land_cover import export_geotiff  # noqa: E402
+
+
+def build_landcover(src_dir: Path, out_dir: Path):
+    """
+    Converts downloaded ESA WorldCover map tiles (ESA_WorldCover_10m_*_Map.tif,
+    3° x 3°, from https://esa-worldcover.org) covering our operating states
+    into the blocked tile files GEEService memory-maps for its land check.
+    Needs rasterio; the API itself does not.
+    """
+    sources = sorted(Path(src_dir).glob("ESA_WorldCover_*_Map.tif"))
+    if not sources:
+        print(f"   ⏭️  No ESA_WorldCover_*_Map.tif files in {src_dir}")
+        return
+
+    for src in sources:
+        start = time.perf_counter()
+        path = export_geotiff(src, out_dir)
+        print(f"   ✅ {src.name} -> {path.name}: {path.stat().st_size / 1e6:.0f} MB in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build local WorldCover land-cover tiles")
+    parser.add_argument("src", type=Path, help="folder with the downloaded GeoTIFF tiles")
+    parser.add_argument("--out", type=Path, default=settings.LANDCOVER_DIR)
+    args = parser.parse_args()
+
+    print(f"🗺️ Building land-cover tiles {args.src} -> {args.out}...")
+    build_landcover(args.src, args.out)
@@ -0,0 +1,483 @@
+"""
+Synthetic dataset generator for load testing.
+
+Writes schema-consistent versions of every file in data/ (farmers, farms,
+farm_crops, satellite_data, soil_records, credit_scores, market_prices,
+market_history, soil_database_real) plus Agmarknet-layout crop CSVs, at any
+scale. Rows are generated and appended chunk by chunk, so memory stays flat
+whether you ask for 1k farmers or 1M farmers / 50M price rows.
+
+    python helper_functions/generate_data.py --out data_synth --farmers 1000000 --price-rows 50000000
+
+Every date is laid out relative to an "as of" day (--as-of, default AS_OF),
+never the wall clock, so the same arguments always produce the same files.
+"""
+import argparse
+import json
+import math
+import sys
+import time
+import uuid
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# --- REFERENCE DATA ---
+AS_OF = date(2025, 12, 1)  # default end of the generated history
+REGIONS = {
+    "Punjab": [("Ludhiana", 30.90, 75.85), ("Amritsar", 31.63, 74.87), ("Patiala", 30.34, 76.39), ("Bathinda", 30.21, 74.95)],
+    "Haryana": [("Karnal", 29.69, 76.99), ("Hisar", 29.15, 75.72), ("Sirsa", 29.53, 75.03)],
+    "Rajasthan": [("Jaipur", 26.91, 75.79), ("Kota", 25.21, 75.86), ("Sri Ganganagar", 29.90, 73.88)],
+    "Madhya Pradesh": [("Indore", 22.72, 75.86), ("Ujjain", 23.18, 75.78), ("Bhopal", 23.26, 77.41)],
+    "Maharashtra": [("Pune", 18.52, 73.86), ("Nashik", 20.00, 73.79), ("Nagpur", 21.15, 79.09), ("Latur", 18.40, 76.58)],
+    "Uttar Pradesh": [("Agra", 27.18, 78.01), ("Meerut", 28.98, 77.71), ("Kanpur", 26.45, 80.33)],
+    "Gujarat": [("Rajkot", 22.30, 70.80), ("Ahmedabad", 23.02, 72.57)],
+    "Andhra Pradesh": [("Krishna", 16.61, 80.72), ("Kurnool", 15.83, 78.04)],
+}
+MARKET_SUFFIXES = ("APMC", "Grain Market", "Mandi")
+
+# file stem -> (commodity group, commodity, varieties, base modal price, harvest months)
+AGMARKNET_CROPS = {
+    "paddy": ("Cereals", "Paddy(Common)", ("Common", "1001", "Sona"), 2300, (10, 11)),
+    "wheat": ("Cereals", "Wheat", ("Dara", "Lokwan", "Other"), 2400, (4, 5)),
+    "maize": ("Cereals", "Maize", ("Hybrid", "Local", "Yellow"), 2200, (9, 10)),
+    "soyabean": ("Oil Seeds", "Soyabean", ("Yellow", "Other"), 4400, (10, 11)),
+    "cotton": ("Fibre Crops", "Cotton", ("Bunny", "Desi", "Other"), 7200, (10, 11, 12)),
+    "mustard": ("Oil Seeds", "Mustard", ("Mustard", "Sarson(Black)"), 5600, (3, 4)),
+    "chana": ("Pulses", "Bengal Gram(Gram)(Whole)", ("Desi", "Other"), 5800, (3, 4)),
+}
+HISTORY_CROPS = ("Wheat", "Rice", "Maize", "Cotton", "Soybean")
+FARM_CROPS = (("wheat", "Rabi"), ("mustard", "Rabi"), ("chana", "Rabi"), ("paddy", "Kharif"),
+              ("cotton", "Kharif"), ("maize", "Kharif"), ("soyabean", "Kharif"))
+FIRST_NAMES = np.array(["Ramesh", "Suresh", "Priya", "Anita", "Rajesh", "Gurpreet", "Harpreet", "Sunita",
+                        "Mahesh", "Kavita", "Vijay", "Lakshmi", "Arjun", "Meena", "Baldev", "Savitri"])
+LAST_NAMES = np.array(["Kumar", "Singh", "Patel", "Sharma", "Yadav", "Reddy", "Deshmukh", "Gill",
+                       "Sandhu", "Verma", "Jadhav", "Chauhan", "Naidu", "Meena"])
+LANGUAGES = np.array(["en", "hi", "pb", "mr", "gj", "te"])
+SOIL_TYPES = np.array(["Loamy", "Clay", "Sandy", "Black", "Alluvial", "Red"])
+IRRIGATION = np.array(["Drip", "Canal", "Borewell", "Sprinkler", "Rainfed"])
+WEATHER = np.array(["Clear", "Cloudy", "Rain", "Humid"])
+
+# Phones are a bijection of the row index into [6e9, 1e10): unique without a lookup set.
+_PHONE_SPACE = 4_000_000_000
+_PHONE_STRIDE = 2_654_435_761  # odd and not a multiple of 5, so coprime with _PHONE_SPACE
+_PHONE_OFFSET = 123_456_789
+
+_ID_NAMESPACE = uuid.UUID("6f1c9a52-3b0e-4d7a-9c5e-7a2b1d0e8f43")
+
+_DISTRICTS = [(state, d, lat, lng) for state, ds in REGIONS.items() for d, lat, lng in ds]
+_DISTRICT_LAT = np.array([d[2] for d in _DISTRICTS])
+_DISTRICT_LNG = np.array([d[3] for d in _DISTRICTS])
+
+
+def phone_for(index):
+    """10-digit phone for farmer row `index` (scalar or ndarray)."""
+    return 6_000_000_000 + (np.asarray(index, dtype=np.int64) * _PHONE_STRIDE + _PHONE_OFFSET) % _PHONE_SPACE
+
+
+def farmer_id_for(index) -> str:
+    """Deterministic UUID for farmer row `index`."""
+    return str(uuid.uuid5(_ID_NAMESPACE, str(int(index))))
+
+
+# -------------------------
+# WRITERS
+# -------------------------
+class ChunkWriter:
+    """Appends DataFrame chunks to one CSV, writing the header once."""
+
+    def __init__(self, path: Path, columns):
+        self.path = path
+        self.columns = list(columns)
+        self.rows = 0
+        path.parent.mkdir(parents=True, exist_ok=True)
+        pd.DataFrame(columns=self.columns).to_csv(path, index=False)
+
+    def write(self, df: pd.DataFrame) -> None:
+        df[self.columns].to_csv(self.path, mode="a", header=False, index=False)
+        self.rows += len(df)
+
+
+class FarmerJSONWriter:
+    """Streams the {farmer_id: record} object used by farmers.json."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.rows = 0
+        self._f = open(path, "w", encoding="utf-8")
+        self._f.write("{\n")
+
+    def write(self, records) -> None:
+        parts = []
+        for rec in records:
+            prefix = ",\n" if self.rows else ""
+            parts.append(f'{prefix}  {json.dumps(rec["farmer_id"])}: {json.dumps(rec, ensure_ascii=False)}')
+            self.rows += 1
+        self._f.write("".join(parts))
+
+    def close(self) -> None:
+        self._f.write("\n}\n")
+        self._f.close()
+
+
+# -------------------------
+# TABLE GENERATORS
+# -------------------------
+def _timestamps(rng, n, start: datetime, span_days: int) -> np.ndarray:
+    seconds = rng.integers(0, span_days * 86400, size=n)
+    return (np.datetime64(start, "s") + seconds.astype("timedelta64[s]")).astype(str)
+
+
+def _dates(base: date, offsets) -> np.ndarray:
+    return (np.datetime64(base, "D") + np.asarray(offsets).astype("timedelta64[D]")).astype(str)
+
+
+def _season_start(as_of: date, month: int) -> date:
+    """Most recent 1st of the given month on or before as_of."""
+    return date(as_of.year if month <= as_of.month else as_of.year - 1, month, 1)
+
+
+def farmer_chunk(rng, start: int, n: int, as_of: date = AS_OF):
+    idx = np.arange(start, start + n)
+    district = rng.integers(0, len(_DISTRICTS), size=n)
+    first = FIRST_NAMES[rng.integers(0, len(FIRST_NAMES), size=n)]
+    last = LAST_NAMES[rng.integers(0, len(LAST_NAMES), size=n)]
+    signup = as_of - timedelta(days=700)
+    created = _timestamps(rng, n, datetime(signup.year, signup.month, signup.day), 700)
+    df = pd.DataFrame({
+        "id": [farmer_id_for(i) for i in idx],
+        "phone": phone_for(idx).astype(str),
+        "name": np.char.add(np.char.add(first, " "), last),
+        "district": [_DISTRICTS[d][1] for d in district],
+        "state": [_DISTRICTS[d][0] for d in district],
+        "created_at": np.char.replace(created, "T", " "),
+        "is_active": rng.random(n) > 0.02,
+        "language": LANGUAGES[rng.integers(0, len(LANGUAGES), size=n)],
+        "_district_idx": district,
+    })
+    df["email"] = np.char.add(np.char.lower(np.char.replace(df["name"].to_numpy().astype(str), " ", ".")),
+                              np.char.add(idx.astype(str), "@example.com"))
+    df["updated_at"] = df["created_at"]
+    return df
+
+
+def farmer_json_records(farmers: pd.DataFrame):
+    for row in farmers[["id", "name", "state", "district", "phone", "language", "created_at"]].itertuples(index=False):
+        yield {
+            "farmer_id": row.id,
+            "name": row.name,
+            "state": row.state,
+            "district": row.district,
+            "phone": row.phone,
+            "language": row.language,
+            "created_at": row.created_at.replace(" ", "T"),
+            "verified": True,
+        }
+
+
+def farm_chunk(rng, farmers: pd.DataFrame, farm_start: int, per_farmer: float):
+    counts = np.clip(rng.poisson(per_farmer, size=len(farmers)), 1, 6)
+    owner = np.repeat(np.arange(len(farmers)), counts)
+    n = len(owner)
+    district = farmers["_district_idx"].to_numpy()[owner]
+    lat = _DISTRICT_LAT[district] + rng.normal(0, 0.15, size=n)
+    lng = _DISTRICT_LNG[district] + rng.normal(0, 0.15, size=n)
+    created = farmers["created_at"].to_numpy()[owner]
+    ids = np.char.add("farm-", np.char.zfill(np.arange(farm_start, farm_start + n).astype(str), 9))
+    return pd.DataFrame({
+        "id": ids,
+        "farmer_id": farmers["id"].to_numpy()[owner],
+        "name": np.char.add("Field ", (np.arange(n) % 6 + 1).astype(str)),
+        "area_acres": np.round(rng.gamma(2.0, 1.4, size=n) + 0.3, 2),
+        "latitude": np.round(lat, 6),
+        "longitude": np.round(lng, 6),
+        "soil_type": SOIL_TYPES[rng.integers(0, len(SOIL_TYPES), size=n)],
+        "irrigation_type": IRRIGATION[rng.integers(0, len(IRRIGATION), size=n)],
+        "created_at": created,
+        "updated_at": created,
+        "is_active": True,
+    })
+
+
+def farm_crop_chunk(rng, farms: pd.DataFrame, crop_start: int, as_of: date = AS_OF):
+    n = len(farms)
+    pick = rng.integers(0, len(FARM_CROPS), size=n)
+    season = np.array([FARM_CROPS[p][1] for p in pick])
+    season_start = np.where(season == "Rabi", np.datetime64(_season_start(as_of, 11), "D"),
+                            np.datetime64(_season_start(as_of, 6), "D"))
+    planting_np = season_start + rng.integers(0, 27, size=n).astype("timedelta64[D]")
+    harvest = planting_np + rng.integers(110, 160, size=n).astype("timedelta64[D]")
+    ids = np.char.add("crop-", np.char.zfill(np.arange(crop_start, crop_start + n).astype(str), 9))
+    return pd.DataFrame({
+        "id": ids,
+        "farm_id": farms["id"].to_numpy(),
+        "crop_name": [FARM_CROPS[p][0] for p in pick],
+        "area_acres": np.round(farms["area_acres"].to_numpy() * rng.uniform(0.5, 1.0, size=n), 2),
+        "planting_date": planting_np.astype(str),
+        "expected_harvest_date": harvest.astype(str),
+        "season": season,
+        "created_at": np.char.add(planting_np.astype(str), " 08:00:00"),
+    })
+
+
+def _ndvi_category(ndvi: np.ndarray) -> np.ndarray:
+    return np.select([ndvi >= 0.7, ndvi >= 0.5, ndvi >= 0.3], ["Excellent", "Good", "Moderate"], "Poor")
+
+
+def satellite_chunk(rng, farms: pd.DataFrame, sat_start: int, per_farm: int, as_of: date = AS_OF):
+    n = len(farms) * per_farm
+    farm_ids = np.repeat(farms["id"].to_numpy(), per_farm)
+    base_ndvi = np.repeat(rng.uniform(0.35, 0.8, size=len(farms)), per_farm)
+    ndvi = np.clip(base_ndvi + rng.normal(0, 0.05, size=n), 0.05, 0.95).round(3)
+    image_dates = _dates(as_of - timedelta(days=334), np.tile(np.arange(per_farm) * 7, len(farms)) + rng.integers(0, 3, size=n))
+    processed = np.char.add(image_dates, " 10:00:00")
+    ids = np.char.add("sat-", np.char.zfill(np.arange(sat_start, sat_start + n).astype(str), 10))
+    return pd.DataFrame({
+        "id": ids,
+        "farm_id": farm_ids,
+        "image_date": image_dates,
+        "ndvi_value": ndvi,
+        "ndvi_category": _ndvi_category(ndvi),
+        "cloud_coverage_percent": rng.uniform(0, 20, size=n).round(1),
+        "image_url": "https://earthengine.google.com/...",
+        "source": "sentinel-2",
+        "processing_date": processed,
+        "created_at": processed,
+    })
+
+
+def soil_chunk(rng, farms: pd.DataFrame, soil_start: int, as_of: date = AS_OF):
+    n = len(farms)
+    test_dates = _dates(as_of - timedelta(days=426), rng.integers(0, 120, size=n))
+    ids = np.char.add("soil-", np.char.zfill(np.arange(soil_start, soil_start + n).astype(str), 9))
+    return pd.DataFrame({
+        "id": ids,
+        "farm_id": farms["id"].to_numpy(),
+        "test_date": test_dates,
+        "n_value": rng.uniform(25, 70, size=n).round(1),
+        "p_value": rng.uniform(12, 40, size=n).round(1),
+        "k_value": rng.uniform(10, 55, size=n).round(1),
+        "ph_value": rng.normal(7.0, 0.6, size=n).clip(4.5, 9.0).round(1),
+        "organic_carbon": rng.uniform(0.3, 0.9, size=n).round(2),
+        "electrical_conductivity": rng.uniform(0.2, 0.8, size=n).round(2),
+        "test_method": "Colorimetric",
+        "lab_name": "ICAR Soil Lab",
+        "created_at": np.char.add(test_dates, " 10:00:00"),
+    })
+
+
+def credit_chunk(rng, farmers: pd.DataFrame, credit_start: int, as_of: date = AS_OF):
+    n = len(farmers)
+    factors = rng.uniform(0.4, 0.95, size=(4, n)).round(3)
+    score = (factors.mean(axis=0) * 1000).astype(int)
+    calc = _dates(as_of - timedelta(days=325), rng.integers(0, 20, size=n))
+    ids = np.char.add("credit-", np.char.zfill(np.arange(credit_start, credit_start + n).astype(str), 9))
+    return pd.DataFrame({
+        "id": ids,
+        "farmer_id": farmers["id"].to_numpy(),
+        "score": score,
+        "calculation_date": calc,
+        "ndvi_factor": factors[0],
+        "yield_consistency_factor": factors[1],
+        "farm_size_factor": factors[2],
+        "history_factor": factors[3],
+        "loan_eligibility_amount": (score * 350.0).round(-3),
+        "interest_rate": np.round(12.0 - score / 200.0, 1),
+        "notes": "Synthetic score",
+        "created_at": np.char.add(calc, " 10:00:00"),
+    })
+
+
+def _seasonal_price(base, months, harvest_months, rng):
+    season = np.where(np.isin(months, harvest_months), 0.88, 1.0)
+    return base * season * rng.normal(1.0, 0.06, size=len(months))
+
+
+def agmarknet_chunk(rng, stem: str, n: int, start_day: date, days: int):
+    group, commodity, varieties, base, harvest = AGMARKNET_CROPS[stem]
+    district = rng.integers(0, len(_DISTRICTS), size=n)
+    suffix = rng.integers(0, len(MARKET_SUFFIXES), size=n)
+    offsets = rng.integers(0, days, size=n)
+    day = np.datetime64(start_day, "D") + offsets.astype("timedelta64[D]")
+    months = day.astype("datetime64[M]").astype(int) % 12 + 1
+    modal = _seasonal_price(base, months, harvest, rng)
+    low = modal * rng.uniform(0.88, 1.0, size=n)
+    high = modal * rng.uniform(1.0, 1.12, size=n)
+    fmt = np.vectorize("{:,.2f}".format, otypes=[object])
+    return pd.DataFrame({
+        "State": [_DISTRICTS[d][0] for d in district],
+        "District": [_DISTRICTS[d][1] for d in district],
+        "Market": [f"{_DISTRICTS[d][1]} {MARKET_SUFFIXES[s]}" for d, s in zip(district, suffix)],
+        "Commodity Group": group,
+        "Commodity": commodity,
+        "Variety": np.array(varieties)[rng.integers(0, len(varieties), size=n)],
+        "Grade": np.where(rng.random(n) < 0.7, "FAQ", "Non-FAQ"),
+        "Min Price": fmt(low),
+        "Max Price": fmt(high),
+        "Modal Price": fmt(modal),
+        "Price Unit": "Rs./Quintal",
+        "Arrival Quantity": rng.gamma(1.5, 20, size=n).round(2),
+        "Arrival Unit": "Metric Tonnes",
+        "Arrival Date": pd.to_datetime(day).strftime("%d-%m-%Y"),
+    })
+
+
+# -------------------------
+# DRIVER
+# -------------------------
+def generate(
+    out_dir: Path,
+    farmers: int = 1000,
+    price_rows: int = 10000,
+    farms_per_farmer: float = 1.5,
+    sat_per_farm: int = 4,
+    days: int = 730,
+    chunk_size: int = 50_000,
+    seed: int = 42,
+    log=print,
+    as_of: date = AS_OF,
+) -> dict:
+    """Generate every dataset into out_dir, dated up to as_of. Returns row counts per file."""
+    rng = np.random.default_rng(seed)
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    started = time.perf_counter()
+
+    w_farmers = ChunkWriter(out_dir / "farmers.csv", ["id", "phone", "name", "email", "district", "state",
+                                                       "created_at", "updated_at", "is_active"])
+    w_json = FarmerJSONWriter(out_dir / "farmers.json")
+    w_farms = ChunkWriter(out_dir / "farms.csv", ["id", "farmer_id", "name", "area_acres", "latitude", "longitude",
+                                                  "soil_type", "irrigation_type", "created_at", "updated_at", "is_active"])
+    w_crops = ChunkWriter(out_dir / "farm_crops.csv", ["id", "farm_id", "crop_name", "area_acres", "planting_date",
+                                                       "expected_harvest_date", "season", "created_at"])
+    w_sat = ChunkWriter(out_dir / "satellite_data.csv", ["id", "farm_id", "image_date", "ndvi_value", "ndvi_category",
+                                                         "cloud_coverage_percent", "image_url", "source",
+                                                         "processing_date", "created_at"])
+    w_soil = ChunkWriter(out_dir / "soil_records.csv", ["id", "farm_id", "test_date", "n_value", "p_value", "k_value",
+                                                        "ph_value", "organic_carbon", "electrical_conductivity",
+                                                        "test_method", "lab_name", "created_at"])
+    w_credit = ChunkWriter(out_dir / "credit_scores.csv", ["id", "farmer_id", "score", "calculation_date",
+                                                           "ndvi_factor", "yield_consistency_factor", "farm_size_factor",
+                                                           "history_factor", "loan_eligibility_amount", "interest_rate",
+                                                           "notes", "created_at"])
+
+    # 1. Farmers and everything hanging off them, one farmer chunk at a time
+    farm_no = 1
+    for start in range(0, farmers, chunk_size):
+        chunk = farmer_chunk(rng, start, min(chunk_size, farmers - start), as_of)
+        w_farmers.write(chunk)
+        w_json.write(farmer_json_records(chunk))
+        w_credit.write(credit_chunk(rng, chunk, start + 1, as_of))
+
+        farms = farm_chunk(rng, chunk, farm_no, farms_per_farmer)
+        w_farms.write(farms)
+        w_crops.write(farm_crop_chunk(rng, farms, farm_no, as_of))
+        w_soil.write(soil_chunk(rng, farms, farm_no, as_of))
+        w_sat.write(satellite_chunk(rng, farms, (farm_no - 1) * sat_per_farm + 1, sat_per_farm, as_of))
+        farm_no += len(farms)
+        log(f"   👨‍🌾 farmers {start + len(chunk):,}/{farmers:,}")
+    w_json.close()
+
+    # 2. Agmarknet crop files, split evenly across crops
+    start_day = as_of - timedelta(days=days)
+    per_crop = math.ceil(price_rows / len(AGMARKNET_CROPS))
+    counts = {}
+    for stem in AGMARKNET_CROPS:
+        writer = None
+        remaining = min(per_crop, price_rows - sum(counts.values()))
+        while remaining > 0:
+            n = min(chunk_size, remaining)
+            df = agmarknet_chunk(rng, stem, n, start_day, days)
+            if writer is None:
+                writer = ChunkWriter(out_dir / f"{stem}.csv", df.columns)
+            writer.write(df)
+            remaining -= n
+        counts[stem] = writer.rows if writer else 0
+        log(f"   📈 {stem}.csv {counts[stem]:,} rows")
+
+    # 3. Small reference tables
+    _write_reference_tables(rng, out_dir, start_day, days, as_of)
+
+    summary = {
+        "farmers": w_farmers.rows,
+        "farms": w_farms.rows,
+        "farm_crops": w_crops.rows,
+        "satellite_data": w_sat.rows,
+        "soil_records": w_soil.rows,
+        "credit_scores": w_credit.rows,
+        "agmarknet": counts,
+        "seconds": round(time.perf_counter() - started, 2),
+    }
+    return summary
+
+
+def _write_reference_tables(rng, out_dir: Path, start_day: date, days: int, as_of: date) -> None:
+    soil = pd.DataFrame([
+        {"District": d, "State": s, "Nitrogen": int(rng.integers(40, 66)), "Phosphorus": int(rng.integers(25, 41)),
+         "Potassium": int(rng.integers(35, 56)), "pH": round(float(rng.normal(6.8, 0.3)), 1),
+         "Rainfall": int(rng.integers(80, 130))}
+        for s, d, _, _ in _DISTRICTS
+    ])
+    soil.to_csv(out_dir / "soil_database_real.csv", index=False)
+
+    history_days = pd.date_range(start_day, periods=days, freq="D")
+    history = []
+    for crop in HISTORY_CROPS:
+        for state in REGIONS:
+            base = rng.uniform(1800, 6500)
+            prices = (base * (1 + np.cumsum(rng.normal(0, 0.004, size=days)))).astype(int)
+            history.append(pd.DataFrame({"Date": history_days.strftime("%Y-%m-%d"), "Crop": crop,
+                                         "State": state, "Price": prices}))
+    pd.concat(history).to_csv(out_dir / "market_history.csv", index=False)
+
+    mandi = [(s, d) for s, d, _, _ in _DISTRICTS]
+    n = len(mandi) * len(HISTORY_CROPS)
+    prices = pd.DataFrame({
+        "id": [f"price-{i:06d}" for i in range(1, n + 1)],
+        "crop": np.repeat([c.lower() for c in HISTORY_CROPS], len(mandi)),
+        "mandi_name": [f"{d} Mandi" for _, d in mandi] * len(HISTORY_CROPS),
+        "district": [d for _, d in mandi] * len(HISTORY_CROPS),
+        "state": [s for s, _ in mandi] * len(HISTORY_CROPS),
+        "price": rng.uniform(1800, 6500, size=n).round(1),
+        "unit": "quintal",
+        "price_date": str(as_of),
+        "arrival_quantity": rng.uniform(100, 2000, size=n).round(1),
+        "weather_condition": WEATHER[rng.integers(0, len(WEATHER), size=n)],
+        "source": "agmark",
+        "created_at": f"{as_of} 08:00:00",
+    })
+    prices.to_csv(out_dir / "market_prices.csv", index=False)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Generate synthetic TriNetra datasets")
+    parser.add_argument("--out", type=Path, required=True, help="output folder (never the live data/ folder)")
+    parser.add_argument("--farmers", type=int, default=1000)
+    parser.add_argument("--price-rows", type=int, default=10000, help="total Agmarknet rows across crop files")
+    parser.add_argument("--farms-per-farmer", type=float, default=1.5)
+    parser.add_argument("--sat-per-farm", type=int, default=4)
+    parser.add_argument("--days", type=int, default=730, help="history window for price rows")
+    parser.add_argument("--chunk-size", type=int, default=50_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--as-of", type=date.fromisoformat, default=AS_OF,
+                        help=f"last day of the generated history, YYYY-MM-DD (default {AS_OF})")
+    args = parser.parse_args(argv)
+
+    data_dir = Path(__file__).resolve().parent.parent / "data"
+    if args.out.resolve() == data_dir:
+        print("❌ Refusing to overwrite the live data/ folder. Pick another --out.")
+        return 1
+
+    print(f"🏭 Generating {args.farmers:,} farmers and {args.price_rows:,} price rows into {args.out}...")
+    summary = generate(
+        args.out, args.farmers, args.price_rows, args.farms_per_farmer,
+        args.sat_per_farm, args.days, args.chunk_size, args.seed, as_of=args.as_of,
+    )
+    print(f"✅ Done in {summary['seconds']}s: {json.dumps(summary)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
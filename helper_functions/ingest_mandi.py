@@ -0,0 +1,30 @@
+import sys
+from pathlib import Path
+
+# Add Root to Python System Path (so `app` imports work when run as a script)
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.append(str(ROOT_DIR))
+
+from app.core.config import settings  # noqa: E402
+from app.repositories.mandi_ingest import ingest_directory  # noqa: E402
+
+
+def ingest_mandi_files():
+    """
+    Streams every Agmarknet export in data/ into the normalized store.
+    Replaces the old fix_data / force_clean / clean_header scripts:
+    header detection, encoding repair (UTF-16, Mac Roman, Excel-as-CSV) and
+    number/date typing happen chunk by chunk, and the source files are never rewritten.
+    """
+    print(f"🧹 Ingesting {settings.DATA_DIR} -> {settings.MANDI_STORE_DIR}...")
+    for report in ingest_directory(settings.DATA_DIR, settings.MANDI_STORE_DIR):
+        if report["status"] == "ingested":
+            print(f"   ✅ {report['file']}: {report['rows']:,} rows")
+        elif report["status"] == "skipped":
+            print(f"   ⏭️  {report['file']}: no mandi header, skipped")
+        else:
+            print(f"   ❌ {report['file']}: {report['error']}")
+
+
+if __name__ == "__main__":
+    ingest_mandi_files()
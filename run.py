@@ -1,3 +1,4 @@
+import os
 import uvicorn
 from app.core.config import settings
 
@@ -28,10 +29,25 @@ if __name__ == "__main__":
     # Determine host based on environment
     host = "127.0.0.1" if settings.ENVIRONMENT == "development" else "0.0.0.0"
     
-    uvicorn.run(
-        "app.main:app",
-        host=host,
-        port=8000,
-        reload=settings.DEBUG,
-        log_level="info",
-    )
\ No newline at end of file
+    if settings.ENVIRONMENT == "development":
+        uvicorn.run(
+            "app.main:app",
+            host=host,
+            port=8000,
+            reload=settings.DEBUG,
+            log_level="info",
+        )
+    else:
+        # Production: one worker per core, no reloader. Shared state (OTPs,
+        # rate limits) lives in settings.KV_STORE_PATH, so any worker can
+        # serve any step of a login.
+        workers = settings.WORKERS or os.cpu_count() or 1
+        print(f"👷 Workers: {workers}")
+        uvicorn.run(
+            "app.main:app",
+            host=host,
+            port=8000,
+            workers=workers,
+            reload=False,
+            log_level="info",
+        )
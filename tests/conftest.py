@@ -0,0 +1,44 @@
+"""
+Shared test setup. The local `ee` / Gemini fakes from benchmarks/stubs.py
+are installed before any app module is imported, so nothing here talks to
+a real upstream.
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks import stubs  # noqa: E402
+
+stubs.install()
+
+
+class FakeClock:
+    """Monotonic clock that only moves when a test sleeps on it."""
+
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+        self.sleeps = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def fake_ee():
+    """The fake Earth Engine upstream, reset around each test."""
+    upstream = stubs.FAKE_EE
+    upstream.latency_s, upstream.error_rate, upstream.fail_next, upstream.calls = 0.0, 0.0, 0, 0
+    yield upstream
+    upstream.latency_s, upstream.error_rate, upstream.fail_next, upstream.calls = 0.0, 0.0, 0, 0
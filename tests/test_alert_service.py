@@ -0,0 +1,118 @@
+from datetime import date
+
+import pytest
+
+from app.repositories.alert_store import AlertStore
+from app.repositories.vocab import CROPS, STATES
+from app.services.alert_service import AlertService
+
+DAY = date(2026, 1, 5)
+
+
+@pytest.fixture
+def alerts(tmp_path):
+    # What loading the market data does: the forecast's crop and state are known names
+    CROPS.id("Wheat")
+    STATES.id("Punjab")
+    return AlertService(AlertStore(tmp_path / "alerts.db"))
+
+
+def kinds(service, farmer_id):
+    return sorted(n["notification_type"] for n in service.notifications(farmer_id))
+
+
+def messages(service, farmer_id):
+    return [n["message"] for n in service.notifications(farmer_id)]
+
+
+# -------------------------
+# SUBSCRIPTIONS
+# -------------------------
+def test_subscribe_stores_canonical_names(alerts):
+    sub = alerts.subscribe("f1", "gehu", "punjab", "above", threshold=2500)
+    assert (sub["crop"], sub["state"]) == ("Wheat", "Punjab")
+
+
+@pytest.mark.parametrize("crop, state, error", [
+    ("Zzz", "Punjab", "Unknown crop"),
+    ("Wheat", "Nowhere", "Unknown state"),
+])
+def test_subscribe_rejects_unknown_names(alerts, crop, state, error):
+    with pytest.raises(ValueError, match=error):
+        alerts.subscribe("f1", crop, state, "signal")
+
+
+def test_subscribe_validates_threshold_and_signal(alerts):
+    with pytest.raises(ValueError):
+        alerts.subscribe("f1", "Wheat", "Punjab", "above")
+    with pytest.raises(ValueError):
+        alerts.subscribe("f1", "Wheat", "Punjab", "below", threshold=-1)
+    with pytest.raises(ValueError):
+        alerts.subscribe("f1", "Wheat", "Punjab", "signal", signal="PANIC")
+
+
+# -------------------------
+# FAN-OUT
+# -------------------------
+def test_first_dispatch_fires_thresholds_already_past(alerts):
+    alerts.subscribe("past", "Wheat", "Punjab", "above", threshold=2000)
+    alerts.subscribe("ahead", "Wheat", "Punjab", "above", threshold=2500)
+    alerts.dispatch([("Wheat", "Punjab", 2400, "HOLD")], today=DAY)
+    assert kinds(alerts, "past") == ["price_alert"]
+    assert kinds(alerts, "ahead") == []
+
+
+def test_only_crossed_thresholds_fire(alerts):
+    alerts.dispatch([("Wheat", "Punjab", 2400, "HOLD")], today=DAY)
+    alerts.subscribe("up-crossed", "Wheat", "Punjab", "above", threshold=2500)
+    alerts.subscribe("up-at-price", "Wheat", "Punjab", "above", threshold=2600)
+    alerts.subscribe("up-beyond", "Wheat", "Punjab", "above", threshold=2700)
+    alerts.subscribe("up-at-previous", "Wheat", "Punjab", "above", threshold=2400)
+    alerts.subscribe("down", "Wheat", "Punjab", "below", threshold=2500)
+
+    alerts.dispatch([("Wheat", "Punjab", 2600, "HOLD")], today=DAY)
+    assert kinds(alerts, "up-crossed") == ["price_alert"]
+    assert kinds(alerts, "up-at-price") == ["price_alert"]  # (previous, price]
+    assert kinds(alerts, "up-beyond") == []
+    assert kinds(alerts, "up-at-previous") == []
+    assert kinds(alerts, "down") == []  # a rise never fires "below"
+
+    alerts.dispatch([("Wheat", "Punjab", 2450, "HOLD")], today=DAY)
+    assert kinds(alerts, "down") == ["price_alert"]
+    assert kinds(alerts, "up-crossed") == ["price_alert"]
+
+
+def test_threshold_is_filled_into_each_message(alerts):
+    alerts.dispatch([("Wheat", "Punjab", 2400, "HOLD")], today=DAY)
+    alerts.subscribe("a", "Wheat", "Punjab", "above", threshold=2450)
+    alerts.subscribe("b", "Wheat", "Punjab", "above", threshold=2550)
+    alerts.dispatch([("Wheat", "Punjab", 2600, "HOLD")], today=DAY)
+    assert "2450" in messages(alerts, "a")[0]
+    assert "2550" in messages(alerts, "b")[0]
+
+
+def test_signal_subscriptions(alerts):
+    alerts.dispatch([("Wheat", "Punjab", 2400, "HOLD")], today=DAY)
+    alerts.subscribe("any", "Wheat", "Punjab", "signal")
+    alerts.subscribe("sell", "Wheat", "Punjab", "signal", signal="sell")
+    alerts.subscribe("stable", "Wheat", "Punjab", "signal", signal="STABLE")
+
+    alerts.dispatch([("Wheat", "Punjab", 2400, "SELL")], today=DAY)
+    assert kinds(alerts, "any") == ["market_signal"]
+    assert kinds(alerts, "sell") == ["market_signal"]
+    assert kinds(alerts, "stable") == []
+
+
+def test_unchanged_forecast_is_not_realerted(alerts):
+    alerts.subscribe("f1", "Wheat", "Punjab", "signal")
+    alerts.dispatch([("Wheat", "Punjab", 2400, "HOLD")], today=DAY)
+    assert alerts.dispatch([("Wheat", "Punjab", 2400, "HOLD")], today=DAY) == "no forecast changes"
+    assert len(alerts.notifications("f1")) == 1
+
+
+def test_notifications_follow_the_subscription_language(alerts):
+    alerts.subscribe("en", "Wheat", "Punjab", "signal", lang="en")
+    alerts.subscribe("hi", "Wheat", "Punjab", "signal", lang="hi")
+    alerts.dispatch([("Wheat", "Punjab", 2400, "SELL")], today=DAY)
+    assert len(alerts.notifications("en")) == len(alerts.notifications("hi")) == 1
+    assert messages(alerts, "en") != messages(alerts, "hi")
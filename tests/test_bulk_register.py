@@ -0,0 +1,110 @@
+import io
+import json
+
+import pytest
+
+from app.core.config import settings
+from app.services.auth_service import AuthService
+
+HEADER = "name,phone,state,district,language\n"
+
+
+@pytest.fixture
+def auth(tmp_path, monkeypatch):
+    for name in ("soil.csv", "market.csv"):
+        (tmp_path / name).write_text("")
+    (tmp_path / "farmers.json").write_text(json.dumps({
+        "FARM_9000000009_1": {"farmer_id": "FARM_9000000009_1", "name": "Existing", "phone": "9000000009"},
+    }))
+    monkeypatch.setattr(settings, "SOIL_DATA_PATH", tmp_path / "soil.csv")
+    monkeypatch.setattr(settings, "MARKET_DATA_PATH", tmp_path / "market.csv")
+    monkeypatch.setattr(settings, "FARMERS_DATA_PATH", tmp_path / "farmers.json")
+    monkeypatch.setattr(settings, "FARM_CROPS_DATA_PATH", tmp_path / "farm_crops.csv")
+    monkeypatch.setattr(settings, "KV_STORE_PATH", tmp_path / "shared_state.db")
+    return AuthService()
+
+
+def upload(service, body: str, fmt: str = "csv", chunk_rows: int = 1000):
+    return service.register_farmers_bulk(io.BytesIO(body.encode()), fmt, chunk_rows=chunk_rows)
+
+
+def statuses(report):
+    return [r["status"] if r["status"] == "registered" else r["error"] for r in report["results"]]
+
+
+# -------------------------
+# NORMALIZATION
+# -------------------------
+def test_padded_fields_are_stripped(auth):
+    report = upload(auth, HEADER + "Cal ,9000000002 ,Punjab ,Ludhiana ,hi \n")
+    assert statuses(report) == ["registered"]
+    stored = auth.repo.get_farmer_by_phone("9000000002")
+    assert (stored["name"], stored["state"], stored["district"], stored["language"]) == (
+        "Cal", "Punjab", "Ludhiana", "hi"
+    )
+
+
+def test_missing_language_defaults_to_english(auth):
+    upload(auth, HEADER + "Cal,9000000002,Punjab,Ludhiana,\n")
+    assert auth.repo.get_farmer_by_phone("9000000002")["language"] == "en"
+
+
+# -------------------------
+# VALIDATION
+# -------------------------
+def test_field_rules(auth):
+    report = upload(auth, HEADER + (
+        ",9000000001,Punjab,Ludhiana,\n"
+        "A1,9000000002,Punjab,Ludhiana,\n"
+        "Cal,,Punjab,Ludhiana,\n"
+        "Cal,12345,Punjab,Ludhiana,\n"
+        "Cal,9000000005,,Ludhiana,\n"
+        "Cal,9000000006,Punjab,,\n"
+    ))
+    assert statuses(report) == [
+        "name: field required",
+        "name: Name cannot contain numbers",
+        "phone: field required",
+        "phone: must be 10 digits",
+        "state: field required",
+        "district: field required",
+    ]
+    assert report["results"][2]["phone"] is None
+    assert report["registered"] == 0
+
+
+def test_invalid_row_does_not_claim_its_phone(auth):
+    report = upload(auth, HEADER + "A1,9000000001,Punjab,X,\nBob,9000000001,Punjab,X,\n")
+    assert statuses(report) == ["name: Name cannot contain numbers", "registered"]
+
+
+@pytest.mark.parametrize("chunk_rows", [1, 2, 3, 1000])
+def test_repeats_are_independent_of_chunking(auth, chunk_rows):
+    report = upload(auth, HEADER + (
+        "A1,9000000001,Punjab,X,\n"
+        "Bob,9000000001,Punjab,X,\n"
+        "Bobby,9000000001,Punjab,X,\n"
+        "Cal,9000000002,Punjab,X,\n"
+    ), chunk_rows=chunk_rows)
+    assert statuses(report) == [
+        "name: Name cannot contain numbers",
+        "registered",
+        "phone repeated earlier in the upload",
+        "registered",
+    ]
+
+
+def test_already_registered_phone_is_rejected(auth):
+    report = upload(auth, HEADER + "Dev,9000000009,Punjab,X,\n")
+    assert statuses(report) == ["Farmer with phone 9000000009 already registered"]
+
+
+def test_ndjson_upload(auth):
+    body = "\n".join([
+        json.dumps({"name": " Cal ", "phone": 9000000002, "state": "Punjab", "district": "Ludhiana"}),
+        "not json",
+        json.dumps({"name": "Dev", "state": "Punjab", "district": "Ludhiana"}),
+    ])
+    report = upload(auth, body, fmt="ndjson")
+    assert statuses(report) == ["registered", "invalid JSON line", "phone: field required"]
+    assert auth.repo.get_farmer_by_phone("9000000002")["name"] == "Cal"
@@ -0,0 +1,161 @@
+import ee
+import pytest
+
+from app.core.ee_scheduler import CircuitBreaker, EEScheduler, TokenBucket, UpstreamUnavailable
+
+
+class MaxJitter:
+    """Full jitter pinned to its upper bound, so backoff() returns the cap."""
+
+    def uniform(self, low, high):
+        return high
+
+
+def ndvi_call():
+    """A getInfo() round trip to the fake Earth Engine."""
+    return ee.ImageCollection("COPERNICUS/S2_SR_HARMONIZED").first().reduceRegion().get("nd").getInfo()
+
+
+def make_scheduler(clock, **kwargs):
+    options = dict(rate_per_s=10.0, burst=20, retries=0, acquire_timeout_s=0.0,
+                   breaker=CircuitBreaker(threshold=2, reset_after=30.0, clock=clock),
+                   sleep=clock.sleep, rng=MaxJitter(), clock=clock)
+    options.update(kwargs)
+    return EEScheduler(**options)
+
+
+# -------------------------
+# CIRCUIT BREAKER
+# -------------------------
+def test_breaker_opens_half_opens_and_closes(clock, fake_ee):
+    scheduler = make_scheduler(clock)
+    fake_ee.fail_next = 2
+    for _ in range(2):
+        with pytest.raises(UpstreamUnavailable) as err:
+            scheduler.run(ndvi_call)
+        assert err.value.reason == "upstream_error"
+    assert scheduler.breaker.state == CircuitBreaker.OPEN
+
+    # Open: fails fast without reaching upstream
+    with pytest.raises(UpstreamUnavailable) as err:
+        scheduler.run(ndvi_call)
+    assert err.value.reason == "circuit_open"
+    assert fake_ee.calls == 2
+
+    # After reset_after one probe goes through and closes the circuit
+    clock.now += 30.0
+    assert scheduler.run(ndvi_call) == 0.62
+    assert scheduler.breaker.state == CircuitBreaker.CLOSED
+    assert fake_ee.calls == 3
+
+
+def test_failed_probe_reopens(clock, fake_ee):
+    scheduler = make_scheduler(clock)
+    fake_ee.fail_next = 3
+    for _ in range(2):
+        with pytest.raises(UpstreamUnavailable):
+            scheduler.run(ndvi_call)
+
+    clock.now += 30.0
+    with pytest.raises(UpstreamUnavailable) as err:
+        scheduler.run(ndvi_call)
+    assert err.value.reason == "upstream_error"
+    assert scheduler.breaker.state == CircuitBreaker.OPEN
+
+    # The reset window starts again from the failed probe
+    clock.now += 29.0
+    with pytest.raises(UpstreamUnavailable) as err:
+        scheduler.run(ndvi_call)
+    assert err.value.reason == "circuit_open"
+
+
+def test_half_open_allows_a_single_probe(clock):
+    breaker = CircuitBreaker(threshold=1, reset_after=30.0, clock=clock)
+    breaker.record_failure()
+    clock.now += 30.0
+    assert breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert not breaker.allow()
+
+
+def test_local_backpressure_releases_the_probe(clock, fake_ee):
+    scheduler = make_scheduler(clock, rate_per_s=1.0, burst=2)
+    fake_ee.fail_next = 2
+    for _ in range(2):
+        with pytest.raises(UpstreamUnavailable):
+            scheduler.run(ndvi_call)
+    assert scheduler.breaker.state == CircuitBreaker.OPEN
+
+    # Half-open, but the probe is refused by the local quota, not by upstream
+    clock.now += 30.0
+    assert scheduler.bucket.acquire() and scheduler.bucket.acquire()
+    with pytest.raises(UpstreamUnavailable) as err:
+        scheduler.run(ndvi_call)
+    assert err.value.reason == "quota"
+    assert scheduler.breaker.state == CircuitBreaker.HALF_OPEN
+
+    # The probe slot was given back, so the next call may still probe
+    clock.now += 1.0
+    assert scheduler.run(ndvi_call) == 0.62
+    assert scheduler.breaker.state == CircuitBreaker.CLOSED
+
+
+# -------------------------
+# RETRIES
+# -------------------------
+def test_backoff_is_capped(clock):
+    scheduler = make_scheduler(clock, backoff_base_s=0.5, backoff_max_s=8.0)
+    assert [scheduler.backoff(n) for n in range(1, 8)] == [0.5, 1.0, 2.0, 4.0, 8.0, 8.0, 8.0]
+
+
+def test_retries_back_off_then_succeed(clock, fake_ee):
+    scheduler = make_scheduler(clock, retries=3)
+    fake_ee.fail_next = 2
+    assert scheduler.run(ndvi_call) == 0.62
+    assert fake_ee.calls == 3
+    assert clock.sleeps == [0.5, 1.0]
+    assert scheduler.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_exhausted_retries_count_one_failure(clock, fake_ee):
+    scheduler = make_scheduler(clock, retries=3)
+    fake_ee.error_rate = 1.0
+    with pytest.raises(UpstreamUnavailable) as err:
+        scheduler.run(ndvi_call)
+    assert err.value.reason == "upstream_error"
+    assert fake_ee.calls == 4
+    assert clock.sleeps == [0.5, 1.0, 2.0]
+    assert scheduler.breaker.state == CircuitBreaker.CLOSED  # threshold is 2 runs, not 2 attempts
+
+
+# -------------------------
+# QUOTA
+# -------------------------
+def test_token_bucket_waits_for_a_token_within_timeout(clock):
+    bucket = TokenBucket(rate=2.0, capacity=1, clock=clock)
+    assert bucket.acquire(sleep=clock.sleep)
+    assert bucket.acquire(timeout=1.0, sleep=clock.sleep)
+    assert clock.sleeps == [0.5]
+
+
+def test_token_bucket_gives_up_past_timeout(clock):
+    bucket = TokenBucket(rate=2.0, capacity=1, clock=clock)
+    assert bucket.acquire(sleep=clock.sleep)
+    assert not bucket.acquire(timeout=0.1, sleep=clock.sleep)
+    assert clock.sleeps == []  # a wait that cannot fit the timeout is not attempted
+
+
+def test_quota_timeout_surfaces_as_unavailable(clock, fake_ee):
+    scheduler = make_scheduler(clock, rate_per_s=1.0, burst=1, acquire_timeout_s=0.5)
+    assert scheduler.run(ndvi_call) == 0.62
+    with pytest.raises(UpstreamUnavailable) as err:
+        scheduler.run(ndvi_call)
+    assert err.value.reason == "quota"
+    assert fake_ee.calls == 1
+    assert scheduler.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_injected_latency_is_passed_through(clock, fake_ee):
+    fake_ee.latency_s = 0.01
+    assert make_scheduler(clock).run(ndvi_call) == 0.62
+    assert fake_ee.calls == 1
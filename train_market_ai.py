@@ -5,17 +5,23 @@ import pandas as pd
 import numpy as np
 import joblib
 import random
-import glob
 import os
 from datetime import datetime, timedelta
+from pathlib import Path
 from sklearn.preprocessing import LabelEncoder, MinMaxScaler
+from app.core.config import settings
+from app.repositories.artifacts import export_market_model
+from app.repositories.mandi_ingest import aggregate_directory, list_mandi_files
+from app.repositories.vocab import CROPS, STATES
 
 # --- CONFIG ---
 DATA_DIR = "data/"  # Your CSVs must be here
 MODEL_PATH = "app/models/market_net.pth"
 SCALER_PATH = "app/models/scalers.pkl"
+ENSEMBLE_PATH = "app/models/market_ensemble.pth"
 EPOCHS = 1000
 LEARNING_RATE = 0.005
+ENSEMBLE_SIZE = 5  # members behind the P10/P50/P90 bands
 
 # --- 🧠 CROP KNOWLEDGE BASE ---
 HARVEST_CALENDAR = {
@@ -41,54 +47,28 @@ HARVEST_CALENDAR = {
 def load_and_augment_agmarknet():
     print("🔄 Scanning data folder...")
     # Finds ALL csv files (Wheat.csv, Rice.csv, etc.)
-    csv_files = glob.glob(os.path.join(DATA_DIR, "*.csv"))
-    
-    if not csv_files:
+    if not list_mandi_files(DATA_DIR):
         print("⚠️ No CSVs found in data/! Please check file location.")
         return pd.DataFrame()
 
-    all_data = []
-    
-    # 1. READ REAL DATA
-    for file in csv_files:
-        try:
-            print(f"   reading {os.path.basename(file)}...")
-            df = pd.read_csv(file)
-            
-            # Clean Headers
-            df.columns = df.columns.str.lower().str.replace(r'[\(].*?[\)]', '', regex=True).str.strip().str.replace(' ', '_')
-            
-            # Map various Agmarknet formats to our standard
-            rename_map = {
-                "state_name": "state",
-                "district_name": "state", # Fallback
-                "market_name": "market",
-                "commodity": "crop",
-                "modal_price": "price",
-                "price_date": "date",
-                "arrival_date": "date"
-            }
-            df = df.rename(columns=rename_map)
-            
-            # Check if valid
-            if 'crop' in df.columns and 'price' in df.columns:
-                if 'state' not in df.columns: df['state'] = 'India' # Default
-                
-                # Clean Price column
-                df['price'] = pd.to_numeric(df['price'], errors='coerce')
-                df = df.dropna(subset=['price'])
-                
-                all_data.append(df[['crop', 'state', 'price']])
-        except Exception as e:
-            print(f"   ⚠️ Skipped {file}: {e}")
-
-    if not all_data:
+    # 1. STREAM REAL DATA
+    # Each file is folded into (sum, count) per crop/state in its own worker
+    # process, so ingest scales with cores and memory per worker stays flat.
+    files = list_mandi_files(DATA_DIR)
+    print(f"   reading {len(files)} files on up to {os.cpu_count()} cores...")
+    sums = aggregate_directory(DATA_DIR, keys=('crop', 'state'), value='modal_price')
+
+    if not sums:
         return pd.DataFrame()
 
-    real_df = pd.concat(all_data, ignore_index=True)
-    
     # 2. EXTRACT ANCHORS (Average price per Crop/State today)
-    anchors = real_df.groupby(['crop', 'state'])['price'].mean().to_dict()
+    # Spelling variants ("Paddy(Common)", "rice") are merged onto one canonical series
+    merged = {}
+    for (crop, state), (total, count) in sums.items():
+        key = (CROPS.canonical(crop), STATES.canonical(state))
+        prev_total, prev_count = merged.get(key, (0.0, 0))
+        merged[key] = (prev_total + total, prev_count + count)
+    anchors = {key: total / count for key, (total, count) in merged.items()}
     print(f"✓ Learned {len(anchors)} price anchors from real files.")
 
     # 3. GENERATE HISTORY (The Time Travel Logic)
@@ -127,59 +107,110 @@ def load_and_augment_agmarknet():
             
             final_price = base_price * season_factor * inflation + noise
             
-            augmented_rows.append([str(crop).title(), str(state).title(), current_date.toordinal(), int(final_price)])
+            augmented_rows.append([crop, state, current_date.toordinal(), int(final_price)])
             current_date += timedelta(days=3) # Data every 3 days
 
     return pd.DataFrame(augmented_rows, columns=['Crop', 'State', 'Date', 'Price'])
 
+# --- 📊 UNCERTAINTY ENSEMBLE ---
+def train_ensemble(X_tensor, y_tensor, k=ENSEMBLE_SIZE, epochs=EPOCHS, seed=0):
+    """
+    K copies of the market net, trained together as stacked (K, in, out)
+    weights so each step is one batched matmul per layer. Every member
+    gets its own init and a Poisson(1) bootstrap weighting of the rows;
+    the spread of their predictions is the forecast uncertainty.
+    """
+    gen = torch.Generator().manual_seed(seed)
+    sizes = [(3, 128), (128, 64), (64, 1)]
+    params = []
+    for fan_in, fan_out in sizes:
+        bound = 1.0 / np.sqrt(fan_in)  # nn.Linear's default init range
+        w = (torch.rand(k, fan_in, fan_out, generator=gen) * 2 - 1) * bound
+        b = (torch.rand(k, 1, fan_out, generator=gen) * 2 - 1) * bound
+        params += [w.requires_grad_(), b.requires_grad_()]
+
+    boot = torch.poisson(torch.ones(k, len(X_tensor), 1), generator=gen)
+    x = X_tensor.unsqueeze(0).expand(k, -1, -1)
+    optimizer = optim.Adam(params, lr=LEARNING_RATE)
+
+    for epoch in range(epochs):
+        optimizer.zero_grad()
+        h = x
+        for i in range(0, len(params), 2):
+            h = torch.baddbmm(params[i + 1], h, params[i])
+            if i < len(params) - 2:
+                h = h.relu()
+        loss = (boot * (h - y_tensor) ** 2).sum() / boot.sum()
+        loss.backward()
+        optimizer.step()
+
+        if (epoch+1) % 200 == 0:
+            print(f"Ensemble Epoch [{epoch+1}/{epochs}], Loss: {loss.item():.6f}")
+
+    # Saved as w0, b0, w1, b1, w2, b2
+    return {f"{'wb'[i % 2]}{i // 2}": p.detach() for i, p in enumerate(params)}
+
 # --- MAIN EXECUTION ---
-df = load_and_augment_agmarknet()
-
-if df.empty:
-    print("❌ Critical Error: No data generated. Check CSV files.")
-    exit()
-
-# Encoders
-le_crop = LabelEncoder()
-le_state = LabelEncoder()
-df['Crop'] = le_crop.fit_transform(df['Crop'].astype(str))
-df['State'] = le_state.fit_transform(df['State'].astype(str))
-
-# Scaling
-scaler_X = MinMaxScaler()
-scaler_y = MinMaxScaler()
-X = scaler_X.fit_transform(df[['Crop', 'State', 'Date']].values)
-y = scaler_y.fit_transform(df[['Price']].values)
-
-X_tensor = torch.FloatTensor(X)
-y_tensor = torch.FloatTensor(y)
-
-# AI Model
-model = nn.Sequential(
-    nn.Linear(3, 128),
-    nn.ReLU(),
-    nn.Linear(128, 64),
-    nn.ReLU(),
-    nn.Linear(64, 1)
-)
-
-print(f"🧠 Training AI on {len(df)} records...")
-criterion = nn.MSELoss()
-optimizer = optim.Adam(model.parameters(), lr=LEARNING_RATE)
-
-for epoch in range(EPOCHS):
-    optimizer.zero_grad()
-    outputs = model(X_tensor)
-    loss = criterion(outputs, y_tensor)
-    loss.backward()
-    optimizer.step()
-    
-    if (epoch+1) % 200 == 0:
-        print(f"Epoch [{epoch+1}/{EPOCHS}], Loss: {loss.item():.6f}")
-
-# Save
-os.makedirs("app/models", exist_ok=True)
-torch.save(model.state_dict(), MODEL_PATH)
-joblib.dump({'le_crop': le_crop, 'le_state': le_state, 'scaler_X': scaler_X, 'scaler_y': scaler_y}, SCALER_PATH)
-
-print("✅ SUCCESS: AI Trained & Model Saved to app/models/!")
\ No newline at end of file
+# Guarded so the ingest worker processes can import this module safely.
+def main():
+    df = load_and_augment_agmarknet()
+
+    if df.empty:
+        print("❌ Critical Error: No data generated. Check CSV files.")
+        return
+
+    # Encoders
+    le_crop = LabelEncoder()
+    le_state = LabelEncoder()
+    df['Crop'] = le_crop.fit_transform(df['Crop'].astype(str))
+    df['State'] = le_state.fit_transform(df['State'].astype(str))
+
+    # Scaling
+    scaler_X = MinMaxScaler()
+    scaler_y = MinMaxScaler()
+    X = scaler_X.fit_transform(df[['Crop', 'State', 'Date']].values)
+    y = scaler_y.fit_transform(df[['Price']].values)
+
+    X_tensor = torch.FloatTensor(X)
+    y_tensor = torch.FloatTensor(y)
+
+    # AI Model
+    model = nn.Sequential(
+        nn.Linear(3, 128),
+        nn.ReLU(),
+        nn.Linear(128, 64),
+        nn.ReLU(),
+        nn.Linear(64, 1)
+    )
+
+    print(f"🧠 Training AI on {len(df)} records...")
+    criterion = nn.MSELoss()
+    optimizer = optim.Adam(model.parameters(), lr=LEARNING_RATE)
+
+    for epoch in range(EPOCHS):
+        optimizer.zero_grad()
+        outputs = model(X_tensor)
+        loss = criterion(outputs, y_tensor)
+        loss.backward()
+        optimizer.step()
+
+        if (epoch+1) % 200 == 0:
+            print(f"Epoch [{epoch+1}/{EPOCHS}], Loss: {loss.item():.6f}")
+
+    # Save
+    os.makedirs("app/models", exist_ok=True)
+    torch.save(model.state_dict(), MODEL_PATH)
+    joblib.dump({'le_crop': le_crop, 'le_state': le_state, 'scaler_X': scaler_X, 'scaler_y': scaler_y}, SCALER_PATH)
+
+    print("✅ SUCCESS: AI Trained & Model Saved to app/models/!")
+
+    print(f"📊 Training {ENSEMBLE_SIZE}-member ensemble for confidence bands...")
+    torch.save(train_ensemble(X_tensor, y_tensor), ENSEMBLE_PATH)
+
+    # Refresh the memmapped copy the API workers load
+    path = export_market_model(Path(MODEL_PATH), Path(SCALER_PATH), settings.ARTIFACT_DIR, Path(ENSEMBLE_PATH))
+    print(f"📦 Model artifact written to {path}")
+
+
+if __name__ == "__main__":
+    main()